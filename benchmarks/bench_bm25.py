@@ -0,0 +1,51 @@
+"""
+Per-query latency of the BM25 strategy as the catalog grows.
+
+Synthetic catalogs come from benchmarks.synthetic, so term statistics
+stay close to the real data. Run from the project root:
+    python -m benchmarks.bench_bm25 [sizes...]
+"""
+import sys
+import time
+
+from benchmarks.synthetic import synthetic_clubs
+from models.bm25 import BM25Recommender
+from models.catalog import CatalogManager, ClubCatalog, DEFAULT_CATALOG_PATH
+
+SIZES = [1_000, 10_000, 100_000]
+BATCH_SIZE = 50
+QUERIES = [
+    "engineering, robotics",
+    "music, dance, theatre",
+    "computer science, hackathon, coding",
+    "community service, volunteering",
+    "club, student",
+]
+
+
+def main(sizes):
+    real = CatalogManager(DEFAULT_CATALOG_PATH).get_catalog().clubs
+    batch = [{"interests": QUERIES[i % len(QUERIES)]} for i in range(BATCH_SIZE)]
+
+    print(f"{'clubs':>8} {'build s':>8} {'ms/query':>9} {'batch ms/query':>15}")
+    for size in sizes:
+        catalog = ClubCatalog(synthetic_clubs(real, size))
+
+        start = time.perf_counter()
+        rec = BM25Recommender(catalog)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for interests in QUERIES:
+            rec.recommend({"interests": interests})
+        single_ms = (time.perf_counter() - start) * 1000 / len(QUERIES)
+
+        start = time.perf_counter()
+        rec.recommend_batch(batch)
+        batch_ms = (time.perf_counter() - start) * 1000 / len(batch)
+
+        print(f"{size:>8} {build:>8.2f} {single_ms:>9.2f} {batch_ms:>15.2f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or SIZES)
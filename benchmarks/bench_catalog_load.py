@@ -0,0 +1,77 @@
+"""
+Load time and memory of the JSON vs JSON Lines catalog formats, and of
+the catalog as full club dicts vs compact Club records for serving.
+
+Each case runs in a fresh interpreter so peak RSS isn't shared between
+them. "heap KB" is Python memory still held once the load is done (mapped
+file pages are shared page cache and don't count). Run from the project root:
+    python -m benchmarks.bench_catalog_load
+"""
+import json
+import subprocess
+import sys
+
+from data_collection.catalog_store import convert_json_catalog
+from models.catalog import DEFAULT_CATALOG_PATH
+
+CASES = {
+    "json.load (indented JSON)": """
+with open(JSON_PATH, encoding="utf-8") as f:
+    clubs = json.load(f)
+""",
+    "JSON Lines, open index only": """
+clubs = CatalogReader(JSONL_PATH)
+""",
+    "JSON Lines, open + 10 clubs": """
+clubs = CatalogReader(JSONL_PATH)
+for key in list(clubs)[:10]:
+    clubs[key]
+""",
+    "JSON Lines, every club": """
+clubs = dict(CatalogReader(JSONL_PATH).items())
+""",
+    "serving, club dicts": """
+clubs = add_search_text(load_clubs(JSON_PATH), search_text_cache_path(JSON_PATH))
+""",
+    "serving, compact Club records": """
+clubs = load_compact_clubs(JSON_PATH)
+""",
+}
+
+TEMPLATE = """
+import json, resource, time, tracemalloc
+from data_collection.catalog_store import CatalogReader
+from models.catalog import add_search_text, load_clubs, load_compact_clubs, search_text_cache_path
+JSON_PATH, JSONL_PATH = {json_path!r}, {jsonl_path!r}
+before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.perf_counter()
+{body}
+elapsed = time.perf_counter() - start
+after = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+tracemalloc.start()
+{body}
+retained = tracemalloc.get_traced_memory()[0]
+print(json.dumps({{"ms": elapsed * 1000, "rss_kb": after - before, "heap_kb": retained // 1024}}))
+"""
+
+
+def run_case(body, json_path, jsonl_path, repeat=5):
+    runs = []
+    for _ in range(repeat):
+        code = TEMPLATE.format(json_path=json_path, jsonl_path=jsonl_path, body=body)
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout))
+    return (min(r["ms"] for r in runs), min(r["rss_kb"] for r in runs),
+            min(r["heap_kb"] for r in runs))
+
+
+def main():
+    jsonl_path = convert_json_catalog(DEFAULT_CATALOG_PATH)
+    print(f"{'case':<30} {'load ms':>8} {'peak RSS +KB':>13} {'heap KB':>8}")
+    for name, body in CASES.items():
+        ms, rss_kb, heap_kb = run_case(body, DEFAULT_CATALOG_PATH, jsonl_path)
+        print(f"{name:<30} {ms:>8.2f} {rss_kb:>13} {heap_kb:>8}")
+
+
+if __name__ == "__main__":
+    main()
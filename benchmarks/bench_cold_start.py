@@ -0,0 +1,83 @@
+"""
+Cold start of the API: import time, then warm-up (catalog load and strategy
+build) and the first request, with and without a prebuilt snapshot.
+
+Every case runs in a fresh interpreter. Also lists which top level packages
+`import main` spends its time in (from `python -X importtime`). Run from
+the project root:
+    python -m benchmarks.bench_cold_start
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+
+from models.catalog import DEFAULT_CATALOG_PATH
+from models.snapshot import build_snapshot
+
+STRATEGIES = ["survey", "bm25", "fuzzy"]
+
+TEMPLATE = """
+import json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+from controllers.main_controller import get_recommendations_for_request, warm_up
+warm_up()
+warmed = time.perf_counter()
+get_recommendations_for_request({"interests": "robotics, basketball"})
+done = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "warm_up_ms": (warmed - imported) * 1000,
+                  "first_request_ms": (done - warmed) * 1000}))
+"""
+
+
+def run_case(catalog_path, strategy, repeat=3):
+    env = dict(os.environ, CLUB_CATALOG_PATH=catalog_path, CLUB_MATCH_STRATEGY=strategy,
+               PYTHONPATH=os.getcwd())
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", TEMPLATE], capture_output=True, text=True,
+                             check=True, env=env)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return {key: min(run[key] for run in runs) for key in runs[0]}
+
+
+def import_breakdown(top=8):
+    """Cumulative import time of `main` per top level package, in ms."""
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                         capture_output=True, text=True, check=True)
+    totals = defaultdict(float)
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        totals[name.strip().split(".")[0]] += int(self_us) / 1000
+    return sorted(totals.items(), key=lambda item: -item[1])[:top]
+
+
+def main():
+    print("import main, by package:")
+    for package, ms in import_breakdown():
+        print(f"  {package:<24} {ms:>7.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, os.path.basename(DEFAULT_CATALOG_PATH))
+        shutil.copy2(DEFAULT_CATALOG_PATH, catalog_path)
+
+        print(f"\n{'strategy':<10} {'snapshot':<9} {'import ms':>10} {'warm-up ms':>11} {'1st request ms':>15}")
+        for snapshot in (False, True):
+            if snapshot:
+                build_snapshot(catalog_path)
+            for strategy in STRATEGIES:
+                # the first run without a snapshot also writes the search text cache
+                result = run_case(catalog_path, strategy)
+                print(f"{strategy:<10} {'yes' if snapshot else 'no':<9} {result['import_ms']:>10.1f} "
+                      f"{result['warm_up_ms']:>11.1f} {result['first_request_ms']:>15.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Compare recommendation strategies on the real club catalog.
+
+Run from the project root:
+    python -m benchmarks.bench_strategies
+"""
+import time
+from typing import Dict, List
+
+from models.bm25 import BM25Recommender
+from models.catalog import CatalogManager, DEFAULT_CATALOG_PATH
+from models.embedding import EmbeddingRecommender
+from models.fuzzy import FuzzyRecommender
+from models.inverted_index import InvertedIndexRecommender
+from models.recommender import SurveyRecommender
+
+QUERIES = [
+    "engineering, robotics",
+    "engineering, robotics, community service, basketball",
+    "club, student",
+    "music, dance, theatre",
+    "robot",
+    "a",
+    "computer science, hackathon, coding",
+]
+
+REPEAT = 20
+
+
+def time_strategy(strategy, queries: List[str], repeat: int = REPEAT) -> float:
+    """Average milliseconds per query."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for interests in queries:
+            strategy.recommend({"interests": interests})
+    return (time.perf_counter() - start) * 1000 / (repeat * len(queries))
+
+
+def check_parity(baseline, candidate, queries: List[str]) -> Dict[str, bool]:
+    return {
+        interests: baseline.recommend({"interests": interests}) ==
+        candidate.recommend({"interests": interests})
+        for interests in queries
+    }
+
+
+def main():
+    catalog = CatalogManager(DEFAULT_CATALOG_PATH).get_catalog()
+    print(f"Catalog: {len(catalog)} clubs")
+
+    start = time.perf_counter()
+    substring = InvertedIndexRecommender(catalog, substring_mode=True)
+    print(f"Index build: {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    strategies = [
+        SurveyRecommender(catalog),
+        substring,
+        InvertedIndexRecommender(catalog),
+        BM25Recommender(catalog),
+        BM25Recommender(catalog, scheme="tfidf"),
+        FuzzyRecommender(catalog),
+        EmbeddingRecommender(catalog),
+    ]
+
+    baseline_ms = None
+    for strategy in strategies:
+        ms = time_strategy(strategy, QUERIES)
+        baseline_ms = baseline_ms or ms
+        print(f"{strategy.name:<28} {ms:8.3f} ms/query  {baseline_ms / ms:6.1f}x")
+
+    parity = check_parity(strategies[0], substring, QUERIES)
+    mismatched = [q for q, same in parity.items() if not same]
+    print(f"Substring mode parity with survey: {len(QUERIES) - len(mismatched)}/{len(QUERIES)}")
+    for interests in mismatched:
+        print(f"  mismatch: {interests!r}")
+
+
+if __name__ == "__main__":
+    main()
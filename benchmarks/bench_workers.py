@@ -0,0 +1,86 @@
+"""
+Memory of several API worker processes serving the same catalog: each
+loading its own copy, versus all of them attaching to the shared catalog
+snapshot (CLUB_MATCH_SHARED_CATALOG=1).
+
+Every worker warms up and serves one request, then all of them report
+their memory at the same time, so pages they share are split between them
+in PSS. Linux only (reads /proc/self/smaps_rollup). Run from the project
+root:
+    python -m benchmarks.bench_workers
+"""
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from models.catalog import DEFAULT_CATALOG_PATH
+
+WORKERS = [1, 4]
+STRATEGIES = ["bm25", "fuzzy"]
+
+TEMPLATE = """
+import json, sys, time
+start = time.perf_counter()
+from controllers.main_controller import get_recommendations_for_request, warm_up
+warm_up()
+get_recommendations_for_request({"interests": "robotics, basketball"})
+warm_up_ms = (time.perf_counter() - start) * 1000
+print("ready", flush=True)
+sys.stdin.readline()
+memory = {}
+with open("/proc/self/smaps_rollup") as f:
+    for line in f:
+        name, _, value = line.partition(":")
+        if name in ("Rss", "Pss", "Private_Clean", "Private_Dirty"):
+            memory[name] = int(value.split()[0]) / 1024
+print(json.dumps(dict(memory, warm_up_ms=warm_up_ms)), flush=True)
+"""
+
+
+def run_case(catalog_path, strategy, workers, shared):
+    env = dict(os.environ, CLUB_CATALOG_PATH=catalog_path, CLUB_MATCH_STRATEGY=strategy,
+               CLUB_MATCH_SHARED_CATALOG='1' if shared else '0', CLUB_MATCH_POPULAR_SIZE='0',
+               PYTHONPATH=os.getcwd())
+    processes = [
+        subprocess.Popen([sys.executable, "-c", TEMPLATE], stdin=subprocess.PIPE,
+                         stdout=subprocess.PIPE, text=True, env=env)
+        for _ in range(workers)
+    ]
+    for process in processes:
+        assert process.stdout.readline().strip() == "ready"
+    for process in processes:
+        process.stdin.write("\n")
+        process.stdin.flush()
+    reports = [json.loads(process.communicate()[0]) for process in processes]
+    return {
+        "pss_mb": sum(report["Pss"] for report in reports),
+        "private_mb": sum(report["Private_Dirty"] for report in reports) / workers,
+        "warm_up_ms": max(report["warm_up_ms"] for report in reports),
+    }
+
+
+def main():
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        print("needs Linux /proc/self/smaps_rollup")
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        catalog_path = os.path.join(tmp, os.path.basename(DEFAULT_CATALOG_PATH))
+        shutil.copy2(DEFAULT_CATALOG_PATH, catalog_path)
+
+        print(f"{'strategy':<9} {'workers':>7} {'shared':<7} {'total PSS MB':>13} "
+              f"{'private MB/worker':>18} {'warm-up ms':>11}")
+        for strategy in STRATEGIES:
+            for workers in WORKERS:
+                for shared in (False, True):
+                    result = run_case(catalog_path, strategy, workers, shared)
+                    print(f"{strategy:<9} {workers:>7} {'yes' if shared else 'no':<7} "
+                          f"{result['pss_mb']:>13.1f} {result['private_mb']:>18.1f} "
+                          f"{result['warm_up_ms']:>11.1f}")
+
+
+if __name__ == "__main__":
+    main()
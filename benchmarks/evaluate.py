@@ -0,0 +1,191 @@
+"""
+Offline evaluation: ranking quality against latency for every registered
+strategy, to pick the default on data.
+
+Queries come from a labeled file (--queries, NDJSON, one per line):
+    {"interests": "robotics, aerospace", "relevant": ["<club id>", ...]}
+where "relevant" may also map club ids to graded relevance ({"<id>": 2}).
+Without one, a synthetic known-item set is generated from the catalog:
+each query is the distinctive words of a club's name and the relevant
+clubs are the ones whose name has all of them. Names aren't the only text
+strategies match against, so this rewards finding the club a student is
+describing, not reproducing any one strategy.
+
+For each strategy (built on its own copy of the catalog, so nothing is
+shared) it reports precision@10 and NDCG@10, p50/p95/p99 latency, the
+build time and the memory its catalog copy and indexes keep, and how
+closely its top 10 follows the survey strategy's (overlap, and share of
+identical rankings). Run from the project root:
+    python -m benchmarks.evaluate
+    python -m benchmarks.evaluate --queries labeled.ndjson -s survey -s bm25 --output eval.json
+"""
+import argparse
+import gc
+import json
+import math
+import random
+import sys
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from benchmarks.stats import percentile
+from controllers.main_controller import STRATEGIES
+from models.catalog import DEFAULT_CATALOG_PATH, Club, ClubCatalog, load_compact_clubs
+from models.inverted_index import tokenize
+from models.query_planner import STOPWORDS
+
+K = 10
+SYNTHETIC_QUERIES = 200
+
+# Name words that say nothing about what a club does
+GENERIC_WORDS = frozenset({
+    'association', 'at', 'chapter', 'club', 'clubs', 'committee', 'council', 'group', 'inc',
+    'organization', 'program', 'society', 'student', 'students', 'team', 'tech', 'union',
+    'university', 'virginia', 'vt',
+})
+
+
+def synthetic_queries(clubs: Dict[str, Club], count: int = SYNTHETIC_QUERIES,
+                      seed: int = 0) -> List[Dict[str, Any]]:
+    """Known-item queries built from club names, see the module docstring."""
+    names = {key: set(tokenize(club.name or '')) for key, club in clubs.items()}
+    keys = list(clubs)
+    random.Random(seed).shuffle(keys)
+    queries = []
+    for key in keys:
+        words = [word for word in tokenize(clubs[key].name or '')
+                 if len(word) > 2 and word not in GENERIC_WORDS and word not in STOPWORDS]
+        words = list(dict.fromkeys(words))[:2]
+        if not words:
+            continue
+        relevant = [other for other, tokens in names.items() if tokens.issuperset(words)]
+        # too generic to say which club is meant
+        if len(relevant) > K:
+            continue
+        queries.append({'interests': ', '.join(words), 'relevant': {other: 1 for other in relevant}})
+        if len(queries) == count:
+            break
+    return queries
+
+
+def load_queries(path: str) -> List[Dict[str, Any]]:
+    """Labeled queries from an NDJSON file, with "relevant" as {club id: grade}."""
+    queries = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            query = json.loads(line)
+            relevant = query.get('relevant', {})
+            if isinstance(relevant, list):
+                relevant = {key: 1 for key in relevant}
+            queries.append(dict(query, relevant=relevant))
+    return queries
+
+
+def precision_at_k(ranked: List[str], relevant: Dict[str, float], k: int = K) -> float:
+    return sum(1 for key in ranked[:k] if relevant.get(key, 0) > 0) / k
+
+
+def ndcg_at_k(ranked: List[str], relevant: Dict[str, float], k: int = K) -> float:
+    dcg = sum(relevant.get(key, 0) / math.log2(i + 2) for i, key in enumerate(ranked[:k]))
+    ideal = sorted(relevant.values(), reverse=True)[:k]
+    idcg = sum(grade / math.log2(i + 2) for i, grade in enumerate(ideal))
+    return dcg / idcg if idcg else 0.0
+
+
+def build(name: str, clubs: Dict[str, Club]):
+    """Build a strategy on a fresh catalog, returning it with build ms and retained MB."""
+    gc.collect()
+    tracemalloc.start()
+    factory = STRATEGIES[name]
+    # the catalog holds the strategy's derived indexes, both have to stay alive
+    catalog = ClubCatalog(clubs)
+    strategy = factory(catalog)
+    gc.collect()
+    memory_mb = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+    del catalog, strategy
+
+    # timed separately, tracemalloc slows allocation down
+    start = time.perf_counter()
+    strategy = factory(ClubCatalog(clubs))
+    return strategy, (time.perf_counter() - start) * 1000, memory_mb
+
+
+def evaluate(strategy, queries: List[Dict[str, Any]], keys: List[str], repeat: int,
+             baseline: Optional[List[List[str]]] = None) -> Dict[str, Any]:
+    rankings = []
+    latencies: List[float] = []
+    for query in queries:
+        user_data = {'interests': query['interests'], 'top_k': K}
+        for _ in range(repeat):
+            start = time.perf_counter()
+            ranked = strategy.rank(user_data)
+            latencies.append((time.perf_counter() - start) * 1000)
+        rankings.append([keys[doc] for doc, _ in ranked])
+
+    results = {
+        'precision_at_10': sum(precision_at_k(r, q['relevant']) for r, q in zip(rankings, queries)) / len(queries),
+        'ndcg_at_10': sum(ndcg_at_k(r, q['relevant']) for r, q in zip(rankings, queries)) / len(queries),
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'p99_ms': percentile(latencies, 99),
+    }
+    if baseline is not None:
+        results['overlap_at_10'] = sum(
+            len(set(r) & set(b)) / max(len(b), 1) for r, b in zip(rankings, baseline) if b
+        ) / max(1, sum(1 for b in baseline if b))
+        results['same_ranking'] = sum(r == b for r, b in zip(rankings, baseline)) / len(queries)
+    return dict(results, rankings=rankings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", default=DEFAULT_CATALOG_PATH)
+    parser.add_argument("--queries", help="labeled queries (NDJSON), synthetic ones otherwise")
+    parser.add_argument("-s", "--strategy", action="append", choices=sorted(STRATEGIES),
+                        help="strategy to evaluate, repeatable (default: every registered one)")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per query")
+    parser.add_argument("--output", help="also write the results as JSON")
+    args = parser.parse_args(argv)
+
+    clubs = load_compact_clubs(args.catalog)
+    keys = list(clubs)
+    queries = load_queries(args.queries) if args.queries else synthetic_queries(clubs)
+    names = args.strategy or list(STRATEGIES)
+    # survey goes first, everything is compared with its rankings
+    names = ['survey'] + [name for name in names if name != 'survey']
+    print(f"{len(clubs)} clubs, {len(queries)} {'labeled' if args.queries else 'synthetic'} queries",
+          file=sys.stderr)
+
+    results: Dict[str, Dict[str, Any]] = {}
+    baseline = None
+    for name in names:
+        print(f"evaluating {name}...", file=sys.stderr)
+        strategy, build_ms, memory_mb = build(name, clubs)
+        results[name] = dict(evaluate(strategy, queries, keys, args.repeat, baseline),
+                             build_ms=build_ms, memory_mb=memory_mb)
+        if baseline is None:
+            baseline = results[name]['rankings']
+
+    print(f"\n{'strategy':<26} {'P@10':>6} {'NDCG@10':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'build ms':>9} {'index MB':>9} {'overlap':>8} {'same':>6}")
+    for name, stats in results.items():
+        overlap = f"{stats['overlap_at_10']:>8.2f}" if 'overlap_at_10' in stats else f"{'-':>8}"
+        same = f"{stats['same_ranking']:>6.0%}" if 'same_ranking' in stats else f"{'-':>6}"
+        print(f"{name:<26} {stats['precision_at_10']:>6.3f} {stats['ndcg_at_10']:>8.3f} "
+              f"{stats['p50_ms']:>8.2f} {stats['p95_ms']:>8.2f} {stats['p99_ms']:>8.2f} "
+              f"{stats['build_ms']:>9.1f} {stats['memory_mb']:>9.1f} {overlap} {same}")
+
+    if args.output:
+        summary = {name: {key: value for key, value in stats.items() if key != 'rankings'}
+                   for name, stats in results.items()}
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({'queries': len(queries), 'strategies': summary}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
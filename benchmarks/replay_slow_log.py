@@ -0,0 +1,81 @@
+"""
+Replay a slow query log (CLUB_MATCH_SLOW_LOG, see models/profiling.py)
+against recommendation strategies and compare their latency per query.
+
+Each logged query is scored with every strategy named on the command line
+(any name in the controller's STRATEGIES), built on the current catalog.
+Run from the project root:
+    python -m benchmarks.replay_slow_log slow_queries.ndjson -s survey -s bm25
+"""
+import argparse
+import sys
+import time
+from typing import Any, Dict, List
+
+from benchmarks.stats import percentile
+from controllers.main_controller import STRATEGIES, get_strategy
+from models.catalog import get_catalog_manager
+from models.profiling import read_slow_log
+
+
+def replay_request(record: Dict[str, Any]) -> Dict[str, Any]:
+    """The request a log record was made from (normalized interests, top_k, filters)."""
+    user_data: Dict[str, Any] = {'interests': ', '.join(record.get('keywords', [])),
+                                 'top_k': record.get('top_k', 10)}
+    user_data.update(record.get('filters') or {})
+    return user_data
+
+
+def time_query(strategy, user_data: Dict[str, Any], repeat: int) -> float:
+    """Best of `repeat` runs, in ms."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        strategy.recommend(user_data)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("log", help="slow query log (NDJSON)")
+    parser.add_argument("-s", "--strategy", action="append", choices=sorted(STRATEGIES),
+                        help="strategy to replay against, repeatable (default: each record's own)")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per query, the fastest counts")
+    parser.add_argument("--limit", type=int, default=0, help="only the first N records")
+    args = parser.parse_args(argv)
+
+    records = [record for record in read_slow_log(args.log) if record.get('keywords')]
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        print(f"no queries in {args.log}")
+        return 1
+
+    catalog = get_catalog_manager().get_catalog()
+    names = args.strategy or sorted({record['strategy'] for record in records if record.get('strategy') in STRATEGIES})
+    strategies = {name: get_strategy(catalog, name) for name in names}
+
+    timings: Dict[str, List[float]] = {name: [] for name in names}
+    print(f"{'logged ms':>10} {'matched':>8} " + " ".join(f"{name + ' ms':>12}" for name in names) + "  interests")
+    for record in records:
+        user_data = replay_request(record)
+        row = []
+        for name, strategy in strategies.items():
+            ms = time_query(strategy, user_data, args.repeat)
+            timings[name].append(ms)
+            row.append(f"{ms:>12.2f}")
+        matched = record.get('matched')
+        print(f"{record.get('total_ms', 0):>10.1f} {'' if matched is None else matched:>8} "
+              + " ".join(row) + f"  {user_data['interests'][:60]}")
+
+    print(f"\n{len(records)} queries")
+    for name in names:
+        values = timings[name]
+        print(f"{name:<26} p50 {percentile(values, 50):8.2f} ms  p95 {percentile(values, 95):8.2f} ms  "
+              f"max {max(values):8.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+"""Summary statistics shared by the benchmark scripts."""
+import math
+from typing import Iterable
+
+
+def percentile(samples: Iterable[float], p: float) -> float:
+    """The p-th percentile (0-100) of the samples, by the nearest-rank method."""
+    ordered = sorted(samples)
+    if not ordered:
+        raise ValueError("percentile of no samples")
+    return ordered[max(0, min(len(ordered), math.ceil(len(ordered) * p / 100)) - 1)]
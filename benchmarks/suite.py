@@ -0,0 +1,241 @@
+"""
+Benchmark suite for the recommend path, for catching regressions.
+
+Measures, for the real catalog and synthetic 10k/100k club catalogs:
+  - catalog load time (cold: conversion and text normalization, warm: cached,
+    snapshot: prebuilt catalog and index from models.snapshot)
+  - single-query latency per strategy (p50/p95)
+  - batch throughput per strategy
+and end-to-end /api/v1/recommend requests/sec with concurrent clients over
+an in-process ASGI client. Run from the project root:
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --compare baseline.json
+--compare exits with status 1 when any metric is more than --tolerance
+worse than the baseline, so CI can fail on regressions.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from benchmarks.bench_strategies import QUERIES
+from benchmarks.stats import percentile
+from benchmarks.synthetic import real_clubs, synthetic_clubs
+from models.catalog import DEFAULT_CATALOG_PATH, CatalogManager, ClubCatalog, load_json_clubs
+from models.snapshot import build_snapshot
+
+SIZES = [10_000, 100_000]
+BATCH_SIZE = 256
+E2E_REQUESTS = 400
+E2E_CONCURRENCY = 16
+
+
+def best_of(fn: Callable[[], Any], repeat: int = 3) -> float:
+    """Fastest of `repeat` runs, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def bench_catalog_load(path: str) -> Dict[str, float]:
+    cold_start = time.perf_counter()
+    CatalogManager(path).get_catalog()
+    cold_ms = (time.perf_counter() - cold_start) * 1000
+    results = {
+        "json_load_ms": best_of(lambda: load_json_clubs(path)),
+        "cold_ms": cold_ms,
+        "warm_ms": best_of(lambda: CatalogManager(path).get_catalog()),
+    }
+    # removed again so the strategy build times below still include indexing
+    snapshot = build_snapshot(path)
+    results["snapshot_ms"] = best_of(lambda: CatalogManager(path).get_catalog())
+    os.remove(snapshot)
+    return results
+
+
+def bench_strategy(strategy, repeat: int) -> Dict[str, float]:
+    latencies = []
+    for _ in range(repeat):
+        for interests in QUERIES:
+            start = time.perf_counter()
+            strategy.recommend({"interests": interests})
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    batch = [{"interests": QUERIES[i % len(QUERIES)]} for i in range(BATCH_SIZE)]
+    batch_ms = best_of(lambda: strategy.recommend_batch(batch), repeat=1)
+    return {
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "batch_queries_per_s": BATCH_SIZE / (batch_ms / 1000),
+    }
+
+
+def bench_catalog(path: str, repeat: int) -> Dict[str, Any]:
+    from controllers.main_controller import STRATEGIES
+
+    results: Dict[str, Any] = {"load": bench_catalog_load(path)}
+    catalog: ClubCatalog = CatalogManager(path).get_catalog()
+    results["clubs"] = len(catalog)
+    for name, factory in STRATEGIES.items():
+        start = time.perf_counter()
+        strategy = factory(catalog)
+        build_ms = (time.perf_counter() - start) * 1000
+        results[name] = dict(bench_strategy(strategy, repeat), build_ms=build_ms)
+    return results
+
+
+async def _run_clients(app, requests: int, concurrency: int) -> Dict[str, float]:
+    import httpx
+
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async def client_loop(client):
+        for i in remaining:
+            start = time.perf_counter()
+            response = await client.post("/api/v1/recommend", json={"interests": QUERIES[i % len(QUERIES)]})
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # first request loads the catalog and builds the strategy
+        await client.post("/api/v1/recommend", json={"interests": QUERIES[0]})
+        start = time.perf_counter()
+        await asyncio.gather(*(client_loop(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "requests_per_s": requests / elapsed,
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+    }
+
+
+def bench_end_to_end(catalog_path: str, requests: int, concurrency: int) -> Dict[str, Any]:
+    os.environ["CLUB_CATALOG_PATH"] = catalog_path
+    from controllers import main_controller
+    from main import app
+
+    # The controller was already imported by bench_catalog, so its result
+    # cache and popular results are switched off on the live objects: every
+    # request is scored (identical concurrent ones still share one scoring)
+    main_controller.result_cache.max_entries = 0
+    main_controller.result_cache.clear()
+    main_controller.popular_results.size = 0
+
+    return dict(
+        asyncio.run(_run_clients(app, requests, concurrency)),
+        concurrency=concurrency,
+        strategy=os.environ.get("CLUB_MATCH_STRATEGY", "survey"),
+    )
+
+
+def run_suite(sizes: List[int], repeat: int, e2e_requests: int, e2e_concurrency: int) -> Dict[str, Any]:
+    results: Dict[str, Any] = {
+        "meta": {
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "catalogs": {},
+    }
+    real = real_clubs()
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in [0] + sizes:
+            label = "real" if size == 0 else str(size)
+            path = os.path.join(tmp, f"clubs_{label}.json")
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(real if size == 0 else synthetic_clubs(real, size), f, ensure_ascii=False)
+            print(f"benchmarking {label} catalog...", file=sys.stderr)
+            results["catalogs"][label] = bench_catalog(path, repeat)
+
+    print("benchmarking end to end...", file=sys.stderr)
+    results["end_to_end"] = bench_end_to_end(DEFAULT_CATALOG_PATH, e2e_requests, e2e_concurrency)
+    return results
+
+
+def flatten(results: Dict[str, Any], prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{name}."))
+        elif isinstance(value, float):
+            flat[name] = value
+    return flat
+
+
+def compare(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics that got worse than the baseline by more than `tolerance` (a fraction)."""
+    old, new = flatten(baseline), flatten(current)
+    regressions = []
+    for name in sorted(old.keys() & new.keys()):
+        if name.startswith("meta.") or old[name] <= 0:
+            continue
+        higher_is_better = name.endswith("_per_s")
+        change = (old[name] - new[name]) / old[name] if higher_is_better else (new[name] - old[name]) / old[name]
+        if change > tolerance:
+            regressions.append(f"{name}: {old[name]:.3f} -> {new[name]:.3f} ({change:+.0%} worse)")
+    return regressions
+
+
+def print_summary(results: Dict[str, Any]) -> None:
+    for label, catalog in results["catalogs"].items():
+        load = catalog["load"]
+        print(f"\n{label} catalog ({catalog['clubs']} clubs): load cold {load['cold_ms']:.1f} ms, "
+              f"warm {load['warm_ms']:.1f} ms, snapshot {load['snapshot_ms']:.1f} ms, "
+              f"json.load {load['json_load_ms']:.1f} ms")
+        print(f"  {'strategy':<26} {'build ms':>9} {'p50 ms':>8} {'p95 ms':>8} {'batch q/s':>10}")
+        for name, stats in catalog.items():
+            if name in ("load", "clubs"):
+                continue
+            print(f"  {name:<26} {stats['build_ms']:>9.1f} {stats['p50_ms']:>8.3f} "
+                  f"{stats['p95_ms']:>8.3f} {stats['batch_queries_per_s']:>10.0f}")
+    e2e = results["end_to_end"]
+    print(f"\nend to end ({e2e['strategy']}, {e2e['concurrency']} clients): "
+          f"{e2e['requests_per_s']:.0f} req/s, p50 {e2e['p50_ms']:.2f} ms, p95 {e2e['p95_ms']:.2f} ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="*", default=SIZES, help="synthetic catalog sizes")
+    parser.add_argument("--repeat", type=int, default=5, help="passes over the query set per strategy")
+    parser.add_argument("--requests", type=int, default=E2E_REQUESTS)
+    parser.add_argument("--concurrency", type=int, default=E2E_CONCURRENCY)
+    parser.add_argument("--output", help="write results as JSON (e.g. a baseline for CI)")
+    parser.add_argument("--compare", help="baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown as a fraction")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.sizes, args.repeat, args.requests, args.concurrency)
+    print_summary(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nwrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            regressions = compare(json.load(f), results, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions over {args.tolerance:.0%}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
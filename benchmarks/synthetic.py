@@ -0,0 +1,59 @@
+"""
+Synthetic club catalogs in the gobblerconnect_clubs.json schema.
+
+Each synthetic club copies the fields of a randomly picked real club and
+gets a unique id and name. Its summary and description are stitched
+together from sentences of several real clubs, so texts differ from club
+to club while word statistics stay close to the real data. Write one to
+disk from the project root:
+    python -m benchmarks.synthetic SIZE OUTPUT_PATH
+"""
+import json
+import random
+import re
+import sys
+from typing import Any, Dict, List
+
+from models.catalog import DEFAULT_CATALOG_PATH, load_json_clubs
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def _sentences(text: str) -> List[str]:
+    return [s for s in SENTENCE_END.split(text or "") if s.strip()]
+
+
+def synthetic_clubs(real: Dict[str, Any], size: int, seed: int = 0) -> Dict[str, Any]:
+    """`size` synthetic clubs built from the `real` catalog, keyed by id like the scraper writes them."""
+    rng = random.Random(seed)
+    source = list(real.values())
+    summaries = [s for club in source for s in _sentences(club.get("summary", ""))]
+    descriptions = [s for club in source for s in _sentences(club.get("description_html", ""))]
+
+    clubs = {}
+    for i in range(size):
+        template = rng.choice(source)
+        club_id = str(1_000_000 + i)
+        clubs[club_id] = dict(
+            template,
+            id=club_id,
+            name=f"{template.get('name', 'Club')} {i}",
+            summary=" ".join(rng.sample(summaries, min(2, len(summaries)))),
+            description_html=" ".join(rng.sample(descriptions, min(6, len(descriptions)))),
+        )
+    return clubs
+
+
+def real_clubs() -> Dict[str, Any]:
+    return load_json_clubs(DEFAULT_CATALOG_PATH)
+
+
+def write_synthetic_catalog(size: int, path: str, seed: int = 0) -> str:
+    """Write a synthetic catalog as JSON, the same format the scraper produces."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(synthetic_clubs(real_clubs(), size, seed), f, ensure_ascii=False)
+    return path
+
+
+if __name__ == "__main__":
+    write_synthetic_catalog(int(sys.argv[1]), sys.argv[2])
@@ -0,0 +1,35 @@
+import math
+
+import pytest
+
+from benchmarks.evaluate import ndcg_at_k, precision_at_k
+from benchmarks.stats import percentile
+
+
+def test_precision_counts_relevant_results_in_top_k():
+    relevant = {"a": 1, "b": 1, "c": 1}
+    assert precision_at_k(["a", "x", "b"], relevant) == 0.2
+    assert precision_at_k(["a", "x", "b"], relevant, k=2) == 0.5
+
+
+def test_ndcg_binary_gains():
+    # dcg = 1 + 1/log2(4) = 1.5, ideal = 1 + 1/log2(3) + 1/log2(4)
+    ndcg = ndcg_at_k(["a", "x", "b"], {"a": 1, "b": 1, "c": 1}, k=3)
+    assert ndcg == pytest.approx(1.5 / 2.1309297535714578)
+    assert ndcg == pytest.approx(0.70392, abs=1e-5)
+
+
+def test_ndcg_graded_gains_and_perfect_ranking():
+    # dcg = 1 + 2/log2(3), ideal = 2 + 1/log2(3)
+    assert ndcg_at_k(["b", "a"], {"a": 2, "b": 1}) == pytest.approx((1 + 2 / math.log2(3)) / (2 + 1 / math.log2(3)))
+    assert ndcg_at_k(["a", "b"], {"a": 2, "b": 1}) == 1.0
+    assert ndcg_at_k(["x"], {}) == 0.0
+
+
+def test_percentile_nearest_rank():
+    samples = list(range(1, 101))
+    assert percentile(samples, 50) == 50
+    assert percentile(samples, 99) == 99
+    assert percentile(samples, 100) == 100
+    assert percentile([5.0], 95) == 5.0
+    assert percentile([3, 1, 2], 0) == 1
@@ -0,0 +1,6 @@
+# Keeps the project root importable (models.*, controllers.*) no matter
+# which test directory pytest starts collecting from.
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -2,13 +2,168 @@
 
 # main_blueprint = Blueprint('main', __name__)
 
-from typing import List, Dict, Any
-from models.recommender import RecommenderContext, SurveyRecommender
+import os
+from typing import List, Dict, Any, Awaitable, Callable, Tuple
+from models.bm25 import BM25Recommender
+from models.catalog import ClubCatalog, get_catalog_manager
+from models.embedding import EmbeddingRecommender
+from models.fuzzy import FuzzyRecommender
+from models.hybrid import CategoryRecommender, HybridRecommender
+from models.inverted_index import InvertedIndexRecommender
+from models.metrics import annotate, current_request, label_strategy, timed
+from models.popular import PopularResults, load_seed
+from models.profiling import Profiler, SlowQueryLog, profile_request
+from models.filters import filter_key
+from models.recommender import (
+    RecommendationStrategy,
+    RecommenderContext,
+    SurveyRecommender,
+    normalize_keywords,
+    requested_top_k,
+)
+from models.result_cache import ResultCache
+from models.single_flight import SingleFlight
+
+# Strategies that can serve requests, each built once per catalog snapshot
+STRATEGIES: Dict[str, Callable[[ClubCatalog], RecommendationStrategy]] = {
+    'survey': SurveyRecommender,
+    'inverted_index': InvertedIndexRecommender,
+    'inverted_index_substring': lambda catalog: InvertedIndexRecommender(catalog, substring_mode=True),
+    'bm25': BM25Recommender,
+    'tfidf': lambda catalog: BM25Recommender(catalog, scheme='tfidf'),
+    'fuzzy': FuzzyRecommender,
+    'embedding': EmbeddingRecommender,
+    'category': CategoryRecommender,
+    'hybrid': lambda catalog: HybridRecommender(
+        catalog,
+        [(get_strategy(catalog, name), weight) for name, weight in HYBRID_COMPONENTS],
+        fusion=HYBRID_FUSION,
+    ),
+}
+
+DEFAULT_STRATEGY = os.environ.get('CLUB_MATCH_STRATEGY', 'survey')
+
+def parse_components(spec: str) -> List[Tuple[str, float]]:
+    """Parse "bm25:1,fuzzy:0.5" into [('bm25', 1.0), ('fuzzy', 0.5)]."""
+    components = []
+    for part in spec.split(','):
+        name, _, weight = part.strip().partition(':')
+        if name:
+            components.append((name, float(weight or 1.0)))
+    return components
+
+# Strategies the hybrid strategy fuses, with their weights, and how it fuses them
+HYBRID_COMPONENTS = parse_components(os.environ.get('CLUB_MATCH_HYBRID', 'bm25:1,fuzzy:0.5,category:0.5'))
+HYBRID_FUSION = os.environ.get('CLUB_MATCH_FUSION', 'rrf')
+
+# How many batch requests are scored together before results are sent back
+BATCH_CHUNK_SIZE = 64
+
+# Results for popular interest sets, dropped whenever the catalog reloads
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('CLUB_MATCH_CACHE_SIZE', '1024')),
+    ttl=float(os.environ.get('CLUB_MATCH_CACHE_TTL', '300')),
+)
+get_catalog_manager().add_reload_listener(result_cache.clear)
+
+# Precomputed results for the most requested interest sets (plus a seed list),
+# kept up to date by a background thread and recomputed when the catalog reloads
+popular_results = PopularResults(
+    size=int(os.environ.get('CLUB_MATCH_POPULAR_SIZE', '500')),
+    seed=load_seed(os.environ['CLUB_MATCH_POPULAR_SEED']) if os.environ.get('CLUB_MATCH_POPULAR_SEED') else (),
+)
+POPULAR_REFRESH_INTERVAL = float(os.environ.get('CLUB_MATCH_POPULAR_INTERVAL', '60'))
+get_catalog_manager().add_reload_listener(popular_results.wake)
+
+# Opt-in per request profiling and the log of slow recommendation requests
+profiler = Profiler(
+    rate=float(os.environ.get('CLUB_MATCH_PROFILE_RATE', '0')),
+    allow_header=os.environ.get('CLUB_MATCH_PROFILE_HEADER', '0') == '1',
+    directory=os.environ.get('CLUB_MATCH_PROFILE_DIR'),
+)
+slow_queries = SlowQueryLog(
+    os.environ.get('CLUB_MATCH_SLOW_LOG'),
+    threshold_ms=float(os.environ.get('CLUB_MATCH_SLOW_MS', '100')),
+)
+
+# Identical queries that arrive while one is being scored wait for its result
+# instead of scoring it again, e.g. bursts of the same interests at orientation
+single_flight = SingleFlight()
+
+def get_strategy(catalog: ClubCatalog, name: str = DEFAULT_STRATEGY) -> RecommendationStrategy:
+    """Return the named strategy for a catalog snapshot, building it on first use."""
+    return catalog.derived(f'strategy:{name}', STRATEGIES[name])
+
+def warm_up() -> ClubCatalog:
+    """Load the catalog and build the default strategy before the first request."""
+    catalog = get_catalog_manager().get_catalog()
+    get_strategy(catalog)
+    return catalog
+
+def _serving_snapshot() -> Tuple[ClubCatalog, RecommendationStrategy]:
+    catalog = get_catalog_manager().get_catalog()
+    return catalog, get_strategy(catalog)
+
+def start_popular_refresh() -> None:
+    """Start keeping the popular interest results up to date in the background."""
+    popular_results.start(_serving_snapshot, POPULAR_REFRESH_INTERVAL)
+
+def stop_popular_refresh() -> None:
+    popular_results.stop()
 
 def get_recommendations_for_request(user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
     """Get club recommendations based on user interests."""
-    recommender = RecommenderContext(SurveyRecommender())
-    return recommender.get_recommendations(user_data)
+    label_strategy(DEFAULT_STRATEGY)
+    # Hold one snapshot for the whole request so a reload can't swap it mid-way
+    with timed('catalog'):
+        catalog = get_catalog_manager().get_catalog()
+    with timed('strategy'):
+        strategy = get_strategy(catalog)
+    recommender = RecommenderContext(strategy, catalog, result_cache, popular_results, single_flight)
+    with profile_request(profiler, current_request(), strategy.name):
+        return recommender.get_recommendations(user_data)
+
+def query_key(user_data: Dict[str, Any]) -> Tuple[Any, ...]:
+    """What makes two requests the same query for the serving strategy."""
+    keywords = normalize_keywords(user_data.get('interests', ''))
+    return (DEFAULT_STRATEGY, keywords, requested_top_k(user_data), filter_key(user_data))
+
+async def coalesce(user_data: Dict[str, Any],
+                   compute: Callable[[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]]) -> List[Dict[str, Any]]:
+    """
+    Await compute(user_data), sharing the call with an identical query
+    already in flight on this event loop, e.g. one sent to the scoring pool.
+    """
+    key = query_key(user_data)
+    # what the slow query log needs, also for requests that only wait
+    _, keywords, top_k, filters = key
+    annotate('keywords', keywords)
+    annotate('top_k', top_k)
+    if filters:
+        annotate('filters', dict(filters))
+    return await single_flight.do_async(key, lambda: compute(user_data))
+
+def get_batch_recommender() -> RecommenderContext:
+    """
+    A recommender bound to the current catalog snapshot, so every chunk of a
+    batch is scored against the same catalog even if it reloads mid-way.
+    """
+    label_strategy(DEFAULT_STRATEGY)
+    catalog = get_catalog_manager().get_catalog()
+    return RecommenderContext(get_strategy(catalog), catalog, result_cache, popular_results)
+
+def get_cache_stats() -> Dict[str, int]:
+    """Hit, miss and eviction counters for the recommendation result cache."""
+    return result_cache.stats()
+
+def render_coalescing_metrics() -> str:
+    """Request coalescing counters in the Prometheus text format."""
+    return single_flight.render()
+
+def reload_catalog() -> Dict[str, Any]:
+    """Force the shared club catalog to be reloaded from disk."""
+    catalog = get_catalog_manager().reload()
+    return {"version": catalog.version, "clubs": len(catalog)}
 
 def handle_user_input(user_data):
     recs = get_recommendations_for_request(user_data)
@@ -16,4 +171,4 @@ def handle_user_input(user_data):
 
 #simulate user input
 if __name__ == "__main__":
-    handle_user_input({"interests": "engineering, robotics"})
\ No newline at end of file
+    handle_user_input({"interests": "engineering, robotics"})
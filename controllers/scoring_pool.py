@@ -0,0 +1,103 @@
+import asyncio
+import os
+from typing import Any, Dict, List
+
+from controllers.main_controller import (
+    get_recommendations_for_request,
+    reload_catalog,
+    start_popular_refresh,
+    warm_up,
+)
+
+# Number of scoring processes, 0 keeps scoring in the server process
+POOL_WORKERS = int(os.environ.get('CLUB_MATCH_WORKERS', '0'))
+
+# How many requests may wait for a free worker before new ones are turned away
+POOL_MAX_QUEUE = int(os.environ.get('CLUB_MATCH_MAX_QUEUE', '64'))
+
+
+class PoolBusy(Exception):
+    """Raised when the scoring queue is full; the caller should retry later."""
+
+
+# In a worker: the pool's count of forced reloads, and how many this worker has done
+_reloads = None
+_reloads_done = 0
+
+
+def _init_worker(reloads) -> None:
+    global _reloads, _reloads_done
+    _reloads = reloads
+    _reloads_done = reloads.value
+    warm_up()
+    start_popular_refresh()
+
+
+def _recommend_in_worker(user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    global _reloads_done
+    if _reloads is not None and _reloads.value != _reloads_done:
+        _reloads_done = _reloads.value
+        reload_catalog()
+    return get_recommendations_for_request(user_data)
+
+
+class ScoringPool:
+    """
+    Runs recommendation scoring in worker processes so it isn't serialized
+    by the GIL of the server process.
+
+    Each worker loads its own catalog snapshot and result cache, and picks
+    up catalog file changes on its own. A forced reload (`reload`) is done
+    by each worker before the next request it scores. At most `workers` requests are
+    handed to the pool at once; up to `max_queue` more wait for a free
+    worker, and anything beyond that raises PoolBusy straight away.
+    """
+
+    def __init__(self, workers: int, max_queue: int = POOL_MAX_QUEUE):
+        self.workers = workers
+        self.max_queue = max_queue
+        # imported here so servers without a pool don't pay for multiprocessing
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+
+        # spawn instead of fork, the server process may already run threads
+        context = multiprocessing.get_context('spawn')
+        self._reloads = context.Value('i', 0)
+        self.executor = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self._reloads,),
+        )
+        self._slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.rejected = 0
+
+    def warm_up(self) -> None:
+        """Start every worker now rather than on the first requests."""
+        for future in [self.executor.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+
+    async def recommend(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise PoolBusy(f"{self.waiting} requests already waiting for a scoring worker")
+
+        self.waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, _recommend_in_worker, user_data)
+        finally:
+            self._slots.release()
+
+    def reload(self) -> None:
+        """Have every worker force a catalog reload before it scores again."""
+        with self._reloads.get_lock():
+            self._reloads.value += 1
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=True, cancel_futures=True)
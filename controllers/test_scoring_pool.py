@@ -0,0 +1,51 @@
+import asyncio
+import unittest
+
+from main_controller import get_catalog_manager, get_recommendations_for_request
+from scoring_pool import PoolBusy, ScoringPool
+
+
+def catalog_version():
+    return get_catalog_manager().get_catalog().version
+
+
+class TestScoringPool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = ScoringPool(workers=1, max_queue=1)
+        cls.pool.warm_up()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def test_pool_matches_in_process_scoring(self):
+        """Workers give the same answer as scoring in the server process."""
+        user_data = {"interests": "engineering, robotics", "top_k": 5}
+        recs = asyncio.run(self.pool.recommend(user_data))
+        self.assertEqual(recs, get_recommendations_for_request(user_data))
+
+    def test_reload_reaches_workers(self):
+        """A forced reload is done by the worker before its next request."""
+        before = self.pool.executor.submit(catalog_version).result()
+        self.pool.reload()
+        asyncio.run(self.pool.recommend({"interests": "robotics"}))
+        self.assertGreater(self.pool.executor.submit(catalog_version).result(), before)
+
+    def test_full_queue_rejects_requests(self):
+        """Requests beyond the busy worker and the queue limit fail fast."""
+        async def run_three():
+            return await asyncio.gather(
+                *(self.pool.recommend({"interests": f"music {i}"}) for i in range(3)),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run_three())
+        self.assertIsInstance(results[0], list)
+        self.assertIsInstance(results[1], list)
+        self.assertIsInstance(results[2], PoolBusy)
+        self.assertEqual(self.pool.waiting, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+"""
+Streaming JSON Lines catalog format.
+
+One compact JSON record per line ({"key": ..., "club": {...}}), followed by
+a footer line holding the offset index ({"__index__": {...}}). Records can be
+appended as they are scraped; the finished file only appears once commit()
+renames it into place, so a crash never leaves a truncated catalog behind.
+Readers memory-map the file and only parse the records they touch.
+"""
+import json
+import mmap
+import os
+import sys
+import threading
+from collections.abc import Mapping
+
+FORMAT_VERSION = 1
+INDEX_KEY = "__index__"
+
+
+def _intern_keys(pairs):
+    # records are parsed one by one, so share field names across them
+    # the way a single json.load of the whole document would
+    return {sys.intern(key): value for key, value in pairs}
+
+
+def _encode(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+class CatalogWriter:
+    """
+    Appends club records to `<path>.partial` and commits them to `path`.
+
+    If a partial file from an interrupted run exists, its complete records
+    are kept (a torn last line is cut off) and appending continues after
+    them, so the partial file doubles as a resume checkpoint. With
+    resume=False the writer starts over in a partial file of its own, so
+    concurrent writers of the same catalog don't clobber each other.
+    """
+
+    def __init__(self, path, resume=True):
+        self.path = path
+        self.offsets = {}
+
+        if resume:
+            self.partial_path = f"{path}.partial"
+            if os.path.exists(self.partial_path):
+                self._recover()
+        else:
+            self.partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+        self.file = open(self.partial_path, "ab")
+        self.file.seek(0, os.SEEK_END)
+
+    def _recover(self):
+        valid_end = 0
+        with open(self.partial_path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b"\n") or INDEX_KEY in record:
+                    break
+                self.offsets[record["key"]] = offset
+                offset += len(line)
+                valid_end = offset
+        with open(self.partial_path, "r+b") as f:
+            f.truncate(valid_end)
+
+    def __contains__(self, key):
+        return key in self.offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def append(self, key, club):
+        """Write one record now; a later record with the same key replaces it."""
+        offset = self.file.tell()
+        self.file.write(_encode({"key": key, "club": club}))
+        self.file.flush()
+        self.offsets[key] = offset
+
+    def commit(self, order=None, source=None):
+        """
+        Write the offset index and atomically move the file into place.
+        `order` sets the key order readers see (keys never written are skipped).
+        `source` describes the file this catalog was converted from, if any.
+        """
+        keys = [key for key in order if key in self.offsets] if order is not None else list(self.offsets)
+        index = {"version": FORMAT_VERSION, "keys": keys, "offsets": [self.offsets[key] for key in keys]}
+        if source is not None:
+            index["source"] = source
+        self.file.write(_encode({INDEX_KEY: index}))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.close()
+        os.replace(self.partial_path, self.path)
+
+    def abort(self):
+        """Stop writing but keep the partial file for a later resume."""
+        self.file.close()
+
+
+class CatalogReader(Mapping):
+    """
+    Read-only, memory-mapped view of a JSON Lines catalog.
+
+    Opening only parses the index; each club record is parsed the first time
+    it is accessed and kept afterwards.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        end = len(self._mmap) - 1
+        start = self._mmap.rfind(b"\n", 0, end) + 1
+        try:
+            index = json.loads(self._mmap[start:end])[INDEX_KEY]
+        except (ValueError, KeyError, TypeError):
+            self._mmap.close()
+            raise ValueError(f"{path} has no catalog index, was it committed?")
+        if index.get("version") != FORMAT_VERSION:
+            self._mmap.close()
+            raise ValueError(f"{path} uses unsupported catalog format {index.get('version')}")
+
+        self.source = index.get("source")
+        self._keys = index["keys"]
+        self._offsets = dict(zip(index["keys"], index["offsets"]))
+        self._parsed = {}
+
+    def __getitem__(self, key):
+        club = self._parsed.get(key)
+        if club is None:
+            club = self._parsed[key] = self.read(key)
+        return club
+
+    def read(self, key):
+        """Parse one club record without keeping it, for one-off lookups."""
+        offset = self._offsets[key]
+        end = self._mmap.find(b"\n", offset)
+        return json.loads(self._mmap[offset:end], object_pairs_hook=_intern_keys)["club"]
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, key):
+        return key in self._offsets
+
+    def close(self):
+        self._mmap.close()
+
+
+def write_catalog(clubs, path, source=None):
+    """Write a whole {key: club} mapping in the JSON Lines format."""
+    writer = CatalogWriter(path, resume=False)
+    for key, club in clubs.items():
+        writer.append(key, club)
+    writer.commit(order=list(clubs), source=source)
+
+
+def jsonl_path_for(json_path):
+    """Path of the JSON Lines copy of an old style JSON catalog."""
+    root, _ = os.path.splitext(json_path)
+    return f"{root}.jsonl"
+
+
+def _converted_from(jsonl_path):
+    try:
+        reader = CatalogReader(jsonl_path)
+    except (OSError, ValueError):
+        return None
+    reader.close()
+    return reader.source
+
+
+def convert_json_catalog(json_path, jsonl_path=None):
+    """
+    Convert an indented JSON catalog to JSON Lines unless an up to date copy
+    (converted from a JSON file with the same mtime and size) already
+    exists. Returns the JSON Lines path.
+    """
+    jsonl_path = jsonl_path or jsonl_path_for(json_path)
+    stat = os.stat(json_path)
+    source = {"mtime": stat.st_mtime, "size": stat.st_size}
+    if _converted_from(jsonl_path) == source:
+        return jsonl_path
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        clubs = json.load(f)
+    write_catalog(clubs, jsonl_path, source=source)
+    return jsonl_path
+
+
+def read_catalog(path):
+    """Load a whole catalog as a dict, from either the JSON or JSON Lines format."""
+    if path.endswith(".jsonl"):
+        reader = CatalogReader(path)
+        try:
+            return dict(reader.items())
+        finally:
+            reader.close()
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
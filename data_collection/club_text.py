@@ -0,0 +1,59 @@
+import hashlib
+from html.parser import HTMLParser
+
+# Bump whenever normalize_text changes so cached search text is rebuilt
+NORMALIZATION_VERSION = 1
+
+
+class _TextExtractor(HTMLParser):
+    """Collects the text content of an HTML fragment, decoding entities."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts = []
+
+    def handle_starttag(self, tag, attrs):
+        # tags separate words, e.g. "<p>one</p><p>two</p>"
+        self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        self.parts.append(" ")
+
+    def handle_data(self, data):
+        self.parts.append(data)
+
+
+def normalize_text(html):
+    """
+    Strip HTML tags, decode entities, lowercase and collapse whitespace.
+    """
+    if not html:
+        return ""
+
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    return " ".join("".join(parser.parts).lower().split())
+
+
+def club_search_text(club):
+    """
+    Normalized text that recommendations are matched against:
+    name, summary and the description with markup removed.
+    """
+    return normalize_text(
+        f"{club.get('name') or ''} "
+        f"{club.get('summary') or ''} "
+        f"{club.get('description_html') or ''}"
+    )
+
+
+def club_fingerprint(club):
+    """
+    Hash of the fields club_search_text reads, used to tell whether a cached
+    search text is still valid for this club.
+    """
+    raw = "\0".join(
+        str(club.get(field) or "") for field in ("name", "summary", "description_html")
+    )
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
@@ -1,11 +1,22 @@
 import requests
+from requests.adapters import HTTPAdapter
+import argparse
 import json
+import os
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from catalog_store import CatalogReader, CatalogWriter, read_catalog, write_catalog
 
 BASE_SEARCH_URL = "https://gobblerconnect.vt.edu/api/discovery/search/organizations"
 BASE_DETAIL_URL = "https://gobblerconnect.vt.edu/api/discovery/organization/{}"
 
 OUTPUT_FILE = "gobblerconnect_clubs.json"
+CHECKPOINT_FILE = "gobblerconnect_clubs.checkpoint.jsonl"
+
+PAGE_SIZE = 50
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 
 def fetch_list_page(skip=0, top=50):
@@ -119,5 +130,364 @@ def scrape_all_clubs():
     print(f"Saved {len(club_data)} clubs to {OUTPUT_FILE}")
 
 
+class TokenBucket:
+    """
+    Thread safe token bucket: allows `rate` requests per second on average
+    with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_session(pool_size):
+    """
+    requests session with a keep-alive connection pool big enough for
+    every worker thread
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def fetch_json(session, url, params=None, limiter=None, max_retries=5, backoff=0.5):
+    """
+    GET a JSON document, retrying 429/5xx responses and connection errors
+    with exponential backoff (or the server's Retry-After).
+    Returns None for other error statuses or when retries run out.
+    """
+    for attempt in range(max_retries + 1):
+        if limiter:
+            limiter.acquire()
+
+        try:
+            response = session.get(url, params=params, timeout=30)
+        except requests.RequestException as e:
+            print(f"Request to {url} failed: {e}")
+            response = None
+
+        if response is not None:
+            if response.status_code == 200:
+                return response.json()
+            if response.status_code not in RETRY_STATUSES:
+                print(f"Failed to fetch {url} (status {response.status_code})")
+                return None
+
+        if attempt == max_retries:
+            break
+
+        delay = backoff * (2 ** attempt)
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, float(retry_after))
+            except ValueError:
+                pass
+        time.sleep(delay)
+
+    print(f"Giving up on {url} after {max_retries + 1} attempts")
+    return None
+
+
+def load_checkpoint(checkpoint_file):
+    """
+    Clubs fetched by an earlier, interrupted run. A half written last line
+    from a crash is cut off the file, so new records aren't appended to it.
+    """
+    done = {}
+    if not os.path.exists(checkpoint_file):
+        return done
+
+    valid_end = 0
+    with open(checkpoint_file, "rb") as f:
+        offset = 0
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            if not line.endswith(b"\n"):
+                break
+            done[str(record["id"])] = record["club"]
+            offset += len(line)
+            valid_end = offset
+    with open(checkpoint_file, "r+b") as f:
+        f.truncate(valid_end)
+    return done
+
+
+def collect_club_listing(session, limiter, concurrency, search_url=BASE_SEARCH_URL,
+                         page_size=PAGE_SIZE, backoff=0.5):
+    """
+    Fetch every list page (in parallel once the total count is known)
+    and return the list entries in list order.
+    """
+    params = {"orderBy[0]": "UpperName asc", "top": page_size, "filter": "", "query": ""}
+
+    first_page = fetch_json(session, search_url, dict(params, skip=0), limiter, backoff=backoff)
+    if first_page is None:
+        raise RuntimeError("Could not fetch the first organization list page")
+    total_count = first_page.get("@odata.count", 0)
+    print(f"Total clubs reported: {total_count}")
+
+    pages = {0: first_page}
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {
+            pool.submit(fetch_json, session, search_url, dict(params, skip=skip), limiter,
+                        backoff=backoff): skip
+            for skip in range(page_size, total_count, page_size)
+        }
+        for future in as_completed(futures):
+            page = future.result()
+            if page is None:
+                raise RuntimeError(f"Could not fetch list page at skip={futures[future]}")
+            pages[futures[future]] = page
+
+    listing = []
+    for skip in sorted(pages):
+        listing.extend(pages[skip].get("value", []))
+    print(f"Finished collecting {len(listing)} organization IDs.")
+    return listing
+
+
+def collect_club_ids(session, limiter, concurrency, search_url=BASE_SEARCH_URL,
+                     page_size=PAGE_SIZE, backoff=0.5):
+    """Organization ids from every list page, in list order."""
+    listing = collect_club_listing(session, limiter, concurrency, search_url, page_size, backoff)
+    return [club["Id"] for club in listing]
+
+
+def fetch_club_details(session, limiter, club_ids, concurrency,
+                       detail_url=BASE_DETAIL_URL, backoff=0.5):
+    """
+    Fetch and clean club details in parallel, yielding (club_id, clean)
+    pairs as they finish. clean is None when the fetch failed.
+    """
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = {
+            pool.submit(fetch_json, session, detail_url.format(club_id), None, limiter,
+                        backoff=backoff): club_id
+            for club_id in club_ids
+        }
+        for idx, future in enumerate(as_completed(futures), start=1):
+            club_id = futures[future]
+            print(f"Fetched details {idx}/{len(club_ids)} → ID {club_id}")
+            yield club_id, extract_clean_club_data(future.result())
+
+
+def write_catalog_atomic(club_data, output_file):
+    """
+    Write the catalog to a temp file in the same directory and rename it
+    over the old one, so readers never see a half written file.
+    A .jsonl output file is written in the JSON Lines catalog format.
+    """
+    if output_file.endswith(".jsonl"):
+        write_catalog(club_data, output_file)
+        return
+
+    tmp_file = f"{output_file}.tmp"
+    with open(tmp_file, "w", encoding="utf-8") as f:
+        json.dump(club_data, f, indent=4)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, output_file)
+
+
+def collect_all_clubs(output_file=OUTPUT_FILE, checkpoint_file=CHECKPOINT_FILE,
+                      concurrency=8, rate=10.0, backoff=0.5,
+                      search_url=BASE_SEARCH_URL, detail_url=BASE_DETAIL_URL):
+    """
+    Concurrent version of scrape_all_clubs.
+
+    Details are fetched by `concurrency` threads sharing one keep-alive
+    session, throttled to `rate` requests per second, retrying 429/5xx responses
+    with exponential backoff starting at `backoff` seconds. Every fetched club is
+    appended to a checkpoint file, so rerunning after an interruption only
+    fetches what is missing. The checkpoint is removed once the output
+    file is written.
+
+    With a .jsonl output file, clubs are streamed straight into the JSON
+    Lines catalog as they arrive instead; its partial file is the checkpoint.
+    """
+    session = make_session(concurrency)
+    limiter = TokenBucket(rate)
+
+    all_ids = collect_club_ids(session, limiter, concurrency, search_url, backoff=backoff)
+
+    if output_file.endswith(".jsonl"):
+        return stream_club_details(session, limiter, all_ids, output_file, concurrency,
+                                   detail_url, backoff)
+
+    done = load_checkpoint(checkpoint_file)
+    todo = [club_id for club_id in all_ids if str(club_id) not in done]
+    if done:
+        print(f"Resuming: {len(all_ids) - len(todo)} clubs already fetched")
+
+    with open(checkpoint_file, "a", encoding="utf-8") as checkpoint:
+        for club_id, clean in fetch_club_details(session, limiter, todo, concurrency,
+                                                 detail_url, backoff):
+            if clean:
+                done[str(club_id)] = clean
+                checkpoint.write(json.dumps({"id": club_id, "club": clean}) + "\n")
+                checkpoint.flush()
+
+    # keep list order, same as scrape_all_clubs
+    club_data = {club_id: done[str(club_id)] for club_id in all_ids if str(club_id) in done}
+
+    write_catalog_atomic(club_data, output_file)
+    os.remove(checkpoint_file)
+
+    print(f"Saved {len(club_data)} clubs to {output_file}")
+    return club_data
+
+
+def stream_club_details(session, limiter, all_ids, output_file, concurrency=8,
+                        detail_url=BASE_DETAIL_URL, backoff=0.5):
+    """
+    Append each fetched club to a JSON Lines catalog as soon as it arrives,
+    without holding the catalog in memory. The file is committed (index
+    written, renamed into place) only once every club has been attempted.
+    Returns a lazy reader over the committed catalog.
+    """
+    writer = CatalogWriter(output_file)
+    todo = [club_id for club_id in all_ids if str(club_id) not in writer]
+    if len(writer):
+        print(f"Resuming: {len(all_ids) - len(todo)} clubs already fetched")
+
+    try:
+        for club_id, clean in fetch_club_details(session, limiter, todo, concurrency,
+                                                 detail_url, backoff):
+            if clean:
+                writer.append(str(club_id), clean)
+    except BaseException:
+        writer.abort()
+        raise
+
+    writer.commit(order=[str(club_id) for club_id in all_ids])
+    print(f"Saved {len(writer)} clubs to {output_file}")
+    return CatalogReader(output_file)
+
+
+def listing_modified_on(entry):
+    """Last modified time reported by a list page entry, if it has one."""
+    for key in ("ModifiedOn", "modifiedOn", "LastModified"):
+        if entry.get(key):
+            return entry[key]
+    return None
+
+
+def tombstone(club, deleted_on):
+    """Marker left in the catalog for an organization that disappeared."""
+    return {"id": club.get("id"), "name": club.get("name"), "deleted": True, "deletedOn": deleted_on}
+
+
+def refresh_clubs(output_file=OUTPUT_FILE, concurrency=8, rate=10.0, backoff=0.5,
+                  search_url=BASE_SEARCH_URL, detail_url=BASE_DETAIL_URL):
+    """
+    Incremental refresh of an existing catalog.
+
+    Only organizations that are new, or whose list entry reports a
+    different modifiedOn than the stored record, get their details fetched.
+    Entries without a modification time are always refetched. Organizations
+    missing from the list are kept as tombstones ({"deleted": true}) and the
+    catalog is replaced atomically. Falls back to a full collection when
+    there is no catalog yet.
+    """
+    if not os.path.exists(output_file):
+        club_data = collect_all_clubs(output_file, concurrency=concurrency, rate=rate, backoff=backoff,
+                                      search_url=search_url, detail_url=detail_url)
+        return {"new": len(club_data), "changed": 0, "unchanged": 0, "removed": 0, "failed": 0}
+
+    existing = read_catalog(output_file)
+
+    session = make_session(concurrency)
+    limiter = TokenBucket(rate)
+    listing = collect_club_listing(session, limiter, concurrency, search_url, backoff=backoff)
+
+    stats = {"new": 0, "changed": 0, "unchanged": 0, "removed": 0, "failed": 0}
+    todo = []
+    for entry in listing:
+        club_id = str(entry["Id"])
+        record = existing.get(club_id)
+        modified_on = listing_modified_on(entry)
+        if record is None or record.get("deleted"):
+            stats["new"] += 1
+            todo.append(entry["Id"])
+        elif modified_on is None or record.get("modifiedOn") != modified_on:
+            stats["changed"] += 1
+            todo.append(entry["Id"])
+        else:
+            stats["unchanged"] += 1
+
+    fetched = {}
+    for club_id, clean in fetch_club_details(session, limiter, todo, concurrency,
+                                             detail_url, backoff):
+        if clean:
+            fetched[str(club_id)] = clean
+        else:
+            stats["failed"] += 1
+
+    # live clubs in list order, a failed fetch keeps the old record
+    club_data = {}
+    for entry in listing:
+        club_id = str(entry["Id"])
+        record = fetched.get(club_id) or existing.get(club_id)
+        if record and not record.get("deleted"):
+            club_data[club_id] = record
+
+    deleted_on = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    for club_id, record in existing.items():
+        if club_id in club_data:
+            continue
+        if not record.get("deleted"):
+            stats["removed"] += 1
+            record = tombstone(record, deleted_on)
+        club_data[club_id] = record
+
+    write_catalog_atomic(club_data, output_file)
+    print(f"Refreshed {output_file}: {stats}")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect club data from GobblerConnect.")
+    parser.add_argument("--sequential", action="store_true",
+                        help="use the original one-request-at-a-time scraper")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch clubs that are new or changed since the last run")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rate", type=float, default=10.0,
+                        help="maximum requests per second")
+    parser.add_argument("--output", default=OUTPUT_FILE,
+                        help="catalog file, use a .jsonl name to stream to the JSON Lines format")
+    parser.add_argument("--checkpoint", default=CHECKPOINT_FILE)
+    args = parser.parse_args()
+
+    if args.sequential:
+        scrape_all_clubs()
+    elif args.incremental:
+        refresh_clubs(args.output, args.concurrency, args.rate)
+    else:
+        collect_all_clubs(args.output, args.checkpoint, args.concurrency, args.rate)
+
+
 if __name__ == "__main__":
-    scrape_all_clubs()
+    main()
@@ -0,0 +1,111 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from catalog_store import (
+    CatalogReader,
+    CatalogWriter,
+    convert_json_catalog,
+    read_catalog,
+    write_catalog,
+)
+
+CLUBS = {
+    "1": {"id": 1, "name": "Chess Club", "summary": "Chess – every week"},
+    "2": {"id": 2, "name": "Art Club", "summary": None},
+    "3": {"id": 3, "name": "Robotics", "summary": "Robots"},
+}
+
+
+class TestCatalogStore(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, "clubs.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_round_trip_keeps_order(self):
+        """Records read back equal what was written, in the same order."""
+        write_catalog(CLUBS, self.path)
+        reader = CatalogReader(self.path)
+        self.assertEqual(list(reader), ["1", "2", "3"])
+        self.assertEqual(dict(reader.items()), CLUBS)
+        reader.close()
+
+    def test_reader_parses_lazily(self):
+        """Opening a catalog parses the index only."""
+        write_catalog(CLUBS, self.path)
+        reader = CatalogReader(self.path)
+        self.assertEqual(reader._parsed, {})
+        self.assertEqual(reader["2"]["name"], "Art Club")
+        self.assertEqual(list(reader._parsed), ["2"])
+        reader.close()
+
+    def test_read_does_not_keep_records(self):
+        """read() parses a record for one-off use without caching it."""
+        write_catalog(CLUBS, self.path)
+        reader = CatalogReader(self.path)
+        self.assertEqual(reader.read("3"), CLUBS["3"])
+        self.assertEqual(reader._parsed, {})
+        reader.close()
+
+    def test_uncommitted_catalog_is_not_visible(self):
+        """Until commit the records only live in the partial file."""
+        writer = CatalogWriter(self.path)
+        writer.append("1", CLUBS["1"])
+        self.assertFalse(os.path.exists(self.path))
+        writer.commit()
+        self.assertTrue(os.path.exists(self.path))
+        self.assertFalse(os.path.exists(self.path + ".partial"))
+
+    def test_writer_resumes_after_torn_write(self):
+        """A resumed writer keeps complete records and drops a torn line."""
+        writer = CatalogWriter(self.path)
+        writer.append("1", CLUBS["1"])
+        writer.append("2", CLUBS["2"])
+        writer.abort()
+        with open(self.path + ".partial", "ab") as f:
+            f.write(b'{"key": "3", "club": {"na')
+
+        resumed = CatalogWriter(self.path)
+        self.assertIn("1", resumed)
+        self.assertNotIn("3", resumed)
+        resumed.append("3", CLUBS["3"])
+        resumed.commit(order=["3", "2", "1"])
+
+        self.assertEqual(list(read_catalog(self.path).items()),
+                         [("3", CLUBS["3"]), ("2", CLUBS["2"]), ("1", CLUBS["1"])])
+
+    def test_reader_rejects_uncommitted_file(self):
+        """A file without the index footer is refused."""
+        with open(self.path, "w", encoding="utf-8") as f:
+            f.write('{"key": "1", "club": {}}\n')
+        with self.assertRaises(ValueError):
+            CatalogReader(self.path)
+
+    def test_convert_json_catalog(self):
+        """Old JSON catalogs convert once and again only after they change."""
+        json_path = os.path.join(self.tmp, "clubs.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(CLUBS, f, indent=4)
+
+        jsonl_path = convert_json_catalog(json_path)
+        self.assertEqual(jsonl_path, self.path)
+        self.assertEqual(read_catalog(jsonl_path), CLUBS)
+
+        converted_at = os.stat(jsonl_path).st_mtime_ns
+        convert_json_catalog(json_path)
+        self.assertEqual(os.stat(jsonl_path).st_mtime_ns, converted_at)
+
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"1": CLUBS["1"]}, f)
+        convert_json_catalog(json_path)
+        self.assertEqual(read_catalog(jsonl_path), {"1": CLUBS["1"]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from club_text import normalize_text, club_search_text, club_fingerprint
+
+
+class TestClubText(unittest.TestCase):
+
+    def test_normalize_text_strips_tags_and_entities(self):
+        """Tags are removed, entities decoded and whitespace collapsed."""
+        html = "<p>The chapter&rsquo;s <strong>mission</strong></p>\r\n<p>Fraud &amp; ethics</p>"
+        self.assertEqual(normalize_text(html), "the chapter’s mission fraud & ethics")
+
+    def test_normalize_text_separates_block_text(self):
+        """Text in adjacent tags should not run together."""
+        self.assertEqual(normalize_text("<p>one</p><p>two</p>"), "one two")
+
+    def test_normalize_text_empty(self):
+        """None and empty input normalize to an empty string."""
+        self.assertEqual(normalize_text(None), "")
+        self.assertEqual(normalize_text(""), "")
+
+    def test_club_search_text_skips_missing_fields(self):
+        """Missing summary or description shouldn't show up as 'none'."""
+        club = {"name": "Chess Club", "summary": None, "description_html": None}
+        self.assertEqual(club_search_text(club), "chess club")
+
+    def test_club_fingerprint_tracks_text_fields(self):
+        """Only changes to matched fields change the fingerprint."""
+        club = {"name": "Chess Club", "summary": "Chess", "email": "a@vt.edu"}
+        same = dict(club, email="b@vt.edu")
+        changed = dict(club, summary="Chess and Go")
+        self.assertEqual(club_fingerprint(club), club_fingerprint(same))
+        self.assertNotEqual(club_fingerprint(club), club_fingerprint(changed))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from catalog_store import CatalogWriter
+from gobblerconnect_organization_collection import (
+    TokenBucket,
+    collect_all_clubs,
+    extract_clean_club_data,
+    fetch_json,
+    load_checkpoint,
+    make_session,
+    refresh_clubs,
+)
+
+CLUB_IDS = [f"club{i}" for i in range(120)]
+
+
+class StubGobblerConnect(BaseHTTPRequestHandler):
+    """Minimal stand-in for the GobblerConnect search and detail APIs."""
+
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+    requests_seen = []
+    flaky_remaining = {}
+    missing = set()
+    club_ids = CLUB_IDS
+    modified_on = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=None, headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        data = json.dumps(body).encode("utf-8") if body is not None else b""
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        with self.lock:
+            self.requests_seen.append(url.path)
+
+        if url.path == "/search":
+            query = parse_qs(url.query)
+            skip, top = int(query["skip"][0]), int(query["top"][0])
+            values = [
+                {"Id": club_id, "ModifiedOn": self.modified_on.get(club_id)}
+                for club_id in self.club_ids[skip:skip + top]
+            ]
+            return self._send(200, {"@odata.count": len(self.club_ids), "value": values})
+
+        club_id = url.path.rsplit("/", 1)[-1]
+        with self.lock:
+            if self.flaky_remaining.get(club_id, 0) > 0:
+                self.flaky_remaining[club_id] -= 1
+                return self._send(503, headers={"Retry-After": "0"})
+        if club_id in self.missing:
+            return self._send(404)
+        return self._send(200, {"id": club_id, "name": f"Club {club_id}",
+                                "modifiedOn": self.modified_on.get(club_id)})
+
+
+class TestConcurrentCollection(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), StubGobblerConnect)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        base = f"http://127.0.0.1:{cls.server.server_address[1]}"
+        cls.search_url = f"{base}/search"
+        cls.detail_url = f"{base}/organization/{{}}"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        StubGobblerConnect.requests_seen = []
+        StubGobblerConnect.flaky_remaining = {}
+        StubGobblerConnect.missing = set()
+        StubGobblerConnect.club_ids = CLUB_IDS
+        StubGobblerConnect.modified_on = {club_id: "2025-01-01T00:00:00Z" for club_id in CLUB_IDS}
+        self.tmp = tempfile.mkdtemp()
+        self.output = os.path.join(self.tmp, "clubs.json")
+        self.checkpoint = os.path.join(self.tmp, "clubs.checkpoint.jsonl")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def collect(self):
+        return collect_all_clubs(self.output, self.checkpoint, concurrency=8, rate=1000, backoff=0.01,
+                                 search_url=self.search_url, detail_url=self.detail_url)
+
+    def test_collects_every_club_in_list_order(self):
+        """All list pages and details are fetched and saved in list order."""
+        clubs = self.collect()
+
+        self.assertEqual(list(clubs), CLUB_IDS)
+        with open(self.output, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(saved["club5"], extract_clean_club_data(
+            {"id": "club5", "name": "Club club5", "modifiedOn": "2025-01-01T00:00:00Z"}))
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_retries_server_errors(self):
+        """503 responses are retried until the detail comes through."""
+        StubGobblerConnect.flaky_remaining = {"club3": 2}
+        clubs = self.collect()
+
+        self.assertIn("club3", clubs)
+        self.assertEqual(StubGobblerConnect.requests_seen.count("/organization/club3"), 3)
+
+    def test_skips_missing_clubs(self):
+        """A 404 is not retried and the club is left out."""
+        StubGobblerConnect.missing = {"club7"}
+        clubs = self.collect()
+
+        self.assertNotIn("club7", clubs)
+        self.assertEqual(StubGobblerConnect.requests_seen.count("/organization/club7"), 1)
+
+    def test_resumes_from_checkpoint(self):
+        """Clubs already in the checkpoint are not fetched again."""
+        with open(self.checkpoint, "w", encoding="utf-8") as f:
+            for club_id in CLUB_IDS[:100]:
+                f.write(json.dumps({"id": club_id, "club": {"id": club_id, "name": "cached"}}) + "\n")
+            f.write('{"id": "club100", "cl')  # torn write from a crash
+
+        clubs = self.collect()
+
+        detail_requests = [p for p in StubGobblerConnect.requests_seen if p.startswith("/organization/")]
+        self.assertEqual(len(detail_requests), 20)
+        self.assertEqual(clubs["club0"]["name"], "cached")
+        self.assertEqual(clubs["club100"]["name"], "Club club100")
+
+    def test_torn_checkpoint_line_is_cut_before_appending(self):
+        """Records appended after a crash don't get glued onto the torn line."""
+        with open(self.checkpoint, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "club0", "club": {"name": "cached"}}) + "\n")
+            f.write('{"id": "club1", "cl')
+        self.assertEqual(list(load_checkpoint(self.checkpoint)), ["club0"])
+
+        with open(self.checkpoint, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"id": "club2", "club": {"name": "later"}}) + "\n")
+        self.assertEqual(list(load_checkpoint(self.checkpoint)), ["club0", "club2"])
+
+    def test_streams_to_json_lines_catalog(self):
+        """A .jsonl output is streamed and resumes from its partial file."""
+        jsonl_output = os.path.join(self.tmp, "clubs.jsonl")
+        writer = CatalogWriter(jsonl_output)
+        for club_id in CLUB_IDS[:100]:
+            writer.append(club_id, {"id": club_id, "name": "cached"})
+        writer.abort()
+
+        clubs = collect_all_clubs(jsonl_output, concurrency=8, rate=1000, backoff=0.01,
+                                  search_url=self.search_url, detail_url=self.detail_url)
+
+        self.assertEqual(len(self.detail_requests()), 20)
+        self.assertEqual(list(clubs), CLUB_IDS)
+        self.assertEqual(clubs["club0"]["name"], "cached")
+        self.assertEqual(clubs["club119"]["name"], "Club club119")
+        clubs.close()
+
+    def detail_requests(self):
+        return [p for p in StubGobblerConnect.requests_seen if p.startswith("/organization/")]
+
+    def refresh(self):
+        return refresh_clubs(self.output, concurrency=8, rate=1000, backoff=0.01,
+                             search_url=self.search_url, detail_url=self.detail_url)
+
+    def test_refresh_fetches_only_new_and_changed(self):
+        """Unchanged clubs are not refetched, removed ones are tombstoned."""
+        self.collect()
+        StubGobblerConnect.requests_seen = []
+        StubGobblerConnect.club_ids = CLUB_IDS[1:] + ["club_new"]
+        StubGobblerConnect.modified_on["club2"] = "2025-06-01T00:00:00Z"
+        StubGobblerConnect.modified_on["club_new"] = "2025-06-01T00:00:00Z"
+
+        stats = self.refresh()
+
+        self.assertEqual(sorted(self.detail_requests()), ["/organization/club2", "/organization/club_new"])
+        self.assertEqual(stats, {"new": 1, "changed": 1, "unchanged": 118, "removed": 1, "failed": 0})
+        with open(self.output, encoding="utf-8") as f:
+            saved = json.load(f)
+        self.assertEqual(saved["club2"]["modifiedOn"], "2025-06-01T00:00:00Z")
+        self.assertIn("club_new", saved)
+        self.assertTrue(saved["club0"]["deleted"])
+        self.assertFalse(os.path.exists(self.output + ".tmp"))
+
+    def test_refresh_revives_tombstoned_club(self):
+        """A club that comes back after removal is fetched again."""
+        self.collect()
+        StubGobblerConnect.club_ids = CLUB_IDS[1:]
+        self.refresh()
+        StubGobblerConnect.club_ids = CLUB_IDS
+        StubGobblerConnect.requests_seen = []
+
+        stats = self.refresh()
+
+        self.assertEqual(self.detail_requests(), ["/organization/club0"])
+        self.assertEqual(stats["new"], 1)
+        with open(self.output, encoding="utf-8") as f:
+            self.assertNotIn("deleted", json.load(f)["club0"])
+
+    def test_refresh_keeps_old_record_when_fetch_fails(self):
+        """A changed club whose detail can't be fetched keeps its old data."""
+        self.collect()
+        StubGobblerConnect.modified_on["club4"] = "2025-06-01T00:00:00Z"
+        StubGobblerConnect.missing = {"club4"}
+
+        stats = self.refresh()
+
+        self.assertEqual(stats["failed"], 1)
+        with open(self.output, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["club4"]["modifiedOn"], "2025-01-01T00:00:00Z")
+
+    def test_fetch_json_gives_up(self):
+        """fetch_json returns None once retries are exhausted."""
+        StubGobblerConnect.flaky_remaining = {"club1": 10}
+        session = make_session(1)
+        self.assertIsNone(fetch_json(session, self.detail_url.format("club1"), max_retries=1, backoff=0))
+
+
+class TestTokenBucket(unittest.TestCase):
+
+    def test_rate_is_limited_after_burst(self):
+        """After the initial burst, tokens arrive at the configured rate."""
+        bucket = TokenBucket(rate=50, capacity=5)
+        start = time.monotonic()
+        for _ in range(15):
+            bucket.acquire()
+        # 5 burst tokens, the other 10 take about 10 / 50 = 0.2s
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+
+
+if __name__ == '__main__':
+    unittest.main()
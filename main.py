@@ -1,12 +1,44 @@
-from typing import List, Dict, Any
-from fastapi import FastAPI
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from controllers.main_controller import get_recommendations_for_request
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.datastructures import Headers, MutableHeaders
+from controllers.main_controller import (
+    BATCH_CHUNK_SIZE,
+    DEFAULT_STRATEGY,
+    coalesce,
+    profiler,
+    slow_queries,
+    get_batch_recommender,
+    get_cache_stats,
+    get_recommendations_for_request,
+    reload_catalog,
+    render_coalescing_metrics,
+    start_popular_refresh,
+    stop_popular_refresh,
+    warm_up,
+)
+from controllers.scoring_pool import POOL_WORKERS, PoolBusy, ScoringPool
+from models import metrics
+from models.metrics import stage_metrics, start_request, timed
+from models.profiling import PROFILE_HEADER
+from models.recommender import is_partial, recommendations_json
 
 # Pydantic models (request/response schemas)
 class RecommendationRequest(BaseModel):
     interests: str  # e.g., "engineering, robotics, community service, basketball"
+    top_k: int = Field(default=10, ge=1, le=100)  # how many clubs to return
+    # optional filters, e.g. status="Active", visibility="Public"
+    status: Optional[str] = None
+    visibility: Optional[str] = None
+    category: Optional[str] = None
 
 
 class ClubRecommendation(BaseModel):
@@ -17,16 +49,111 @@ class ClubRecommendation(BaseModel):
 
 class RecommendationsResponse(BaseModel):
     recommendations: List[ClubRecommendation]
+    # True when the query ran out of its cost budget and some keywords weren't scored
+    partial: bool = False
+
+
+class BatchRecommendationRequest(BaseModel):
+    requests: List[RecommendationRequest]
+
+
+class CatalogReloadResponse(BaseModel):
+    version: int
+    clubs: int
+
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    max_entries: int
+    hits: int
+    misses: int
+    evictions: int
+    expirations: int
+    invalidations: int
+
+
+NDJSON = "application/x-ndjson"
+
+# Responses are assembled from JSON fragments cached with the catalog instead
+# of validating and dumping RecommendationsResponse; the bytes are the same.
+# CLUB_MATCH_FAST_JSON=0 goes through the pydantic models instead.
+FAST_JSON = os.environ.get("CLUB_MATCH_FAST_JSON", "1") != "0"
+
+def _json_bool(value: bool) -> bytes:
+    return b"true" if value else b"false"
+
+
+# Batch items are (position in the batch, request data, validation errors)
+BatchItem = Tuple[int, Optional[Dict[str, Any]], Optional[List[Dict[str, Any]]]]
 
 
 # FastAPI app setup
 
+# Process pool for scoring, only when CLUB_MATCH_WORKERS is set
+scoring_pool: Optional[ScoringPool] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global scoring_pool
+    # Load the club catalog (from its prebuilt snapshot when there is one)
+    # and build the strategy so the first request doesn't pay for it
+    await run_in_threadpool(warm_up)
+    # then keep the most requested interest sets precomputed
+    start_popular_refresh()
+    if POOL_WORKERS > 0:
+        scoring_pool = ScoringPool(POOL_WORKERS)
+        await run_in_threadpool(scoring_pool.warm_up)
+    yield
+    if scoring_pool is not None:
+        scoring_pool.shutdown()
+        scoring_pool = None
+    stop_popular_refresh()
+
+
 app = FastAPI(
     title="Club Match AI API",
     version="0.1.0",
     description="Backend API for recommending clubs and events to VT students.",
+    lifespan=lifespan,
 )
 
+class ServerTimingMiddleware:
+    """
+    Collects stage timings for each request and reports them in a
+    Server-Timing header, plus a "total" stage for recommendation requests.
+    Also picks the requests to profile and logs slow ones.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not metrics.ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = start_request()
+        if profiler.enabled:
+            timings.profile = profiler.wanted(Headers(scope=scope).get(PROFILE_HEADER))
+        start = time.perf_counter()
+
+        async def send_with_timing(message):
+            if message["type"] == "http.response.start":
+                elapsed = time.perf_counter() - start
+                if timings.strategy:
+                    timings.add("total", elapsed)
+                    stage_metrics.observe("total", timings.strategy, elapsed)
+                    slow_queries.observe(timings, elapsed)
+                if timings.stages:
+                    MutableHeaders(scope=message).append("Server-Timing", timings.server_timing())
+            await send(message)
+
+        await self.app(scope, receive, send_with_timing)
+
+
+app.add_middleware(ServerTimingMiddleware)
+
 # Allow localhost frontends to call this
 app.add_middleware(
     CORSMiddleware,
@@ -43,22 +170,185 @@ def health_check() -> Dict[str, bool]:
     return {"ok": True}
 
 
+@app.get("/api/v1/cache/stats", response_model=CacheStatsResponse)
+def cache_stats() -> CacheStatsResponse:
+    """
+    Counters for the recommendation result cache. With CLUB_MATCH_WORKERS
+    set these are the server process's only (batch requests); each worker
+    keeps its own cache for the single requests it scores.
+    """
+    return CacheStatsResponse(**get_cache_stats())
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics_endpoint() -> PlainTextResponse:
+    """Per-stage latency histograms and request coalescing counters in the Prometheus text format."""
+    return PlainTextResponse(stage_metrics.render() + render_coalescing_metrics(),
+                             media_type="text/plain; version=0.0.4")
+
+
+@app.post("/api/v1/admin/reload", response_model=CatalogReloadResponse)
+def reload_clubs() -> CatalogReloadResponse:
+    """
+    Reload the club catalog from disk without restarting the server. With
+    CLUB_MATCH_WORKERS set, each worker reloads before its next request.
+    """
+    reloaded = reload_catalog()
+    if scoring_pool is not None:
+        scoring_pool.reload()
+    return CatalogReloadResponse(**reloaded)
+
+
+async def _score_in_threadpool(user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return await run_in_threadpool(get_recommendations_for_request, user_data)
+
+
 @app.post("/api/v1/recommend", response_model=RecommendationsResponse)
-def recommend(payload: RecommendationRequest) -> RecommendationsResponse:
+async def recommend(payload: RecommendationRequest) -> RecommendationsResponse:
     """
     Core Club Match AI endpoint.
 
     Example request JSON:
-        { "interests": "engineering, robotics, community service, basketball" }
+        { "interests": "engineering, robotics, community service, basketball", "top_k": 10 }
 
     Example response JSON:
         {
           "recommendations": [
             { "name": "...", "shortName": "...", "summary": "..." },
             ...
-          ]
+          ],
+          "partial": false
         }
+
+    "partial" is true when the interests were too many to score within the
+    per-request cost budget, so only the most distinctive ones were used.
+
+    With CLUB_MATCH_WORKERS set, scoring runs in a process pool and a full
+    queue answers 503 with Retry-After; otherwise it runs on the threadpool.
+    Either way, identical queries arriving while one is being scored wait
+    for its result rather than taking a thread or worker of their own.
     """
     user_data: Dict[str, Any] = payload.model_dump()
-    recs = get_recommendations_for_request(user_data)
-    return RecommendationsResponse(recommendations=recs)
+    # labeled here, a request that waits on an identical one never scores itself
+    metrics.label_strategy(DEFAULT_STRATEGY)
+    if scoring_pool is None:
+        recs = await coalesce(user_data, _score_in_threadpool)
+    else:
+        try:
+            with timed("pool"):
+                recs = await coalesce(user_data, scoring_pool.recommend)
+        except PoolBusy as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    # Serialize here rather than in FastAPI so the time shows up as a stage;
+    # response_model above still documents the schema
+    with timed("serialize"):
+        if FAST_JSON:
+            body = b'{"recommendations":%s,"partial":%s}' % (recommendations_json(recs), _json_bool(is_partial(recs)))
+        else:
+            body = RecommendationsResponse(recommendations=recs, partial=is_partial(recs)).model_dump_json()
+    return Response(body, media_type="application/json")
+
+
+
+def _parse_batch_line(index: int, line: bytes) -> BatchItem:
+    try:
+        return index, RecommendationRequest.model_validate_json(line).model_dump(), None
+    except ValidationError as e:
+        return index, None, e.errors(include_url=False, include_context=False, include_input=False)
+
+
+async def _ndjson_items(request: Request) -> List[BatchItem]:
+    """Split an NDJSON body into batch items, validating each line on its own."""
+    items = []
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            if line.strip():
+                items.append(_parse_batch_line(len(items), line))
+    if buffer.strip():
+        items.append(_parse_batch_line(len(items), buffer))
+    return items
+
+
+async def _stream_batch(items: List[BatchItem]) -> AsyncIterator[bytes]:
+    """
+    Score batch items a chunk at a time off the event loop and send each
+    chunk's results as soon as they are ready.
+    """
+    recommender = await run_in_threadpool(get_batch_recommender)
+    for start in range(0, len(items), BATCH_CHUNK_SIZE):
+        chunk = items[start:start + BATCH_CHUNK_SIZE]
+        valid = [(index, user_data) for index, user_data, errors in chunk if errors is None]
+        results = await run_in_threadpool(
+            recommender.get_recommendations_batch, [user_data for _, user_data in valid]
+        )
+        for index, _, errors in chunk:
+            if errors is not None:
+                yield json.dumps({"index": index, "error": errors}).encode("utf-8") + b"\n"
+        for (index, _), recs in zip(valid, results):
+            if FAST_JSON:
+                yield b'{"index":%d,"recommendations":%s,"partial":%s}\n' % (
+                    index, recommendations_json(recs), _json_bool(is_partial(recs))
+                )
+            else:
+                yield json.dumps(
+                    {"index": index, "recommendations": recs, "partial": is_partial(recs)}
+                ).encode("utf-8") + b"\n"
+
+
+_batch_schema = BatchRecommendationRequest.model_json_schema(ref_template="#/components/schemas/{model}")
+_batch_schema.pop("$defs", None)
+
+
+@app.post(
+    "/api/v1/recommend/batch",
+    response_class=StreamingResponse,
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "application/json": {"schema": _batch_schema},
+                NDJSON: {"schema": {"$ref": "#/components/schemas/RecommendationRequest"}},
+            },
+        },
+        "responses": {"200": {"content": {NDJSON: {}}}},
+    },
+)
+async def recommend_batch(request: Request) -> StreamingResponse:
+    """
+    Recommendations for many students in one call.
+
+    The body is either JSON ({"requests": [...]} or a bare list of
+    recommendation requests) or NDJSON with one request per line. The whole
+    body is read first, then results stream back as NDJSON, one line per
+    request, {"index": 0, "recommendations": [...], "partial": false}, each
+    chunk of requests sent as soon as it is scored. An invalid NDJSON line gets
+    {"index": n, "error": [...]} instead. Lines can arrive out of order
+    around errors, so use "index" to match them up.
+
+    The body is read before the response starts: StreamingResponse watches
+    the same receive channel for disconnects and would swallow body chunks.
+    """
+    if request.headers.get("content-type", "").startswith(NDJSON):
+        items = await _ndjson_items(request)
+    else:
+        try:
+            body = await request.json()
+        except ValueError as e:
+            # the same error FastAPI gives a malformed body on a typed endpoint
+            raise RequestValidationError([{
+                "type": "json_invalid", "loc": ("body", getattr(e, "pos", 0)),
+                "msg": "JSON decode error", "input": {}, "ctx": {"error": getattr(e, "msg", str(e))},
+            }])
+        try:
+            batch = BatchRecommendationRequest.model_validate(
+                {"requests": body} if isinstance(body, list) else body
+            )
+        except ValidationError as e:
+            raise RequestValidationError(e.errors(include_url=False))
+        items = [(index, payload.model_dump(), None) for index, payload in enumerate(batch.requests)]
+
+    return StreamingResponse(_stream_batch(items), media_type=NDJSON)
@@ -0,0 +1,206 @@
+import math
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from typing import Any, Container, Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from models.catalog import ClubCatalog
+from models.filters import Bitset, CatalogFilters, allowed_by_any, filter_key
+from models.inverted_index import InvertedIndex, tokenize
+from models.ranking import TermContribution, rank_terms_top_k, restrict, select_top_k
+from models.recommender import (
+    RecommendationStrategy,
+    catalog_recommendations,
+    parse_interests,
+    requested_top_k,
+)
+
+# Standard Okapi BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+class SparseTermMatrix:
+    """
+    Club x term weight matrix stored one term column at a time (CSC layout).
+
+    Each column keeps the document numbers that contain the term and the
+    precomputed weight for each of them in flat arrays, so scoring a query
+    only reads the columns of its terms.
+    """
+
+    def __init__(self, index: InvertedIndex, scheme: str = 'bm25', k1: float = K1, b: float = B):
+        if scheme not in ('bm25', 'tfidf'):
+            raise ValueError(f"Unknown weighting scheme: {scheme}")
+        self.scheme = scheme
+        self.num_docs = len(index)
+        self.columns: Dict[str, Tuple[Sequence[int], Sequence[float]]] = {}
+
+        doc_lengths = [0] * self.num_docs
+        for postings in index.postings.values():
+            for doc, tf in postings.items():
+                doc_lengths[doc] += tf
+        avg_length = (sum(doc_lengths) / self.num_docs) if self.num_docs else 0.0
+
+        norms = [0.0] * self.num_docs
+        for term, postings in index.postings.items():
+            df = len(postings)
+            docs = array('i', sorted(postings))
+            if scheme == 'bm25':
+                idf = math.log(1 + (self.num_docs - df + 0.5) / (df + 0.5))
+                weights = array('d', (
+                    idf * postings[doc] * (k1 + 1) /
+                    (postings[doc] + k1 * (1 - b + b * doc_lengths[doc] / avg_length))
+                    for doc in docs
+                ))
+            else:
+                idf = math.log(self.num_docs / df)
+                weights = array('d', ((1 + math.log(postings[doc])) * idf for doc in docs))
+                for doc, weight in zip(docs, weights):
+                    norms[doc] += weight * weight
+            self.columns[term] = (docs, weights)
+
+        if scheme == 'tfidf':
+            # cosine normalize rows so long descriptions aren't favored
+            norms = [math.sqrt(n) or 1.0 for n in norms]
+            for docs, weights in self.columns.values():
+                for i, doc in enumerate(docs):
+                    weights[i] /= norms[doc]
+
+        # largest weight per column, an upper bound used for early termination
+        self.column_max: Dict[str, float] = {
+            term: max(weights) for term, (_, weights) in self.columns.items()
+        }
+
+    @classmethod
+    def from_columns(cls, num_docs: int, scheme: str, columns: Mapping[str, Tuple[Sequence[int], Sequence[float]]],
+                     column_max: Dict[str, float]) -> 'SparseTermMatrix':
+        """A matrix from precomputed columns, e.g. memory mapped by models.snapshot."""
+        matrix = cls.__new__(cls)
+        matrix.scheme = scheme
+        matrix.num_docs = num_docs
+        matrix.columns = columns
+        matrix.column_max = column_max
+        return matrix
+
+    def query_vector(self, keywords: List[str]) -> Dict[str, float]:
+        """Turn keywords into a sparse query vector over known terms."""
+        counts = Counter(token for keyword in keywords for token in tokenize(keyword))
+        return {term: float(n) for term, n in counts.items() if term in self.columns}
+
+    def multiply(self, query: Dict[str, float]) -> Dict[int, float]:
+        """Score every club for one query vector (matrix x vector)."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term, query_weight in query.items():
+            docs, weights = self.columns[term]
+            for doc, weight in zip(docs, weights):
+                scores[doc] += query_weight * weight
+        return scores
+
+    def _lookup(self, term: str, doc: int) -> float:
+        docs, weights = self.columns[term]
+        i = bisect_left(docs, doc)
+        if i < len(docs) and docs[i] == doc:
+            return weights[i]
+        return 0.0
+
+    def contributions(self, query: Dict[str, float]) -> List[TermContribution]:
+        """Query terms as weighted columns with upper bounds, for top-k ranking."""
+        contributions = []
+        for term, query_weight in query.items():
+            docs, weights = self.columns[term]
+            contributions.append(TermContribution(
+                query_weight * self.column_max[term],
+                lambda d=docs, w=weights, q=query_weight: ((doc, q * weight) for doc, weight in zip(d, w)),
+                lambda doc, t=term, q=query_weight: q * self._lookup(t, doc),
+            ))
+        return contributions
+
+    def multiply_batch(self, queries: List[Dict[str, float]],
+                       allowed: Optional[List[Optional[Bitset]]] = None) -> List[Dict[int, float]]:
+        """
+        Score a batch of query vectors as one matrix product. Each term column
+        is read once no matter how many queries in the batch use it, and
+        identical queries are scored once and share the same result. With
+        `allowed` (per query), a query only scores the documents one of its
+        requests allows, so its result can still hold another one's.
+        """
+        unique: Dict[FrozenSet[Tuple[str, float]], int] = {}
+        slots = [unique.setdefault(frozenset(query.items()), len(unique)) for query in queries]
+        scopes: List[Optional[Container[int]]] = [None] * len(unique)
+        if allowed is not None:
+            requests: List[List[Optional[Bitset]]] = [[] for _ in unique]
+            for slot, bitset in zip(slots, allowed):
+                requests[slot].append(bitset)
+            scopes = [allowed_by_any(bitsets) for bitsets in requests]
+
+        users: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        for q, query in enumerate(unique):
+            for term, query_weight in query:
+                users[term].append((q, query_weight))
+
+        results: List[Dict[int, float]] = [defaultdict(float) for _ in unique]
+        for term, term_users in users.items():
+            docs, weights = self.columns[term]
+            for q, query_weight in term_users:
+                scores = results[q]
+                scope = scopes[q]
+                if scope is None:
+                    for doc, weight in zip(docs, weights):
+                        scores[doc] += query_weight * weight
+                else:
+                    for doc, weight in zip(docs, weights):
+                        if doc in scope:
+                            scores[doc] += query_weight * weight
+        return [results[slot] for slot in slots]
+
+
+class BM25Recommender(RecommendationStrategy):
+    name = 'bm25'
+
+    def __init__(self, catalog: ClubCatalog, scheme: str = 'bm25'):
+        self.index: InvertedIndex = catalog.derived(
+            'inverted_index', lambda c: InvertedIndex(c.clubs)
+        )
+        self.matrix: SparseTermMatrix = catalog.derived(
+            f'term_matrix:{scheme}', lambda c: SparseTermMatrix(self.index, scheme)
+        )
+        self.filters = catalog.derived('filters', lambda c: CatalogFilters(c.clubs))
+        self.recommendations = catalog_recommendations(catalog)
+        self.name = scheme
+
+    def recommend(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Rank clubs by BM25 (or TF-IDF) relevance to the user's interests."""
+        return self.to_recommendations(self.rank(user_data, self.allowed(user_data)))
+
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
+        interests = user_data.get('interests', '')
+        if not interests:
+            return []
+
+        query = self.matrix.query_vector(parse_interests(interests))
+        return rank_terms_top_k(
+            restrict(self.matrix.contributions(query), allowed), requested_top_k(user_data)
+        )
+
+    def recommend_batch(self, batch: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Recommend for many users at once with a single matrix product."""
+        queries = [
+            self.matrix.query_vector(parse_interests(user_data.get('interests', '')))
+            for user_data in batch
+        ]
+        # filters are resolved first so filtered out clubs are never scored
+        allowed_docs = [self.allowed(user_data) for user_data in batch]
+        ranked: Dict[Tuple[Any, ...], List[Dict[str, Any]]] = {}
+        results = []
+        scored = self.matrix.multiply_batch(queries, allowed_docs)
+        for user_data, allowed, scores in zip(batch, allowed_docs, scored):
+            # duplicate queries share one score dict, rank it once
+            key = (id(scores), requested_top_k(user_data), filter_key(user_data))
+            if key not in ranked:
+                items = scores.items() if allowed is None else [
+                    (doc, score) for doc, score in scores.items() if doc in allowed
+                ]
+                ranked[key] = self.to_recommendations(select_top_k(items, key[1]))
+            results.append(ranked[key])
+        return results
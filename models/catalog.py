@@ -0,0 +1,362 @@
+import json
+import os
+import sys
+import threading
+import time
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from data_collection.catalog_store import CatalogReader, convert_json_catalog
+from data_collection.club_text import NORMALIZATION_VERSION, club_fingerprint, club_search_text
+from models.filters import club_categories
+
+DEFAULT_CATALOG_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)),
+    'data_collection',
+    'gobblerconnect_clubs.json'
+)
+
+
+def _live(clubs: Mapping[str, Any]) -> Dict[str, Any]:
+    # deleted clubs stay in the file as tombstones
+    return {club_id: club for club_id, club in clubs.items() if not club.get('deleted')}
+
+
+def load_json_clubs(path: str = DEFAULT_CATALOG_PATH) -> Dict[str, Any]:
+    """Load club data from an old style JSON catalog file."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return _live(json.load(f))
+
+
+def open_catalog(path: str = DEFAULT_CATALOG_PATH) -> Mapping[str, Any]:
+    """
+    Open a catalog file for reading, deleted clubs included.
+
+    Returns a memory mapped CatalogReader over the JSON Lines format. A JSON
+    catalog is converted to a JSON Lines copy next to it the first time it
+    is opened (and again whenever the JSON file is newer than the copy).
+    """
+    if not path.endswith('.jsonl'):
+        try:
+            path = convert_json_catalog(path)
+        except OSError as e:
+            # e.g. a read-only data directory, the JSON file still works
+            print(f"Could not convert {path} to JSON Lines: {e}")
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+    return CatalogReader(path)
+
+
+def load_clubs(path: str = DEFAULT_CATALOG_PATH) -> Dict[str, Any]:
+    """
+    Load every club as a dict, skipping deleted (tombstoned) clubs. The
+    serving path uses load_compact_clubs instead.
+    """
+    if not path.endswith('.jsonl'):
+        return load_json_clubs(path)
+    source = CatalogReader(path)
+    try:
+        return _live(source)
+    finally:
+        source.close()
+
+
+def search_text_cache_path(catalog_path: str) -> str:
+    """Where the normalized search text for a catalog file is cached."""
+    root, _ = os.path.splitext(catalog_path)
+    return f"{root}.search_cache.json"
+
+
+def _read_search_text_cache(path: str) -> Dict[str, Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get('version') != NORMALIZATION_VERSION:
+        return {}
+    return cache.get('entries', {})
+
+
+def _write_search_text_cache(path: str, entries: Dict[str, Any]) -> None:
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': NORMALIZATION_VERSION, 'entries': entries}, f)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Error writing search text cache: {e}")
+
+
+def with_search_text(clubs: Iterable[Tuple[str, Dict[str, Any]]],
+                     cache_path: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, Any], str]]:
+    """
+    Yield (club_id, club, normalized search text) for each club.
+
+    Results are cached on disk keyed by a fingerprint of each club's text
+    fields, so a restart only normalizes clubs that changed. The cache is
+    updated once every club has been read.
+    """
+    cached = _read_search_text_cache(cache_path) if cache_path else {}
+    entries = {}
+    misses = 0
+    for club_id, club in clubs:
+        fingerprint = club_fingerprint(club)
+        entry = cached.get(club_id)
+        if entry is None or entry[0] != fingerprint:
+            entry = [fingerprint, club_search_text(club)]
+            misses += 1
+        entries[club_id] = entry
+        yield club_id, club, entry[1]
+
+    if cache_path and (misses or len(entries) != len(cached)):
+        _write_search_text_cache(cache_path, entries)
+
+
+def add_search_text(clubs: Dict[str, Any], cache_path: Optional[str] = None) -> Dict[str, Any]:
+    """Store normalized search text on every club under 'search_text'."""
+    for _, club, text in with_search_text(clubs.items(), cache_path):
+        club['search_text'] = text
+    return clubs
+
+
+# Club fields kept in memory for serving, everything else stays on disk
+CLUB_FIELDS = ('id', 'name', 'shortName', 'summary', 'search_text', 'status', 'visibility', 'categories')
+_CLUB_FIELDS = frozenset(CLUB_FIELDS)
+
+
+class Club(Mapping):
+    """
+    Compact read-only club record used by the serving path.
+
+    Only the fields in CLUB_FIELDS are held, in slots, with status,
+    visibility and category names interned. Any other field (description,
+    contacts, social media, ...) is parsed from the catalog file when it
+    is asked for and not kept. It reads like the club's dict otherwise.
+    """
+
+    __slots__ = ('key',) + CLUB_FIELDS + ('_load',)
+
+    def __init__(self, key: str, fields: Mapping[str, Any],
+                 load: Optional[Callable[[str], Dict[str, Any]]] = None):
+        self.key = key
+        self.id = fields.get('id')
+        self.name = fields.get('name')
+        self.shortName = fields.get('shortName')
+        self.summary = fields.get('summary')
+        self.search_text = fields.get('search_text')
+        self.status = _intern(fields.get('status'))
+        self.visibility = _intern(fields.get('visibility'))
+        self.categories = tuple(sys.intern(name) for name in club_categories(fields))
+        self._load = load
+
+    def details(self) -> Dict[str, Any]:
+        """The club's full record from the catalog file, empty if there is none."""
+        return self._load(self.key) if self._load is not None else {}
+
+    def __getitem__(self, field: str) -> Any:
+        if field in _CLUB_FIELDS:
+            return getattr(self, field)
+        return self.details()[field]
+
+    def get(self, field: str, default: Any = None) -> Any:
+        if field in _CLUB_FIELDS:
+            return getattr(self, field)
+        return self.details().get(field, default)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(dict.fromkeys(CLUB_FIELDS + tuple(self.details())))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Club({self.key!r}, name={self.name!r})"
+
+
+def record_loader(source: Mapping[str, Any]) -> Callable[[str], Dict[str, Any]]:
+    """Function reading one club's full record from an open catalog, uncached."""
+    return source.read if isinstance(source, CatalogReader) else source.__getitem__
+
+
+def _intern(value: Any) -> Any:
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+def load_compact_clubs(path: str = DEFAULT_CATALOG_PATH) -> Dict[str, Club]:
+    """
+    Load the catalog as compact Club records, skipping deleted clubs.
+
+    Records are parsed one at a time and only their serving fields are
+    kept, so the full catalog is never held in memory. The catalog file
+    stays mapped to look up the remaining fields later.
+    """
+    source = open_catalog(path)
+    load = record_loader(source)
+    records = ((key, load(key)) for key in source)
+
+    clubs = {}
+    for club_id, club, text in with_search_text(
+        ((key, club) for key, club in records if not club.get('deleted')), search_text_cache_path(path)
+    ):
+        club['search_text'] = text
+        clubs[club_id] = Club(club_id, club, load)
+    return clubs
+
+
+class ClubCatalog:
+    """
+    Immutable snapshot of the club catalog.
+
+    A snapshot is never modified after it is built. Reloading produces a new
+    snapshot, so requests that already hold a reference keep using the old
+    data until they finish.
+    """
+
+    def __init__(self, clubs: Dict[str, Any], version: int = 0,
+                 source_path: Optional[str] = None, mtime: Optional[float] = None):
+        self.clubs: Mapping[str, Any] = MappingProxyType(dict(clubs))
+        self.version = version
+        self.source_path = source_path
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.RLock()  # factories may build other derived objects
+
+    def __len__(self) -> int:
+        return len(self.clubs)
+
+    def preload(self, objects: Mapping[str, Any]) -> None:
+        """Provide derived objects that were built ahead of time, e.g. from a snapshot."""
+        with self._derived_lock:
+            self._derived.update(objects)
+
+    def derived(self, key: str, factory: Callable[["ClubCatalog"], Any]) -> Any:
+        """
+        Return an object built from this snapshot (e.g. a search index),
+        building it on first use. Derived objects live and die with the
+        snapshot, so they are swapped together with it on reload.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = factory(self)
+            return self._derived[key]
+
+
+class CatalogManager:
+    """
+    Owns the current catalog snapshot and swaps it atomically when the file
+    on disk changes or a reload is requested.
+    """
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH, check_interval: float = 1.0,
+                 shared: bool = False):
+        self.path = path
+        self.check_interval = check_interval
+        # attach to the snapshot published for every worker process instead
+        # of loading a private copy, see models/shared_catalog.py
+        self.shared = None
+        if shared:
+            from models.shared_catalog import SharedCatalog
+            self.shared = SharedCatalog(path)
+        self._generation = 0
+        self._catalog: Optional[ClubCatalog] = None
+        self._version = 0
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[ClubCatalog], None]] = []
+
+    def add_reload_listener(self, listener: Callable[[ClubCatalog], None]) -> None:
+        """Call listener with the new snapshot every time one is swapped in."""
+        self._listeners.append(listener)
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _build(self, mtime: Optional[float], force: bool = False) -> ClubCatalog:
+        if self.shared is not None:
+            try:
+                catalog = self.shared.attach(force)
+                self._version = self._generation = catalog.version
+                return catalog
+            except (OSError, ValueError) as e:
+                print(f"Not using shared catalog: {e}")
+                self._generation = 0
+        self._version += 1
+        # imported here, the snapshot module itself depends on this one
+        from models.snapshot import load_snapshot, snapshot_path, source_info
+
+        path = snapshot_path(self.path)
+        if os.path.exists(path):
+            try:
+                return load_snapshot(path, source_info(self.path), self._version, self.path)
+            except (OSError, ValueError) as e:
+                print(f"Not using catalog snapshot: {e}")
+        return ClubCatalog(load_compact_clubs(self.path), version=self._version,
+                           source_path=self.path, mtime=mtime)
+
+    def reload(self, force: bool = True) -> ClubCatalog:
+        """
+        Reload from disk. Keeps the old snapshot if loading fails. With a
+        shared catalog, force publishes a new generation for every worker
+        even if the file didn't change.
+        """
+        with self._lock:
+            mtime = self._file_mtime()
+            try:
+                catalog = self._build(mtime, force)
+            except Exception as e:
+                print(f"Error loading clubs: {e}")
+                if self._catalog is None:
+                    self._catalog = ClubCatalog({}, version=self._version,
+                                                source_path=self.path, mtime=mtime)
+                return self._catalog
+            # single reference assignment, readers see either old or new
+            self._catalog = catalog
+            self._last_check = time.monotonic()
+        for listener in self._listeners:
+            listener(catalog)
+        return catalog
+
+    def get_catalog(self) -> ClubCatalog:
+        """Return the current snapshot, reloading it if the file changed."""
+        catalog = self._catalog
+        if catalog is None:
+            return self.reload(force=False)
+
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return catalog
+        self._last_check = now
+
+        mtime = self._file_mtime()
+        if mtime is not None and mtime != catalog.mtime:
+            return self.reload(force=False)
+        # another worker published a new generation
+        if self._generation and self.shared.generation() != self._generation:
+            return self.reload(force=False)
+        return catalog
+
+
+_manager: Optional[CatalogManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_catalog_manager() -> CatalogManager:
+    """Return the process-wide catalog manager."""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = CatalogManager(
+                    os.environ.get('CLUB_CATALOG_PATH', DEFAULT_CATALOG_PATH),
+                    shared=os.environ.get('CLUB_MATCH_SHARED_CATALOG', '0') == '1',
+                )
+    return _manager
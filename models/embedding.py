@@ -0,0 +1,323 @@
+import hashlib
+import heapq
+import json
+import math
+import mmap
+import os
+import random
+from array import array
+from collections import Counter
+from itertools import repeat
+from operator import add, itemgetter, mul
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from data_collection.club_text import NORMALIZATION_VERSION
+from models.catalog import ClubCatalog
+from models.inverted_index import tokenize
+from models.filters import Bitset, CatalogFilters
+from models.ranking import select_top_k
+from models.recommender import (
+    RecommendationStrategy,
+    catalog_recommendations,
+    parse_interests,
+    requested_top_k,
+    searchable_text,
+)
+
+FORMAT_VERSION = 1
+DIM = 64
+
+# Nonzero entries in each term's random index vector
+INDEX_NONZEROS = 8
+
+# Term vectors are learned from at most this many clubs
+MAX_TRAINING_CLUBS = 5000
+
+# A club vector is built from its highest weighted terms only
+MAX_TERMS_PER_CLUB = 32
+
+# Catalogs bigger than this are searched approximately: clubs are ranked by
+# the Hamming distance between binary SimHash codes and only the closest
+# RERANK_CANDIDATES get an exact dot product
+ANN_THRESHOLD = 2000
+CODE_BITS = 256
+PLANE_NONZEROS = 16
+RERANK_CANDIDATES = 400
+
+
+def index_vector(term: str) -> List[Tuple[int, float]]:
+    """Sparse random +-1 vector for a term, derived from its hash."""
+    digest = hashlib.blake2b(term.encode('utf-8'), digest_size=INDEX_NONZEROS).digest()
+    return [(byte % DIM, 1.0 if byte & 0x80 else -1.0) for byte in digest]
+
+
+def normalize(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    return [x / norm for x in vector] if norm else vector
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    return sum(map(mul, a, b))
+
+
+def scaled_add(total: Optional[List[float]], vector: Sequence[float], weight: float) -> List[float]:
+    """total + weight * vector, starting a new total when it is None."""
+    scaled = map(mul, vector, repeat(weight))
+    return list(scaled) if total is None else list(map(add, total, scaled))
+
+
+def train_term_vectors(texts: List[List[str]]) -> Tuple[List[str], List[float], List[List[float]]]:
+    """
+    Learn term vectors by random indexing: a term's vector is the sum of the
+    random index vectors of the clubs it appears in, so terms used by the
+    same clubs ("hackathon", "coding", "competition") end up close together.
+    Returns (terms, idf per term, unit vector per term).
+    """
+    df = Counter(term for tokens in texts for term in set(tokens))
+    terms = sorted(df)
+    idf = [math.log(1 + len(texts) / df[term]) for term in terms]
+
+    step = max(1, len(texts) // MAX_TRAINING_CLUBS)
+    vectors: Dict[str, List[float]] = {}
+    for doc, tokens in enumerate(texts[::step]):
+        # a club's context signature is its own sparse random vector
+        signature = index_vector(f'#club{doc}')
+        for term, count in Counter(tokens).items():
+            vector = vectors.get(term)
+            if vector is None:
+                vector = vectors[term] = [0.0] * DIM
+            weight = 1 + math.log(count)
+            for position, sign in signature:
+                vector[position] += weight * sign
+
+    unit_vectors = []
+    for term in terms:
+        vector = vectors.get(term)
+        if vector is None:
+            # term only in clubs skipped for training, fall back to its hash
+            vector = [0.0] * DIM
+            for position, sign in index_vector(term):
+                vector[position] += sign
+        unit_vectors.append(normalize(vector))
+    return terms, idf, unit_vectors
+
+
+def simhash_planes(bits: int = CODE_BITS) -> List[Tuple[Callable, Callable]]:
+    """
+    Sparse random hyperplanes, each as getters for its +1 and -1 components.
+    The same for every build, so saved codes stay valid.
+    """
+    rng = random.Random(FORMAT_VERSION)
+    planes = []
+    for _ in range(bits):
+        positions = rng.sample(range(DIM), PLANE_NONZEROS)
+        half = PLANE_NONZEROS // 2
+        planes.append((itemgetter(*positions[:half]), itemgetter(*positions[half:])))
+    return planes
+
+
+def simhash(vector: Sequence[float], planes: List[Tuple[Callable, Callable]]) -> int:
+    """Binary code with one bit per plane: which side of it the vector is on."""
+    code = 0
+    for positive, negative in planes:
+        code = (code << 1) | (sum(positive(vector)) > sum(negative(vector)))
+    return code
+
+
+class VectorStore:
+    """
+    Term and club embeddings as float32 matrices, searched by dot product.
+
+    Catalogs past ANN_THRESHOLD also keep a SimHash code per club; a search
+    then ranks every club by Hamming distance to the query's code, a cheap
+    integer operation, and rescores only the closest candidates exactly.
+    Stores built from a catalog file are saved next to it and memory mapped
+    on later loads.
+    """
+
+    def __init__(self, header: Dict[str, Any], term_matrix: Sequence[float],
+                 club_matrix: Sequence[float], codes: Optional[List[int]] = None):
+        self.header = header
+        self.terms: Dict[str, int] = {term: i for i, term in enumerate(header['terms'])}
+        self.idf: List[float] = header['idf']
+        self.num_clubs: int = header['clubs']
+        self.term_matrix = term_matrix
+        self.club_matrix = club_matrix
+        self.codes = codes
+        self.planes = simhash_planes(header['code_bits']) if codes is not None else []
+
+    @property
+    def approximate(self) -> bool:
+        return self.codes is not None
+
+    def _term_vector(self, i: int) -> Sequence[float]:
+        return self.term_matrix[i * DIM:(i + 1) * DIM]
+
+    def _club_vector(self, doc: int) -> Sequence[float]:
+        return self.club_matrix[doc * DIM:(doc + 1) * DIM]
+
+    def embed_terms(self, weights: Mapping[str, float]) -> Optional[List[float]]:
+        """Unit vector for weighted terms, or None if none of them is known."""
+        vector = None
+        for term, weight in weights.items():
+            i = self.terms.get(term)
+            if i is not None:
+                vector = scaled_add(vector, self._term_vector(i), weight * self.idf[i])
+        return normalize(vector) if vector is not None else None
+
+    def embed(self, text: str) -> Optional[List[float]]:
+        return self.embed_terms(Counter(tokenize(text)))
+
+    def candidates(self, query: Sequence[float], k: int, allowed: Optional[Bitset] = None):
+        docs = range(self.num_clubs) if allowed is None else list(allowed)
+        if not self.approximate or len(docs) <= max(k, RERANK_CANDIDATES):
+            return docs
+        code = simhash(query, self.planes)
+        codes = self.codes
+        return heapq.nsmallest(max(k, RERANK_CANDIDATES), docs,
+                               key=lambda doc: (codes[doc] ^ code).bit_count())
+
+    def search(self, query: Sequence[float], k: int,
+               allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
+        """
+        Best k (club number, cosine similarity) pairs for a unit query
+        vector, only among `allowed` clubs if given.
+        """
+        return select_top_k(
+            ((doc, dot(query, self._club_vector(doc))) for doc in self.candidates(query, k, allowed)), k
+        )
+
+
+def club_term_weights(tokens: List[str], store_terms: Mapping[str, int], idf: List[float]) -> Dict[str, float]:
+    """Log-scaled term counts of a club, limited to its MAX_TERMS_PER_CLUB best tf-idf terms."""
+    weights = {term: 1 + math.log(count) for term, count in Counter(tokens).items()}
+    best = heapq.nlargest(MAX_TERMS_PER_CLUB, weights, key=lambda t: weights[t] * idf[store_terms[t]])
+    return {term: weights[term] for term in best}
+
+
+def build_vector_store(clubs: Mapping[str, Any], source: Optional[Dict[str, Any]] = None,
+                       approximate: Optional[bool] = None) -> VectorStore:
+    """Embed every club in catalog order. `approximate` forces the Hamming pre-ranking on or off."""
+    texts = [tokenize(searchable_text(club)) for club in clubs.values()]
+    terms, idf, vectors = train_term_vectors(texts)
+
+    if approximate is None:
+        approximate = len(texts) > ANN_THRESHOLD
+    header = {
+        'format': FORMAT_VERSION, 'dim': DIM, 'source': source, 'clubs': len(texts),
+        'code_bits': CODE_BITS if approximate else 0, 'terms': terms, 'idf': idf,
+    }
+    term_matrix = array('f', (x for vector in vectors for x in vector))
+    store = VectorStore(header, term_matrix, array('f'))
+
+    club_matrix = array('f')
+    for tokens in texts:
+        club_matrix.extend(store.embed_terms(club_term_weights(tokens, store.terms, idf)) or [0.0] * DIM)
+
+    codes = None
+    if approximate:
+        planes = simhash_planes()
+        codes = [simhash(club_matrix[doc * DIM:(doc + 1) * DIM], planes) for doc in range(len(texts))]
+    return VectorStore(header, term_matrix, club_matrix, codes)
+
+
+def vector_store_path(catalog_path: str) -> str:
+    """Where the embeddings of a catalog file are stored."""
+    root, _ = os.path.splitext(catalog_path)
+    return f"{root}.vectors.f32"
+
+
+def save_vector_store(store: VectorStore, path: str) -> None:
+    """
+    Write the store as a JSON header line padded to a multiple of 4 bytes,
+    then the native-endian float32 term and club matrices and, for
+    approximate stores, each club's SimHash code as big-endian bytes.
+    """
+    header = json.dumps(store.header).encode('utf-8')
+    header += b' ' * (-(len(header) + 1) % 4) + b'\n'
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        array('f', store.term_matrix).tofile(f)
+        array('f', store.club_matrix).tofile(f)
+        if store.codes is not None:
+            width = store.header['code_bits'] // 8
+            f.write(b''.join(code.to_bytes(width, 'big') for code in store.codes))
+    os.replace(tmp_path, path)
+
+
+def load_vector_store(path: str) -> VectorStore:
+    """Memory map a saved store; the matrices are read from the page cache as needed."""
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header_end = data.find(b'\n') + 1
+    header = json.loads(data[:header_end])
+    if header.get('format') != FORMAT_VERSION or header.get('dim') != DIM:
+        raise ValueError(f"{path} has an unsupported vector store format")
+
+    view = memoryview(data)
+    term_end = header_end + len(header['terms']) * DIM * 4
+    club_end = term_end + header['clubs'] * DIM * 4
+    codes = None
+    if header['code_bits']:
+        width = header['code_bits'] // 8
+        codes = [int.from_bytes(data[i:i + width], 'big')
+                 for i in range(club_end, club_end + header['clubs'] * width, width)]
+    return VectorStore(header, view[header_end:term_end].cast('f'),
+                       view[term_end:club_end].cast('f'), codes)
+
+
+def load_or_build_vector_store(catalog: ClubCatalog) -> VectorStore:
+    """
+    Embeddings for a catalog snapshot, reused from disk when they were built
+    from the same catalog file with the same text normalization, and rebuilt
+    (and saved) otherwise.
+    """
+    if catalog.source_path is None:
+        return build_vector_store(catalog.clubs)
+
+    path = vector_store_path(catalog.source_path)
+    source = {'mtime': catalog.mtime, 'clubs': len(catalog), 'normalization': NORMALIZATION_VERSION}
+    try:
+        store = load_vector_store(path)
+        if store.header['source'] == source:
+            return store
+    except (OSError, ValueError) as e:
+        if os.path.exists(path):
+            print(f"Error loading vector store: {e}")
+
+    store = build_vector_store(catalog.clubs, source)
+    try:
+        save_vector_store(store, path)
+    except OSError as e:
+        print(f"Error saving vector store: {e}")
+    return store
+
+
+class EmbeddingRecommender(RecommendationStrategy):
+    """
+    Ranks clubs by cosine similarity between embeddings of the interests and
+    of each club's text, so related words match without sharing letters.
+    Runs fully offline: embeddings are learned from the catalog itself.
+    """
+    name = 'embedding'
+
+    def __init__(self, catalog: ClubCatalog):
+        self.store: VectorStore = catalog.derived('vector_store', load_or_build_vector_store)
+        self.filters = catalog.derived('filters', lambda c: CatalogFilters(c.clubs))
+        self.recommendations = catalog_recommendations(catalog)
+
+    def recommend(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the clubs whose embeddings are closest to the user's interests."""
+        return self.to_recommendations(self.rank(user_data, self.allowed(user_data)))
+
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
+        interests = user_data.get('interests', '')
+        if not interests:
+            return []
+
+        query = self.store.embed(' '.join(parse_interests(interests)))
+        if query is None:
+            return []
+        ranked = self.store.search(query, requested_top_k(user_data), allowed)
+        return [(doc, score) for doc, score in ranked if score > 0]
@@ -0,0 +1,99 @@
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+# Club fields that requests can filter on
+FILTER_FIELDS = ('status', 'visibility', 'category')
+
+
+def club_categories(club: Mapping[str, Any]) -> List[str]:
+    """Category names of a club, lowercased. The scraper stores names or {"name": ...} objects."""
+    names = []
+    for category in club.get('categories') or []:
+        name = category.get('name') if isinstance(category, dict) else category
+        if name:
+            names.append(str(name).lower())
+    return names
+
+
+class Bitset:
+    """Set of document numbers stored as the bits of an int, cheap to intersect."""
+
+    __slots__ = ('bits', 'size', '_bytes')
+
+    def __init__(self, bits: int, size: int):
+        self.bits = bits
+        self.size = size
+        self._bytes: Optional[bytes] = None
+
+    @classmethod
+    def from_docs(cls, docs: Iterable[int], size: int) -> 'Bitset':
+        bits = 0
+        for doc in docs:
+            bits |= 1 << doc
+        return cls(bits, size)
+
+    def __and__(self, other: 'Bitset') -> 'Bitset':
+        return Bitset(self.bits & other.bits, self.size)
+
+    def __or__(self, other: 'Bitset') -> 'Bitset':
+        return Bitset(self.bits | other.bits, self.size)
+
+    def __contains__(self, doc: int) -> bool:
+        # byte lookups instead of shifting the whole int for every test
+        if self._bytes is None:
+            self._bytes = self.bits.to_bytes((self.size + 7) // 8, 'little')
+        return bool(self._bytes[doc >> 3] >> (doc & 7) & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        return (doc for doc in range(self.size) if doc in self)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+
+class CatalogFilters:
+    """
+    Bitsets of the clubs with each status, visibility and category value,
+    built once per catalog snapshot so filtering a request is an AND of
+    precomputed sets rather than a pass over every club.
+    """
+
+    def __init__(self, clubs: Mapping[str, Any]):
+        self.size = len(clubs)
+        docs: Dict[Tuple[str, str], List[int]] = {}
+        for doc, club in enumerate(clubs.values()):
+            values = [('status', club.get('status')), ('visibility', club.get('visibility'))]
+            values += [('category', name) for name in club_categories(club)]
+            for field, value in values:
+                if value:
+                    docs.setdefault((field, str(value).lower()), []).append(doc)
+        self.bitsets: Dict[Tuple[str, str], Bitset] = {
+            key: Bitset.from_docs(doc_list, self.size) for key, doc_list in docs.items()
+        }
+
+    def allowed(self, user_data: Mapping[str, Any]) -> Optional[Bitset]:
+        """Clubs passing the request's filters, or None when it has no filters."""
+        allowed = None
+        for field in FILTER_FIELDS:
+            value = user_data.get(field)
+            if not value:
+                continue
+            bitset = self.bitsets.get((field, str(value).lower()), Bitset(0, self.size))
+            allowed = bitset if allowed is None else allowed & bitset
+        return allowed
+
+
+def allowed_by_any(allowed: Iterable[Optional[Bitset]]) -> Optional[Bitset]:
+    """Clubs that at least one of a batch's requests allows, None if one has no filters."""
+    union = None
+    for bitset in allowed:
+        if bitset is None:
+            return None
+        union = bitset if union is None else union | bitset
+    return union
+
+
+def filter_key(user_data: Mapping[str, Any]) -> Tuple[Tuple[str, str], ...]:
+    """The request's filters in a hashable form, e.g. for cache keys."""
+    return tuple(
+        (field, str(user_data[field]).lower()) for field in FILTER_FIELDS if user_data.get(field)
+    )
@@ -0,0 +1,214 @@
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from models.catalog import ClubCatalog
+from models.filters import Bitset, CatalogFilters
+from models.inverted_index import InvertedIndex, tokenize
+from models.ranking import TermContribution, rank_terms_top_k, restrict
+from models.recommender import (
+    RecommendationStrategy,
+    catalog_recommendations,
+    parse_interests,
+    requested_top_k,
+)
+
+# How much a matched variant counts compared to the exact word
+PREFIX_WEIGHT = 0.75
+TYPO_WEIGHTS = {1: 0.5, 2: 0.3}
+
+# Shortest word that gets prefix completion / typo correction
+MIN_PREFIX_LENGTH = 3
+MIN_TYPO_LENGTH = 4
+
+# Most variants a single word expands to, the most common terms win
+MAX_EXPANSIONS = 32
+
+NGRAM = 3
+
+
+def max_typos(word: str) -> int:
+    """Edit distance tolerated for a word, longer words allow more."""
+    if len(word) < MIN_TYPO_LENGTH:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Levenshtein distance between a and b, or limit + 1 as soon as it is
+    known to exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            ))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def ngrams(word: str, n: int = NGRAM) -> Set[str]:
+    padded = f"${word}$"
+    return {padded[i:i + n] for i in range(max(1, len(padded) - n + 1))}
+
+
+class PrefixTrie:
+    """Character trie over the vocabulary for prefix completion."""
+
+    END = ''
+
+    def __init__(self, terms: Iterable[str]):
+        self.root: Dict[str, Any] = {}
+        for term in terms:
+            node = self.root
+            for char in term:
+                node = node.setdefault(char, {})
+            node[self.END] = term
+
+    def with_prefix(self, prefix: str) -> List[str]:
+        """Every term starting with prefix (including prefix itself if it's a term)."""
+        node = self.root
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+        terms = []
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            for char, child in node.items():
+                if char == self.END:
+                    terms.append(child)
+                else:
+                    stack.append(child)
+        return terms
+
+
+class NgramIndex:
+    """
+    Character n-gram index over the vocabulary for typo lookup. Only terms
+    sharing enough n-grams with the word are checked with edit_distance.
+    """
+
+    def __init__(self, terms: Iterable[str], n: int = NGRAM):
+        self.n = n
+        self.grams: Dict[str, List[str]] = defaultdict(list)
+        for term in terms:
+            for gram in ngrams(term, n):
+                self.grams[gram].append(term)
+
+    def within(self, word: str, limit: int) -> Dict[str, int]:
+        """Terms within `limit` edits of word, mapped to their distance."""
+        word_grams = ngrams(word, self.n)
+        # each edit changes at most n of the word's n-grams
+        needed = len(word_grams) - self.n * limit
+        shared: Dict[str, int] = defaultdict(int)
+        for gram in word_grams:
+            for term in self.grams.get(gram, ()):
+                shared[term] += 1
+
+        matches = {}
+        for term, count in shared.items():
+            if count < needed:
+                continue
+            distance = edit_distance(word, term, limit)
+            if distance <= limit:
+                matches[term] = distance
+        return matches
+
+
+class FuzzyMatcher:
+    """Resolves typed words to catalog terms: exact, prefix and typo matches."""
+
+    def __init__(self, postings: Mapping[str, Dict[int, int]]):
+        self.postings = postings
+        self.trie = PrefixTrie(postings)
+        self.ngrams = NgramIndex(postings)
+
+    def expand(self, word: str) -> Dict[str, float]:
+        """Vocabulary terms the word may stand for, with the weight each one counts for."""
+        variants: Dict[str, float] = {}
+        if word in self.postings:
+            variants[word] = 1.0
+        if len(word) >= MIN_PREFIX_LENGTH:
+            for term in self.trie.with_prefix(word):
+                variants.setdefault(term, PREFIX_WEIGHT)
+        if word not in self.postings and max_typos(word):
+            for term, distance in self.ngrams.within(word, max_typos(word)).items():
+                if variants.get(term, 0.0) < TYPO_WEIGHTS[distance]:
+                    variants[term] = TYPO_WEIGHTS[distance]
+
+        if len(variants) > MAX_EXPANSIONS:
+            best = sorted(variants, key=lambda t: (-variants[t], -len(self.postings[t]), t))
+            variants = {term: variants[term] for term in best[:MAX_EXPANSIONS]}
+        return variants
+
+
+class FuzzyRecommender(RecommendationStrategy):
+    """
+    Keyword matching that tolerates typos and unfinished words.
+
+    Each word of a keyword is resolved against the catalog vocabulary first
+    ("robotic" -> robotics, "basketbal" -> basketball, "sci" -> science) and
+    only the postings of those terms are scored. A club's score for a word is
+    its best weighted term count among the variants; multi-word keywords
+    need every word to match, like the inverted index strategy.
+    """
+    name = 'fuzzy'
+
+    def __init__(self, catalog: ClubCatalog):
+        self.index: InvertedIndex = catalog.derived(
+            'inverted_index', lambda c: InvertedIndex(c.clubs)
+        )
+        self.matcher: FuzzyMatcher = catalog.derived(
+            'fuzzy_matcher', lambda c: FuzzyMatcher(self.index.postings)
+        )
+        self.filters = catalog.derived('filters', lambda c: CatalogFilters(c.clubs))
+        self.recommendations = catalog_recommendations(catalog)
+
+    def word_scores(self, word: str) -> Dict[int, float]:
+        scores: Dict[int, float] = {}
+        for term, weight in self.matcher.expand(word).items():
+            for doc, tf in self.index.postings[term].items():
+                score = weight * tf
+                if score > scores.get(doc, 0.0):
+                    scores[doc] = score
+        return scores
+
+    def keyword_scores(self, keyword: str) -> Dict[int, float]:
+        words = tokenize(keyword)
+        if not words:
+            return {}
+        lists = sorted((self.word_scores(word) for word in words), key=len)
+        if not lists[0]:
+            return {}
+        if len(lists) == 1:
+            return lists[0]
+        docs = set(lists[0]).intersection(*lists[1:])
+        return {doc: min(scores[doc] for scores in lists) for doc in docs}
+
+    def recommend(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Match interests with clubs, allowing prefixes and small typos."""
+        return self.to_recommendations(self.rank(user_data, self.allowed(user_data)))
+
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
+        interests = user_data.get('interests', '')
+        if not interests:
+            return []
+
+        contributions = []
+        for keyword in parse_interests(interests):
+            scores = self.keyword_scores(keyword)
+            if scores:
+                contributions.append(TermContribution(
+                    max(scores.values()), scores.items, lambda doc, s=scores: s.get(doc, 0.0)
+                ))
+        return rank_terms_top_k(restrict(contributions, allowed), requested_top_k(user_data))
@@ -0,0 +1,110 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from models.catalog import ClubCatalog
+from models.filters import Bitset, CatalogFilters, club_categories
+from models.metrics import timed
+from models.ranking import select_top_k
+from models.recommender import (
+    PartialResults,
+    RecommendationStrategy,
+    catalog_recommendations,
+    is_partial,
+    parse_interests,
+    requested_top_k,
+)
+
+FUSION_METHODS = ('rrf', 'weighted')
+
+# Reciprocal rank fusion constant, dampens the lead of the very first ranks
+RRF_K = 60
+
+# How many candidates each component strategy contributes to the fusion
+CANDIDATE_DEPTH = 50
+
+
+class CategoryRecommender(RecommendationStrategy):
+    """Scores clubs by how many interests match one of their category names."""
+    name = 'category'
+
+    def __init__(self, catalog: ClubCatalog):
+        self.recommendations = catalog_recommendations(catalog)
+        self.filters = catalog.derived('filters', lambda c: CatalogFilters(c.clubs))
+        # category name -> clubs in it, from the same bitsets the filters use
+        self.categories: Dict[str, Bitset] = {
+            value: bitset for (field, value), bitset in self.filters.bitsets.items()
+            if field == 'category'
+        }
+
+    def recommend(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return clubs whose categories match the user's interests."""
+        return self.to_recommendations(self.rank(user_data, self.allowed(user_data)))
+
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
+        interests = user_data.get('interests', '')
+        if not interests:
+            return []
+
+        scores: Dict[int, float] = {}
+        for keyword in parse_interests(interests):
+            if not keyword:
+                continue
+            for name, members in self.categories.items():
+                if keyword in name:
+                    if allowed is not None:
+                        members = members & allowed
+                    for doc in members:
+                        scores[doc] = scores.get(doc, 0.0) + 1.0
+        return select_top_k(scores.items(), requested_top_k(user_data))
+
+
+class HybridRecommender(RecommendationStrategy):
+    """
+    Pipeline that fuses the rankings of several strategies.
+
+    The request's filters are resolved to a bitset first and handed to each
+    component, so filtered out clubs are never scored. Every component ranks
+    its top CANDIDATE_DEPTH clubs, then the lists are fused with reciprocal
+    rank fusion ('rrf', weight / (RRF_K + rank)) or a weighted sum of scores
+    scaled to each list's best ('weighted'). Each stage is timed separately.
+    """
+    name = 'hybrid'
+
+    def __init__(self, catalog: ClubCatalog, components: List[Tuple[RecommendationStrategy, float]],
+                 fusion: str = 'rrf', depth: int = CANDIDATE_DEPTH):
+        if fusion not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {fusion}")
+        self.components = components
+        self.fusion = fusion
+        self.depth = depth
+        self.recommendations = catalog_recommendations(catalog)
+        self.filters = catalog.derived('filters', lambda c: CatalogFilters(c.clubs))
+
+    def recommend(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Return the best clubs across every component strategy."""
+        return self.to_recommendations(self.rank(user_data, self.allowed(user_data)))
+
+    def fuse(self, fused: Dict[int, float], ranked: List[Tuple[int, float]], weight: float) -> None:
+        """Add one component's ranking into the fused scores."""
+        if self.fusion == 'rrf':
+            for rank, (doc, _) in enumerate(ranked, 1):
+                fused[doc] = fused.get(doc, 0.0) + weight / (RRF_K + rank)
+        elif ranked:
+            best = ranked[0][1] or 1.0
+            for doc, score in ranked:
+                fused[doc] = fused.get(doc, 0.0) + weight * score / best
+
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
+        top_k = requested_top_k(user_data)
+        request = dict(user_data, top_k=max(self.depth, top_k))
+
+        fused: Dict[int, float] = {}
+        partial = False
+        for strategy, weight in self.components:
+            with timed(f'retrieve_{strategy.name}'):
+                ranked = strategy.rank(request, allowed)
+            # a component that ran out of budget makes the fused ranking partial too
+            partial = partial or is_partial(ranked)
+            with timed('fuse'):
+                self.fuse(fused, ranked, weight)
+        top = select_top_k(fused.items(), top_k)
+        return PartialResults(top) if partial else top
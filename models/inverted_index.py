@@ -0,0 +1,224 @@
+import re
+from collections import defaultdict
+from typing import Any, Container, Dict, List, Mapping, Optional, Set, Tuple
+
+from models.catalog import ClubCatalog
+from models.filters import Bitset, CatalogFilters, allowed_by_any
+from models.metrics import annotate
+from models.ranking import TermContribution, rank_terms_top_k, restrict, select_top_k
+from models.recommender import (
+    PartialResults,
+    RecommendationStrategy,
+    catalog_planner,
+    catalog_recommendations,
+    parse_interests,
+    requested_top_k,
+    searchable_text,
+)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercased word tokens."""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Token level inverted index over the club catalog.
+
+    Maps each term to its postings ({document number: term frequency}).
+    Document numbers follow catalog order so ties rank the same way as
+    SurveyRecommender's stable sort.
+    """
+
+    def __init__(self, clubs: Mapping[str, Any]):
+        self.club_ids: List[str] = list(clubs.keys())
+        self.clubs: List[Dict[str, Any]] = list(clubs.values())
+        self.texts: List[str] = [searchable_text(club) for club in self.clubs]
+        self.postings: Dict[str, Dict[int, int]] = {}
+
+        for doc, text in enumerate(self.texts):
+            for term in tokenize(text):
+                postings = self.postings.get(term)
+                if postings is None:
+                    postings = self.postings[term] = {}
+                postings[doc] = postings.get(doc, 0) + 1
+
+        # highest frequency per term, an upper bound used for early termination
+        self.term_max: Dict[str, int] = {
+            term: max(postings.values()) for term, postings in self.postings.items()
+        }
+
+    @classmethod
+    def from_columns(cls, clubs: Mapping[str, Any], postings: Mapping[str, Dict[int, int]],
+                     term_max: Dict[str, int]) -> 'InvertedIndex':
+        """An index over clubs whose postings were built beforehand (see models.snapshot)."""
+        index = cls.__new__(cls)
+        index.club_ids = list(clubs.keys())
+        index.clubs = list(clubs.values())
+        index.texts = [searchable_text(club) for club in index.clubs]
+        index.postings = postings
+        index.term_max = term_max
+        return index
+
+    def __len__(self) -> int:
+        return len(self.clubs)
+
+    def token_scores(self, keyword: str) -> Dict[int, int]:
+        """
+        Whole-token matching. A multi-word keyword only matches clubs that
+        contain every word, scored by the count of its rarest word.
+        """
+        tokens = tokenize(keyword)
+        if not tokens:
+            return {}
+
+        lists = [self.postings.get(token) for token in tokens]
+        if any(not postings for postings in lists):
+            return {}
+        if len(lists) == 1:
+            return dict(lists[0])
+
+        lists.sort(key=len)
+        docs = set(lists[0]).intersection(*lists[1:])
+        return {doc: min(postings[doc] for postings in lists) for doc in docs}
+
+    def _docs_with_term_containing(self, token: str) -> Set[int]:
+        docs: Set[int] = set()
+        for term, postings in self.postings.items():
+            if token in term:
+                docs.update(postings)
+        return docs
+
+    def substring_scores(self, keyword: str, within: Optional[Container[int]] = None) -> Dict[int, int]:
+        """
+        Same scores as SurveyRecommender._calculate_match_score for one keyword.
+
+        Every word in the keyword must sit inside some indexed term of a
+        matching club, so the vocabulary narrows the candidates and only
+        those club texts are counted. With `within`, only those documents
+        are counted.
+        """
+        tokens = tokenize(keyword)
+        if tokens:
+            candidates = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                docs = self._docs_with_term_containing(token)
+                candidates = docs if candidates is None else candidates & docs
+                if not candidates:
+                    return {}
+        else:
+            # punctuation-only or empty keyword, nothing to narrow on
+            candidates = range(len(self.texts))
+        if within is not None:
+            candidates = [doc for doc in candidates if doc in within]
+
+        scores = {}
+        for doc in candidates:
+            count = self.texts[doc].count(keyword)
+            if count:
+                scores[doc] = count
+        return scores
+
+
+class InvertedIndexRecommender(RecommendationStrategy):
+    name = 'inverted_index'
+    per_club_scores = True
+
+    def __init__(self, catalog: ClubCatalog, substring_mode: bool = False):
+        # The index is shared by every strategy built on the same snapshot
+        self.index: InvertedIndex = catalog.derived(
+            'inverted_index', lambda c: InvertedIndex(c.clubs)
+        )
+        self.filters = catalog.derived('filters', lambda c: CatalogFilters(c.clubs))
+        self.recommendations = catalog_recommendations(catalog)
+        self.substring_mode = substring_mode
+        if substring_mode:
+            self.name = 'inverted_index_substring'
+            # plans keywords like the survey strategy, which this mode matches
+            self.planner = catalog.derived('query_planner', catalog_planner)
+            self.size = len(catalog)
+
+    def keyword_scores(self, keyword: str, memo: Optional[Dict[str, Dict[int, int]]] = None,
+                       within: Optional[Container[int]] = None) -> Dict[int, int]:
+        """
+        Scores for one keyword, reusing `memo` when the same keyword was
+        already scored. In substring mode only documents `within` are
+        counted, a memo must always be used with the same `within`.
+        """
+        if memo is not None and keyword in memo:
+            return memo[keyword]
+        if self.substring_mode:
+            scores = self.index.substring_scores(keyword, within)
+        else:
+            scores = self.index.token_scores(keyword)
+        if memo is not None:
+            memo[keyword] = scores
+        return scores
+
+    def score(self, keywords: List[str], memo: Optional[Dict[str, Dict[int, int]]] = None,
+              within: Optional[Container[int]] = None) -> Dict[int, int]:
+        """Total score per document number for the given keywords."""
+        scores: Dict[int, int] = defaultdict(int)
+        for keyword in keywords:
+            keyword_scores = self.keyword_scores(keyword, memo, within)
+            for doc, count in keyword_scores.items():
+                scores[doc] += count
+        return scores
+
+    def contributions(self, keywords: List[str],
+                      memo: Optional[Dict[str, Dict[int, int]]] = None) -> List[TermContribution]:
+        """Per keyword postings and upper bounds for whole-token matching."""
+        contributions = []
+        for keyword in keywords:
+            tokens = tokenize(keyword)
+            if len(tokens) == 1 and tokens[0] in self.index.postings:
+                postings = self.index.postings[tokens[0]]
+                upper_bound = self.index.term_max[tokens[0]]
+            else:
+                postings = self.keyword_scores(keyword, memo)
+                if not postings:
+                    continue
+                upper_bound = max(postings.values())
+            contributions.append(TermContribution(
+                upper_bound, postings.items, lambda doc, p=postings: p.get(doc, 0)
+            ))
+        return contributions
+
+    def recommend(self, user_data: Dict[str, Any], memo: Optional[Dict[str, Dict[int, int]]] = None,
+                  within: Optional[Container[int]] = None) -> List[Dict[str, Any]]:
+        """Match user interests with clubs by looking keywords up in the index."""
+        return self.to_recommendations(self.rank(user_data, self.allowed(user_data), memo, within))
+
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None,
+             memo: Optional[Dict[str, Dict[int, int]]] = None,
+             within: Optional[Container[int]] = None) -> List[Tuple[int, float]]:
+        """
+        `within` is what `memo` is scored over (the clubs any request of a
+        batch allows), without a memo only the allowed clubs are scored.
+        """
+        interests = user_data.get('interests', '')
+        if not interests:
+            return []
+
+        keywords = parse_interests(interests)
+        top_k = requested_top_k(user_data)
+        if self.substring_mode:
+            scanned = self.size if allowed is None else len(allowed)
+            plan = self.planner.plan(keywords, lambda keyword: scanned)
+            scores = self.score(plan.keywords, memo, allowed if memo is None else within).items()
+            if memo is not None and allowed is not None:
+                # the memo may hold clubs other requests of the batch allow
+                scores = [(doc, score) for doc, score in scores if doc in allowed]
+            annotate('matched', len(scores))
+            ranked = select_top_k(scores, top_k)
+            return PartialResults(ranked) if plan.partial else ranked
+        return rank_terms_top_k(restrict(self.contributions(keywords, memo), allowed), top_k)
+
+    def recommend_batch(self, batch: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Recommend for many users, looking each distinct keyword up only once."""
+        memo: Dict[str, Dict[int, int]] = {}
+        within = allowed_by_any(self.allowed(user_data) for user_data in batch) if self.substring_mode else None
+        return [self.recommend(user_data, memo, within) for user_data in batch]
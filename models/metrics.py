@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+# CLUB_MATCH_METRICS=0 turns every timer into a shared no-op
+ENABLED = os.environ.get('CLUB_MATCH_METRICS', '1') != '0'
+
+# Histogram bucket upper bounds in seconds
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+METRIC_NAME = 'club_match_stage_seconds'
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        # one count per bucket plus one for +Inf, not yet cumulative
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class StageMetrics:
+    """Latency histograms for each (stage, strategy) pair. Thread safe."""
+
+    def __init__(self, buckets: Tuple[float, ...] = BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, strategy: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get((stage, strategy))
+            if histogram is None:
+                histogram = self._histograms[(stage, strategy)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    def get(self, stage: str, strategy: str) -> Optional[Histogram]:
+        return self._histograms.get((stage, strategy))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """All histograms in the Prometheus text exposition format."""
+        lines = [
+            f'# HELP {METRIC_NAME} Time spent in each stage of serving a recommendation.',
+            f'# TYPE {METRIC_NAME} histogram',
+        ]
+        with self._lock:
+            for (stage, strategy), histogram in sorted(self._histograms.items()):
+                labels = f'stage="{stage}",strategy="{strategy}"'
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float('inf'),), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{METRIC_NAME}_bucket{{{labels},le="{le}"}} {cumulative}')
+                lines.append(f'{METRIC_NAME}_sum{{{labels}}} {histogram.sum}')
+                lines.append(f'{METRIC_NAME}_count{{{labels}}} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+class RequestTimings:
+    """Stage durations of the request being served, for the Server-Timing header."""
+
+    def __init__(self):
+        self.strategy = ''
+        self.stages: Dict[str, float] = {}
+        # what was asked and found (keywords, clubs matched, ...), for the slow query log
+        self.details: Dict[str, Any] = {}
+        # whether to run this request under the profiler
+        self.profile = False
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def server_timing(self) -> str:
+        return ', '.join(f'{stage};dur={seconds * 1000:.3f}' for stage, seconds in self.stages.items())
+
+
+stage_metrics = StageMetrics()
+
+_current: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+def start_request() -> RequestTimings:
+    """Begin collecting stage timings for the request in this context."""
+    timings = RequestTimings()
+    _current.set(timings)
+    return timings
+
+
+def current_request() -> Optional[RequestTimings]:
+    return _current.get()
+
+
+def label_strategy(name: str) -> None:
+    """Label the current request's stages with the strategy serving it."""
+    timings = _current.get()
+    if timings is not None:
+        timings.strategy = name
+
+
+def annotate(key: str, value: Any) -> None:
+    """Record a detail about the current request, e.g. how many clubs matched."""
+    timings = _current.get()
+    if timings is not None:
+        timings.details[key] = value
+
+
+class _Stage:
+    __slots__ = ('stage', 'start')
+
+    def __init__(self, stage: str):
+        self.stage = stage
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc_info) -> None:
+        elapsed = time.perf_counter() - self.start
+        timings = _current.get()
+        if timings is None:
+            stage_metrics.observe(self.stage, '', elapsed)
+        else:
+            timings.add(self.stage, elapsed)
+            stage_metrics.observe(self.stage, timings.strategy, elapsed)
+
+
+_DISABLED = nullcontext()
+
+
+def timed(stage: str):
+    """
+    Context manager that times a stage of the current request. Use as
+    `with timed('score'): ...`.
+    """
+    return _Stage(stage) if ENABLED else _DISABLED
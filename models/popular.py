@@ -0,0 +1,189 @@
+import json
+import threading
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from models.catalog import ClubCatalog
+from models.recommender import TOP_N, RecommendationStrategy, normalize_keywords
+
+# (normalized keywords, top_k), the same way RecommenderContext keys its cache
+InterestKey = Tuple[Tuple[str, ...], int]
+
+
+def load_seed(path: str) -> List[InterestKey]:
+    """
+    Interest sets to always precompute, one per line: either a plain
+    interests string or a JSON request ({"interests": ..., "top_k": ...}),
+    so NDJSON request logs can be used as they are.
+    """
+    keys = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            request = json.loads(line) if line.startswith('{') else {'interests': line}
+            keywords = normalize_keywords(request.get('interests', ''))
+            if keywords:
+                keys.append((keywords, request.get('top_k') or TOP_N))
+    return keys
+
+
+def _serving_fields(club: Mapping[str, Any]) -> Tuple[Any, ...]:
+    return (club.get('search_text'), club.get('name'), club.get('shortName'), club.get('summary'))
+
+
+def changed_texts(old: Mapping[str, Any], new: Mapping[str, Any]) -> Optional[List[str]]:
+    """
+    Search texts (before and after) of the clubs that were added, removed
+    or edited between two catalogs, or None if the clubs were reordered,
+    which can reorder ties in any result.
+    """
+    common = [key for key in old if key in new]
+    if common != [key for key in new if key in old]:
+        return None
+    texts = []
+    for key in old.keys() | new.keys():
+        before, after = old.get(key), new.get(key)
+        if before is not None and after is not None and _serving_fields(before) == _serving_fields(after):
+            continue
+        for club in (before, after):
+            if club is not None:
+                texts.append(club.get('search_text') or '')
+    return texts
+
+
+class PopularResults:
+    """
+    Materialized results for the most requested interest sets.
+
+    Requests are counted as they are served. A background thread (start)
+    scores the `size` most requested sets plus the seed list in one batch
+    and keeps the results for O(1) lookups. When the catalog changes it
+    only rescores the sets that a changed club could affect, if the
+    strategy scores every club on its own text; otherwise all of them.
+    Lookups for sets that aren't materialized return None so the caller
+    falls back to live scoring.
+    """
+
+    def __init__(self, size: int = 500, seed: Iterable[InterestKey] = ()):
+        self.size = size
+        self.seed = list(dict.fromkeys(seed))
+        self.counts: Counter = Counter()
+        # (catalog version, strategy name, catalog clubs, results), swapped as a whole
+        self._state: Tuple[Optional[int], str, Mapping[str, Any], Dict[InterestKey, List[Any]]] = (
+            None, '', {}, {}
+        )
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.hits = 0
+        self.misses = 0
+        self.computed = 0
+        self.reused = 0
+
+    def observe(self, keywords: Tuple[str, ...], top_k: int) -> None:
+        """Count one request for an interest set."""
+        if self.size <= 0 or not keywords:
+            return
+        with self._lock:
+            self.counts[(keywords, top_k)] += 1
+            # keep memory bounded, rarely requested sets won't make the cut anyway
+            if len(self.counts) > self.size * 8:
+                self.counts = Counter(dict(self.counts.most_common(self.size * 4)))
+
+    def wanted(self) -> List[InterestKey]:
+        """The interest sets that should be materialized: the seed list, then the most requested."""
+        with self._lock:
+            popular = [key for key, _ in self.counts.most_common(self.size)]
+        return list(dict.fromkeys(self.seed + popular))
+
+    def get(self, catalog: ClubCatalog, strategy_name: str,
+            keywords: Tuple[str, ...], top_k: int) -> Optional[List[Any]]:
+        """Materialized results for the interest set, or None if there are none for this catalog."""
+        version, name, _, results = self._state
+        recs = results.get((keywords, top_k)) if version == catalog.version and name == strategy_name else None
+        if recs is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return recs
+
+    def refresh(self, catalog: ClubCatalog, strategy: RecommendationStrategy) -> None:
+        """Bring the materialized results up to date with the catalog and the wanted sets."""
+        with self._refresh_lock:
+            version, name, old_clubs, old_results = self._state
+            wanted = self.wanted()
+            if version == catalog.version and name == strategy.name:
+                reusable: Optional[List[str]] = []
+            elif name == strategy.name and strategy.per_club_scores:
+                reusable = changed_texts(old_clubs, catalog.clubs)
+            else:
+                reusable = None
+
+            results: Dict[InterestKey, List[Any]] = {}
+            todo = []
+            for key in wanted:
+                recs = old_results.get(key)
+                if recs is not None and reusable is not None and not _affected(key[0], reusable):
+                    results[key] = recs
+                else:
+                    todo.append(key)
+            if not todo and version == catalog.version and len(results) == len(old_results):
+                return
+
+            if todo:
+                batch = [{'interests': ', '.join(keywords), 'top_k': top_k} for keywords, top_k in todo]
+                results.update(zip(todo, strategy.recommend_batch(batch)))
+            self._state = (catalog.version, strategy.name, catalog.clubs, results)
+            self.computed += len(todo)
+            self.reused += len(results) - len(todo)
+
+    def start(self, snapshot: Callable[[], Tuple[ClubCatalog, RecommendationStrategy]],
+              interval: float = 60.0) -> None:
+        """Refresh in a background thread every `interval` seconds and whenever woken."""
+        if self._thread is not None or (self.size <= 0 and not self.seed):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(snapshot, interval), name='popular-results', daemon=True
+        )
+        self._thread.start()
+
+    def wake(self, *_: Any) -> None:
+        """Refresh now, e.g. after the catalog is reloaded."""
+        self._wake.set()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._wake.set()
+        self._thread.join()
+        self._thread = None
+
+    def _run(self, snapshot: Callable[[], Tuple[ClubCatalog, RecommendationStrategy]], interval: float) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh(*snapshot())
+            except Exception as e:
+                print(f"Error refreshing popular results: {e}")
+            self._wake.wait(interval)
+            self._wake.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._state[3]),
+            "hits": self.hits,
+            "misses": self.misses,
+            "computed": self.computed,
+            "reused": self.reused,
+        }
+
+
+def _affected(keywords: Tuple[str, ...], texts: List[str]) -> bool:
+    # word by word, token matching doesn't need a keyword's words to be adjacent
+    words = {word for keyword in keywords for word in keyword.split()}
+    return any(word in text for text in texts for word in words)
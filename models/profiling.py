@@ -0,0 +1,180 @@
+"""
+Opt-in request profiling and the slow query log.
+
+A request is profiled with cProfile when it is picked by the sampling rate
+(CLUB_MATCH_PROFILE_RATE, e.g. 0.01) or, if CLUB_MATCH_PROFILE_HEADER=1,
+when it carries an `X-Club-Match-Profile: 1` header. Profiles are saved as
+pstats files in CLUB_MATCH_PROFILE_DIR.
+
+Requests slower than CLUB_MATCH_SLOW_MS (and every profiled one) are
+appended to the NDJSON file CLUB_MATCH_SLOW_LOG with their keywords, how
+many clubs matched, stage timings and strategy.
+`python -m benchmarks.replay_slow_log` replays that file against any
+strategy.
+"""
+import cProfile
+import json
+import os
+import pstats
+import random
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from models.metrics import RequestTimings
+
+PROFILE_HEADER = 'x-club-match-profile'
+
+# How many of the slowest functions of a profile are copied into the slow query log
+HOTSPOTS = 5
+
+
+class Profiler:
+    """Decides which requests to profile and runs cProfile around them."""
+
+    def __init__(self, rate: float = 0.0, allow_header: bool = False,
+                 directory: Optional[str] = None, keep: int = 100,
+                 sample: Callable[[], float] = random.random):
+        self.rate = rate
+        self.allow_header = allow_header
+        self.directory = directory or os.path.join(tempfile.gettempdir(), 'club_match_profiles')
+        self.keep = keep
+        self._sample = sample
+        # only one cProfile profiler can be active in a process at a time
+        self._busy = threading.Lock()
+        self.profiled = 0
+        self.skipped = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 or self.allow_header
+
+    def wanted(self, header: Optional[str] = None) -> bool:
+        """Whether a request (with this profile header value) should be profiled."""
+        if self.allow_header and header is not None and header not in ('', '0'):
+            return True
+        return self.rate > 0 and self._sample() < self.rate
+
+    @contextmanager
+    def profile(self, label: str = 'request') -> Iterator[Optional[Dict[str, Any]]]:
+        """
+        Profile the block. Yields a dict that gets the saved profile's path
+        and hotspots afterwards, or None if another profile is running.
+        """
+        if not self._busy.acquire(blocking=False):
+            self.skipped += 1
+            yield None
+            return
+        result: Dict[str, Any] = {}
+        profiler = cProfile.Profile()
+        try:
+            try:
+                profiler.enable()
+            except ValueError:
+                # some other profiler or debugger already hooks the interpreter
+                self.skipped += 1
+                yield None
+                return
+            try:
+                yield result
+            finally:
+                profiler.disable()
+            result.update(self._save(profiler, label))
+        finally:
+            self._busy.release()
+
+    def _save(self, profiler: cProfile.Profile, label: str) -> Dict[str, Any]:
+        stats = pstats.Stats(profiler)
+        hotspots = [
+            f"{os.path.basename(path)}:{line}({name}) {total * 1000:.2f}ms"
+            for (path, line, name), (_, _, total, _, _) in sorted(
+                stats.stats.items(), key=lambda item: -item[1][2]
+            )[:HOTSPOTS]
+        ]
+        self.profiled += 1
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"{time.strftime('%Y%m%d-%H%M%S')}-{label}-{self.profiled}.prof")
+            stats.dump_stats(path)
+            self._prune()
+        except OSError as e:
+            print(f"Error saving profile: {e}")
+            path = None
+        return {'profile': path, 'hotspots': hotspots}
+
+    def _prune(self) -> None:
+        profiles = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith('.prof')),
+            key=lambda entry: entry.stat().st_mtime,
+        )
+        for entry in profiles[:max(0, len(profiles) - self.keep)]:
+            os.remove(entry.path)
+
+
+@contextmanager
+def profile_request(profiler: Profiler, timings: Optional[RequestTimings],
+                    label: str = 'request') -> Iterator[None]:
+    """Profile the block if the request was picked for profiling."""
+    if timings is None or not timings.profile:
+        yield
+        return
+    with profiler.profile(label) as result:
+        yield
+    if result is not None:
+        timings.details.update(result)
+
+
+class SlowQueryLog:
+    """
+    Appends slow (and profiled) recommendation requests to an NDJSON file.
+    The file is rotated to `<path>.1` once it grows past max_bytes.
+    """
+
+    def __init__(self, path: Optional[str], threshold_ms: float = 100.0,
+                 max_bytes: int = 10 * 1024 * 1024):
+        self.path = path
+        self.threshold_ms = threshold_ms
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.logged = 0
+
+    def observe(self, timings: RequestTimings, total: float) -> bool:
+        """Log the request if it was slow or profiled. Returns whether it was logged."""
+        total_ms = total * 1000
+        if not self.path or 'keywords' not in timings.details:
+            return False
+        if total_ms < self.threshold_ms and not timings.profile:
+            return False
+        record = {
+            'time': time.time(),
+            'strategy': timings.strategy,
+            'total_ms': round(total_ms, 3),
+            'stages': {stage: round(seconds * 1000, 3) for stage, seconds in timings.stages.items()},
+        }
+        record.update(timings.details)
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        with self._lock:
+            try:
+                if os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                    os.replace(self.path, f"{self.path}.1")
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line)
+                self.logged += 1
+            except OSError as e:
+                print(f"Error writing slow query log: {e}")
+                return False
+        return True
+
+
+def read_slow_log(path: str) -> List[Dict[str, Any]]:
+    """The records of a slow query log, skipping lines that don't parse."""
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
@@ -0,0 +1,146 @@
+"""
+Query planning for keyword scoring.
+
+A plan is the list of keywords a strategy should actually score. Keywords
+are de-duplicated, and stopwords and one-character keywords are dropped,
+since they match nearly every club and say nothing about the student.
+What's left is ordered from the rarest keyword in the catalog to the most
+common. Keywords are then taken in that order until the request's cost
+budget is spent; the rest are skipped and the plan is partial. Keeping
+the rarest keywords keeps the ones that separate clubs best. Only the
+first MAX_FREQUENCY_LOOKUPS keywords are ranked that way, so planning a
+very long list costs less than scoring it would.
+"""
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+# Keywords that are dropped outright ("it" stays, it is a field of study)
+STOPWORDS = frozenset({
+    'a', 'about', 'all', 'also', 'am', 'an', 'and', 'any', 'are', 'as', 'at', 'be', 'but', 'by',
+    'can', 'do', 'for', 'from', 'get', 'has', 'have', 'he', 'her', 'his', 'i', "i'm", 'if', 'in',
+    'into', 'is', 'its', 'just', 'like', 'me', 'more', 'my', 'not', 'of', 'on', 'or', 'our',
+    'she', 'so', 'some', 'such', 'than', 'that', 'the', 'their', 'them', 'then', 'there',
+    'these', 'they', 'this', 'to', 'too', 'very', 'was', 'we', 'were', 'what', 'when', 'which',
+    'who', 'will', 'with', 'would', 'you', 'your',
+})
+
+# Shortest keyword that gets scored
+MIN_KEYWORD_LENGTH = 2
+
+# Scoring work one request may do, in club texts scanned
+# (about 18 keywords over the real catalog)
+COST_BUDGET = 20000
+
+# Keywords whose document frequency is looked up when planning, the rest
+# follow in input order (the budget runs out long before them)
+MAX_FREQUENCY_LOOKUPS = 32
+
+# Words whose document frequency a SubstringFrequency remembers
+FREQUENCY_CACHE_SIZE = 10000
+
+# Length of the vocabulary n-grams words are looked up by
+GRAM = 3
+
+
+class QueryPlan(NamedTuple):
+    """Keywords to score, in order, and the ones that won't be."""
+    keywords: List[str]
+    # stopwords, too short or repeated
+    dropped: List[str]
+    # over the cost budget
+    skipped: List[str]
+    cost: int
+
+    @property
+    def partial(self) -> bool:
+        """Whether results will be missing some keywords' contribution."""
+        return bool(self.skipped)
+
+
+class QueryPlanner:
+    """
+    Plans keyword lists. document_frequency estimates how many clubs a
+    keyword matches; without it keywords keep their input order.
+    """
+
+    def __init__(self, document_frequency: Optional[Callable[[str], int]] = None,
+                 budget: int = COST_BUDGET, max_lookups: int = MAX_FREQUENCY_LOOKUPS):
+        self.document_frequency = document_frequency
+        self.budget = budget
+        self.max_lookups = max_lookups
+
+    def plan(self, keywords: Iterable[str], cost: Callable[[str], int]) -> QueryPlan:
+        """Plan keywords (already lowercased), cost(keyword) being the work to score one."""
+        kept: List[str] = []
+        dropped: List[str] = []
+        seen = set()
+        for keyword in keywords:
+            keyword = ' '.join(keyword.split())
+            if len(keyword) < MIN_KEYWORD_LENGTH or keyword in STOPWORDS or keyword in seen:
+                dropped.append(keyword)
+                continue
+            seen.add(keyword)
+            kept.append(keyword)
+
+        if self.document_frequency is not None:
+            # sorted is stable, so equally rare keywords keep their input order
+            kept[:self.max_lookups] = sorted(kept[:self.max_lookups], key=self.document_frequency)
+
+        planned: List[str] = []
+        skipped: List[str] = []
+        spent = 0
+        for keyword in kept:
+            keyword_cost = cost(keyword)
+            # the rarest keyword is always scored, whatever it costs
+            if skipped or (planned and spent + keyword_cost > self.budget):
+                skipped.append(keyword)
+                continue
+            planned.append(keyword)
+            spent += keyword_cost
+        return QueryPlan(planned, dropped, skipped, spent)
+
+
+class SubstringFrequency:
+    """
+    How many clubs have an indexed term containing a word, the way keywords
+    match inside words ("er" is in nearly every club). Candidate terms come
+    from an n-gram index of the vocabulary rather than a scan of all of it.
+    """
+
+    def __init__(self, postings: Mapping[str, Mapping[int, Any]], size: int,
+                 cache_size: int = FREQUENCY_CACHE_SIZE):
+        self.postings = postings
+        self.size = size
+        self.cache_size = cache_size
+        self.terms = list(postings)
+        # every n-gram of length 2..GRAM to the terms containing it
+        self.grams: Dict[str, List[int]] = {}
+        for i, term in enumerate(self.terms):
+            grams = {term[j:j + n] for n in range(2, GRAM + 1) for j in range(len(term) - n + 1)}
+            for gram in grams:
+                self.grams.setdefault(gram, []).append(i)
+        self._cache: Dict[str, int] = {}
+
+    def __call__(self, word: str) -> int:
+        # a single letter is in just about every club
+        if len(word) < 2:
+            return self.size
+        frequency = self._cache.get(word)
+        if frequency is not None:
+            return frequency
+
+        n = min(GRAM, len(word))
+        candidates = min(
+            (self.grams.get(word[j:j + n], ()) for j in range(len(word) - n + 1)), key=len
+        )
+        docs = set()
+        for i in candidates:
+            term = self.terms[i]
+            if word in term:
+                docs.update(self.postings[term])
+        frequency = len(docs)
+
+        if len(self._cache) >= self.cache_size:
+            # start over rather than stop remembering new words
+            self._cache = {}
+        self._cache[word] = frequency
+        return frequency
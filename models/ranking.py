@@ -0,0 +1,78 @@
+import heapq
+from typing import Callable, Container, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+# Ties rank by document number, i.e. catalog order, same as a stable sort
+def _rank_key(item: Tuple[int, float]) -> Tuple[float, int]:
+    return (-item[1], item[0])
+
+
+def select_top_k(scores: Iterable[Tuple[int, float]], k: int) -> List[Tuple[int, float]]:
+    """
+    Best k (document, score) pairs, highest score first, using a bounded heap
+    instead of sorting every match.
+    """
+    return heapq.nsmallest(k, scores, key=_rank_key)
+
+
+class TermContribution(NamedTuple):
+    """
+    One query term's share of the score.
+
+    upper_bound is the most it adds to any single document, postings yields
+    every (document, score) pair and lookup returns the score it adds to one
+    document (0 if the document doesn't contain the term).
+    """
+    upper_bound: float
+    postings: Callable[[], Iterable[Tuple[int, float]]]
+    lookup: Callable[[int], float]
+
+
+def restrict(terms: List[TermContribution], allowed: Optional[Container[int]]) -> List[TermContribution]:
+    """
+    The same terms with postings limited to allowed documents, so filtered
+    out documents are never scored. Upper bounds stay valid.
+    """
+    if allowed is None:
+        return terms
+    return [
+        term._replace(postings=lambda p=term.postings: ((doc, score) for doc, score in p() if doc in allowed))
+        for term in terms
+    ]
+
+
+def rank_terms_top_k(terms: List[TermContribution], k: int) -> List[Tuple[int, float]]:
+    """
+    Sum term contributions per document and return the best k, stopping
+    early once the remaining terms can no longer change the top k.
+
+    Terms are processed from the largest upper bound down. When the remaining
+    terms together add less than the current k-th score, documents not seen
+    yet can't make it, so only known candidates are updated from then on, and
+    candidates that can't reach the k-th score even with every remaining term
+    are dropped.
+    """
+    terms = sorted(terms, key=lambda term: term.upper_bound, reverse=True)
+    # remaining_after[i] = most that terms after i can still add
+    remaining_after = [0.0] * len(terms)
+    for i in range(len(terms) - 2, -1, -1):
+        remaining_after[i] = remaining_after[i + 1] + terms[i + 1].upper_bound
+
+    scores: Dict[int, float] = {}
+    admitting = True
+
+    for term, remaining in zip(terms, remaining_after):
+        if admitting:
+            for doc, score in term.postings():
+                scores[doc] = scores.get(doc, 0) + score
+        else:
+            for doc in scores:
+                scores[doc] += term.lookup(doc)
+
+        if len(scores) < k:
+            continue
+        threshold = heapq.nlargest(k, scores.values())[-1]
+        if remaining < threshold:
+            admitting = False
+            scores = {doc: score for doc, score in scores.items() if score + remaining >= threshold}
+
+    return select_top_k(scores.items(), k)
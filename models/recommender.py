@@ -1,28 +1,198 @@
 from abc import ABC, abstractmethod
+import heapq
 import json
-import os
-from typing import List, Dict, Any
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple
+
+from data_collection.club_text import club_search_text
+from models.catalog import ClubCatalog, DEFAULT_CATALOG_PATH, load_json_clubs
+from models.filters import Bitset, CatalogFilters, allowed_by_any, filter_key
+from models.metrics import annotate, timed
+from models.query_planner import QueryPlanner, SubstringFrequency
+from models.ranking import select_top_k
+from models.result_cache import ResultCache
+
+if TYPE_CHECKING:
+    from models.popular import PopularResults
+    from models.single_flight import SingleFlight
+
+TOP_N = 10
+
+
+def requested_top_k(user_data: Dict[str, Any]) -> int:
+    """How many recommendations the caller asked for (TOP_N by default)."""
+    return user_data.get('top_k') or TOP_N
+
+
+def parse_interests(interests: str) -> List[str]:
+    """Split a comma separated interests string into lowercased keywords."""
+    return [k.strip().lower() for k in interests.split(',')]
+
+
+def normalize_keywords(interests: str) -> Tuple[str, ...]:
+    """
+    Keywords as an order-insensitive, de-duplicated tuple with empty entries
+    dropped, so equivalent interest strings compare equal.
+    """
+    return tuple(sorted({k for k in parse_interests(interests) if k}))
+
+
+def searchable_text(club: Dict[str, Any]) -> str:
+    """
+    Normalized text that keyword matching runs against. Catalog snapshots
+    precompute it, other club dicts are normalized on the fly.
+    """
+    text = club.get('search_text')
+    if text is None:
+        text = club_search_text(club)
+    return text
+
+
+class Recommendation(dict):
+    """
+    One club as returned by the API, carrying its own JSON encoding so
+    responses can be assembled from fragments without serializing again.
+    """
+    __slots__ = ('json',)
+
+
+def encode_recommendation(rec: Dict[str, Any]) -> bytes:
+    # compact UTF-8, byte for byte what pydantic's model_dump_json writes
+    return json.dumps(rec, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def club_to_recommendation(club: Dict[str, Any]) -> Recommendation:
+    """Shape a club record into the fields returned by the API."""
+    rec = Recommendation(
+        name=club.get('name'),
+        shortName=club.get('shortName'),
+        summary=club.get('summary')
+    )
+    rec.json = encode_recommendation(rec)
+    return rec
+
+
+def catalog_recommendations(catalog: ClubCatalog) -> List[Recommendation]:
+    """Every club of a snapshot shaped for the API, in catalog order, built once."""
+    return catalog.derived(
+        'recommendations', lambda c: [club_to_recommendation(club) for club in c.clubs.values()]
+    )
+
+
+def recommendations_json(recs: List[Dict[str, Any]]) -> bytes:
+    """A JSON array of recommendations, reusing each one's cached encoding."""
+    return b'[' + b','.join(
+        rec.json if isinstance(rec, Recommendation) else encode_recommendation(rec) for rec in recs
+    ) + b']'
+
+
+class PartialResults(list):
+    """
+    Results scored without some of the request's keywords because it ran
+    out of its cost budget (see models/query_planner.py). Otherwise a list.
+    """
+    partial = True
+
+
+def is_partial(results: List[Any]) -> bool:
+    return getattr(results, 'partial', False)
+
+
+def catalog_planner(catalog: ClubCatalog) -> QueryPlanner:
+    """
+    A query planner ranking keywords by how many of the catalog's clubs
+    contain their words, matched inside words as in survey scoring.
+    """
+    # imported here, the inverted index module builds on this one
+    from models.inverted_index import InvertedIndex, tokenize
+
+    postings = catalog.derived('inverted_index', lambda c: InvertedIndex(c.clubs)).postings
+    word_frequency = SubstringFrequency(postings, len(catalog))
+
+    def document_frequency(keyword: str) -> int:
+        # no words to look up (punctuation only), assume it matches anything
+        return min((word_frequency(word) for word in tokenize(keyword)), default=len(catalog))
+    return QueryPlanner(document_frequency)
+
 
 class RecommendationStrategy(ABC):
+    name = 'base'
+    # status/visibility/category bitsets of the catalog being served
+    filters: Optional[CatalogFilters] = None
+    # the catalog's clubs shaped for the API, indexed by document number
+    recommendations: List[Recommendation] = []
+    # True when a club's score only depends on its own text, so a catalog
+    # change can only affect results the changed clubs match
+    per_club_scores = False
+
     @abstractmethod
     def recommend(self, user_data):
         pass
 
+    @abstractmethod
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
+        """
+        Best top_k (document number, score) pairs, documents numbered in
+        catalog order. When `allowed` is given only those documents are
+        scored. Hybrid pipelines fuse these.
+        """
+
+    def to_recommendations(self, ranked: List[Tuple[int, float]]) -> List[Recommendation]:
+        """Turn (document number, score) pairs into API results."""
+        recommendations = self.recommendations
+        results = [recommendations[doc] for doc, _ in ranked]
+        return PartialResults(results) if is_partial(ranked) else results
+
+    def allowed(self, user_data: Dict[str, Any]) -> Optional[Bitset]:
+        """Clubs passing the request's filters, None when it has none."""
+        if self.filters is None or not filter_key(user_data):
+            return None
+        with timed('filter'):
+            return self.filters.allowed(user_data)
+
+    def recommend_batch(self, batch: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """Recommendations for many users, in order. Strategies may share work across the batch."""
+        return [self.recommend(user_data) for user_data in batch]
+
 class SurveyRecommender(RecommendationStrategy):
-    def __init__(self):
-        # Load club data on initialization
-        self.clubs = self._load_clubs()
+    name = 'survey'
+    per_club_scores = True
+
+    def __init__(self, catalog: Optional[ClubCatalog] = None):
+        # Use the shared catalog snapshot if given, otherwise load from disk
+        self.catalog = catalog
+        if catalog is not None:
+            self.clubs = catalog.clubs
+            self.filters = catalog.derived('filters', lambda c: CatalogFilters(c.clubs))
+            # built now so warming up the strategy pays for it
+            catalog.derived('query_planner', catalog_planner)
+        else:
+            self.clubs = self._load_clubs()
+            self.filters = CatalogFilters(self.clubs)
+
+    @property
+    def planner(self) -> QueryPlanner:
+        if self.catalog is not None:
+            return self.catalog.derived('query_planner', catalog_planner)
+        return QueryPlanner()
+
+    def plan(self, interests: str, allowed: Optional[Bitset] = None):
+        """Which keywords to scan for: every keyword scans each (allowed) club once."""
+        scanned = len(self.clubs) if allowed is None else len(allowed)
+        return self.planner.plan(parse_interests(interests), lambda keyword: scanned)
+
+    def to_recommendations(self, ranked: List[Tuple[int, float]]) -> List[Recommendation]:
+        if self.catalog is not None:
+            recommendations = catalog_recommendations(self.catalog)
+            results = [recommendations[position] for position, _ in ranked]
+        else:
+            clubs = list(self.clubs.values())
+            results = [club_to_recommendation(clubs[position]) for position, _ in ranked]
+        return PartialResults(results) if is_partial(ranked) else results
     
     def _load_clubs(self) -> Dict[str, Any]:
         """Load club data from JSON file."""
-        data_path = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)),
-            'data_collection',
-            'gobblerconnect_clubs.json'
-        )
         try:
-            with open(data_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_json_clubs(DEFAULT_CATALOG_PATH)
         except Exception as e:
             print(f"Error loading clubs: {e}")
             return {}
@@ -30,49 +200,188 @@ class SurveyRecommender(RecommendationStrategy):
     def _calculate_match_score(self, club: Dict[str, Any], keywords: List[str]) -> int:
         """Calculate how well a club matches the user's interests."""
         score = 0
-        searchable_text = (
-            f"{club.get('name', '')} "
-            f"{club.get('summary', '')} "
-            f"{club.get('description_html', '')}"
-        ).lower()
+        text = searchable_text(club)
         
         for keyword in keywords:
-            if keyword in searchable_text:
-                score += searchable_text.count(keyword)
+            if keyword in text:
+                score += text.count(keyword)
         
         return score
     
     def recommend(self, user_data: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Match user interests with clubs using keyword matching."""
+        return self.to_recommendations(self.rank(user_data, self.allowed(user_data)))
+
+    def rank(self, user_data: Dict[str, Any], allowed: Optional[Bitset] = None) -> List[Tuple[int, float]]:
         interests = user_data.get('interests', '')
         if not interests:
             return []
         
-        # Parse interests into keywords
-        keywords = [k.strip().lower() for k in interests.split(',')]
+        # Parse interests into keywords, dropping noise and anything over the budget
+        plan = self.plan(interests, allowed)
+        keywords = plan.keywords
+        if not keywords:
+            return []
         
-        # Score each club
-        scored_clubs = []
-        for club_id, club in self.clubs.items():
-            score = self._calculate_match_score(club, keywords)
-            if score > 0:
-                scored_clubs.append((score, club))
+        top_k = requested_top_k(user_data)
         
-        # Sort by score (highest first) and return top 10
-        scored_clubs.sort(reverse=True, key=lambda x: x[0])
+        # Score each club, keeping only the best top_k in a min-heap.
+        # Entries are (score, -position) so on ties the later club is evicted
+        heap = []
+        matched = 0
+        for position, club in enumerate(self.clubs.values()):
+            if allowed is not None and position not in allowed:
+                continue
+            score = self._calculate_match_score(club, keywords)
+            if score <= 0:
+                continue
+            matched += 1
+            entry = (score, -position)
+            if len(heap) < top_k:
+                heapq.heappush(heap, entry)
+            elif entry > heap[0]:
+                heapq.heapreplace(heap, entry)
         
-        return [
-            {
-                'name': club.get('name'),
-                'shortName': club.get('shortName'),
-                'summary': club.get('summary')
-            }
-            for _, club in scored_clubs[:10]
+        annotate('matched', matched)
+        # Highest score first, ties in catalog order
+        with timed('rank'):
+            heap.sort(reverse=True)
+            ranked = [(-neg_position, score) for score, neg_position in heap]
+        if plan.partial:
+            annotate('skipped', plan.skipped)
+            return PartialResults(ranked)
+        return ranked
+
+    def recommend_batch(self, batch: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Same results as recommend for each user, but every distinct keyword
+        in the batch is counted across the clubs only once.
+        """
+        allowed = [self.allowed(user_data) for user_data in batch]
+        plans = [
+            self.plan(user_data['interests'], allowed[i]) if user_data.get('interests') else None
+            for i, user_data in enumerate(batch)
         ]
+        clubs = list(self.clubs.values())
+        texts = [searchable_text(club) for club in clubs]
+        # only clubs some request in the batch can get are counted
+        scope = allowed_by_any(allowed)
+        positions = range(len(texts)) if scope is None else list(scope)
+
+        keyword_scores = {}
+        for keyword in {k for plan in plans if plan for k in plan.keywords}:
+            keyword_scores[keyword] = {}
+            for position in positions:
+                count = texts[position].count(keyword)
+                if count:
+                    keyword_scores[keyword][position] = count
+
+        results = []
+        for user_data, plan, allowed_docs in zip(batch, plans, allowed):
+            if not plan or not plan.keywords:
+                results.append([])
+                continue
+            totals: Dict[int, int] = {}
+            for keyword in plan.keywords:
+                for position, count in keyword_scores[keyword].items():
+                    if allowed_docs is None or position in allowed_docs:
+                        totals[position] = totals.get(position, 0) + count
+            ranked = select_top_k(totals.items(), requested_top_k(user_data))
+            results.append(self.to_recommendations(PartialResults(ranked) if plan.partial else ranked))
+        return results
+
 
 class RecommenderContext:
-    def __init__(self, strategy: RecommendationStrategy):
+    def __init__(self, strategy: RecommendationStrategy, catalog: Optional[ClubCatalog] = None,
+                 cache: Optional[ResultCache] = None, popular: Optional['PopularResults'] = None,
+                 flights: Optional['SingleFlight'] = None):
         self.strategy = strategy
+        self.catalog = catalog
+        self.cache = cache
+        # precomputed results for the most requested interest sets
+        self.popular = popular if catalog is not None else None
+        # lets identical queries scored at the same time share one scoring run
+        self.flights = flights
+
+    def popular_results(self, keywords: Tuple[str, ...], top_k: int,
+                        filters: Tuple[Tuple[str, str], ...]) -> Optional[List[Dict[str, Any]]]:
+        if self.popular is None or filters:
+            return None
+        self.popular.observe(keywords, top_k)
+        return self.popular.get(self.catalog, self.strategy.name, keywords, top_k)
+
+    def cache_key(self, keywords: Tuple[str, ...], top_k: int,
+                  filters: Tuple[Tuple[str, str], ...] = ()) -> Tuple[Any, ...]:
+        version = self.catalog.version if self.catalog is not None else None
+        return (self.strategy.name, version, keywords, top_k, filters)
+
+    def score(self, user_data: Dict[str, Any], keywords: Tuple[str, ...], key: Tuple[Any, ...]):
+        # score the normalized query so every equivalent request gets the same answer
+        def run():
+            with timed('score'):
+                return self.strategy.recommend(dict(user_data, interests=', '.join(keywords)))
+        return run() if self.flights is None else self.flights.do(key, run)
 
     def get_recommendations(self, user_data):
-        return self.strategy.recommend(user_data)
\ No newline at end of file
+        if self.cache is None and self.popular is None and self.flights is None:
+            with timed('score'):
+                return self.strategy.recommend(user_data)
+
+        with timed('parse'):
+            keywords = normalize_keywords(user_data.get('interests', ''))
+            top_k = requested_top_k(user_data)
+            filters = filter_key(user_data)
+            key = self.cache_key(keywords, top_k, filters)
+        annotate('keywords', keywords)
+        annotate('top_k', top_k)
+        if filters:
+            annotate('filters', dict(filters))
+        with timed('popular'):
+            recs = self.popular_results(keywords, top_k, filters)
+        if recs is not None:
+            return recs
+        with timed('cache'):
+            recs = self.cache.get(key) if self.cache is not None else None
+        if recs is None:
+            recs = self.score(user_data, keywords, key)
+            if self.cache is not None:
+                self.cache.put(key, recs)
+        return recs
+
+    def get_recommendations_batch(self, batch: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Recommendations for a list of users, in order. Cached answers are
+        reused and the rest are scored together in one strategy call, with
+        equivalent queries scored once.
+        """
+        if self.cache is None and self.popular is None:
+            with timed('score'):
+                return self.strategy.recommend_batch(batch)
+
+        results: List[Any] = [None] * len(batch)
+        misses = []
+        pending: Dict[Tuple[Any, ...], Dict[str, Any]] = {}
+        for i, user_data in enumerate(batch):
+            keywords = normalize_keywords(user_data.get('interests', ''))
+            top_k, filters = requested_top_k(user_data), filter_key(user_data)
+            key = self.cache_key(keywords, top_k, filters)
+            recs = self.popular_results(keywords, top_k, filters)
+            if recs is None and self.cache is not None:
+                recs = self.cache.get(key)
+            if recs is not None:
+                results[i] = recs
+                continue
+            misses.append((i, key))
+            if key not in pending:
+                pending[key] = dict(user_data, interests=', '.join(keywords))
+
+        if not pending:
+            return results
+        with timed('score'):
+            computed = dict(zip(pending, self.strategy.recommend_batch(list(pending.values()))))
+        if self.cache is not None:
+            for key, recs in computed.items():
+                self.cache.put(key, recs)
+        for i, key in misses:
+            results[i] = computed[key]
+        return results
\ No newline at end of file
@@ -0,0 +1,108 @@
+"""
+One catalog snapshot shared by every worker process on a host.
+
+With several uvicorn / gunicorn workers each process would parse the catalog
+and build its own index. Instead, the first worker to start publishes a
+snapshot file (see models/snapshot.py) and every worker memory maps it, so
+the postings and term matrices live once in the page cache. A generation
+file next to the catalog says which snapshot is current; publishing a new
+one bumps the generation and workers attach to it on their next check.
+"""
+import json
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows, concurrent publishes just do the work twice there
+    fcntl = None
+
+from models.catalog import ClubCatalog, load_compact_clubs
+from models.snapshot import load_snapshot, save_snapshot, source_info
+
+
+class SharedCatalog:
+    """Publishes and attaches to the generations of one catalog file."""
+
+    def __init__(self, catalog_path: str, directory: Optional[str] = None):
+        root, _ = os.path.splitext(catalog_path)
+        if directory:
+            root = os.path.join(directory, os.path.basename(root))
+        self.catalog_path = catalog_path
+        self.root = root
+        self.generation_path = f"{root}.generation"
+        self.lock_path = f"{root}.publish.lock"
+        # generations published by this process
+        self.published = 0
+
+    def snapshot_file(self, generation: int) -> str:
+        return f"{self.root}.{generation}.snapshot"
+
+    def read_generation(self) -> Optional[Dict[str, Any]]:
+        """The current generation record, or None if nothing was published yet."""
+        try:
+            with open(self.generation_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def generation(self) -> int:
+        record = self.read_generation()
+        return record['generation'] if record else 0
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        # one worker builds while the others wait, then find it published
+        with open(self.lock_path, 'a') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def publish(self, force: bool = False) -> Dict[str, Any]:
+        """
+        Build and publish a snapshot of the catalog file as the next
+        generation, unless the current one was already built from it
+        (force publishes anyway). Returns the current generation record.
+        """
+        with self._locked():
+            record = self.read_generation()
+            source = source_info(self.catalog_path)
+            if source is None:
+                raise OSError(f"Catalog file not found: {self.catalog_path}")
+            if not force and record is not None and record['source'] == source:
+                return record
+
+            generation = (record['generation'] if record else 0) + 1
+            path = self.snapshot_file(generation)
+            save_snapshot(ClubCatalog(load_compact_clubs(self.catalog_path)), source, path)
+            record = {'generation': generation, 'snapshot': os.path.basename(path), 'source': source}
+            tmp_path = f"{self.generation_path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(record, f)
+            os.replace(tmp_path, self.generation_path)
+            self.published += 1
+
+            # workers may still be attaching to the previous generation; anything
+            # older is unused (or still mapped, which unlinking doesn't disturb)
+            try:
+                os.remove(self.snapshot_file(generation - 2))
+            except OSError:
+                pass
+            return record
+
+    def attach(self, force: bool = False) -> ClubCatalog:
+        """
+        Map the current generation as a catalog whose version is the
+        generation number, publishing one first if there is none yet or the
+        catalog file changed since (or if force).
+        """
+        record = self.read_generation()
+        if force or record is None or record['source'] != source_info(self.catalog_path):
+            record = self.publish(force)
+        path = os.path.join(os.path.dirname(self.generation_path), record['snapshot'])
+        return load_snapshot(path, version=record['generation'], source_path=self.catalog_path)
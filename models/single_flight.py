@@ -0,0 +1,124 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from models.metrics import timed
+
+METRIC_PREFIX = 'club_match_single_flight'
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+
+
+class SingleFlight:
+    """
+    Lets concurrent callers with the same key share one computation.
+
+    The first caller for a key runs it; callers arriving while it is still
+    running wait for it and get the same result (or exception) instead of
+    running it again. Nothing is kept once it finishes, that's the result
+    cache's job. `do` is for threads, `do_async` for coroutines on an
+    event loop.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            with timed('coalesced'):
+                call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._tasks.get(key)
+            if task is None or task.get_loop() is not loop:
+                task = self._tasks[key] = loop.create_task(self._run(key, fn))
+                self.leaders += 1
+                leader = True
+            else:
+                self.coalesced += 1
+                leader = False
+        # shielded, so a caller that goes away doesn't cancel it for the others
+        if leader:
+            return await asyncio.shield(task)
+        with timed('coalesced'):
+            return await asyncio.shield(task)
+
+    async def _run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            return await fn()
+        except BaseException:
+            self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                if self._tasks.get(key) is asyncio.current_task():
+                    del self._tasks[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls) + len(self._tasks)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "in_flight": self.in_flight(),
+            }
+
+    def render(self) -> str:
+        """The counters in the Prometheus text exposition format."""
+        stats = self.stats()
+        metrics: Tuple[Tuple[str, str, str, int], ...] = (
+            ('leaders_total', 'counter', 'Shared calls started, one per distinct query in flight.', stats['leaders']),
+            ('coalesced_total', 'counter',
+             'Requests that shared an identical query already being computed.', stats['coalesced']),
+            ('errors_total', 'counter', 'Shared computations that failed.', stats['errors']),
+            ('in_flight', 'gauge', 'Queries being computed right now.', stats['in_flight']),
+        )
+        lines = []
+        for name, kind, help_text, value in metrics:
+            lines += [
+                f'# HELP {METRIC_PREFIX}_{name} {help_text}',
+                f'# TYPE {METRIC_PREFIX}_{name} {kind}',
+                f'{METRIC_PREFIX}_{name} {value}',
+            ]
+        return '\n'.join(lines) + '\n'
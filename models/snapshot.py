@@ -0,0 +1,238 @@
+"""
+Prebuilt catalog snapshots for a fast cold start.
+
+`python -m models.snapshot` loads the catalog, builds the inverted index and
+the BM25 / TF-IDF term matrices, and writes everything to one file next to
+the catalog. CatalogManager loads that file instead of parsing and indexing
+the catalog again, as long as it was built from the current catalog file.
+"""
+import argparse
+import json
+import mmap
+import os
+import sys
+import time
+from array import array
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence
+
+from data_collection.club_text import NORMALIZATION_VERSION
+from models.bm25 import B, K1, SparseTermMatrix
+from models.catalog import (
+    CLUB_FIELDS,
+    DEFAULT_CATALOG_PATH,
+    Club,
+    ClubCatalog,
+    load_compact_clubs,
+    open_catalog,
+    record_loader,
+)
+from models.inverted_index import TOKEN_PATTERN, InvertedIndex
+
+FORMAT_VERSION = 1
+
+# Bump when the index or term weights are built differently in a way the
+# parameters below don't capture (e.g. the term matrix layout)
+INDEX_VERSION = 1
+
+# Term matrices stored in the snapshot, keyed like the strategies derive them
+SCHEMES = ('bm25', 'tfidf')
+
+
+def snapshot_path(catalog_path: str) -> str:
+    """Where the snapshot of a catalog file is stored."""
+    root, _ = os.path.splitext(catalog_path)
+    return f"{root}.snapshot"
+
+
+def index_parameters() -> Dict[str, Any]:
+    """How this code tokenizes and weighs terms, a snapshot built differently is stale."""
+    return {'version': INDEX_VERSION, 'tokens': TOKEN_PATTERN.pattern, 'k1': K1, 'b': B}
+
+
+def source_info(catalog_path: str) -> Optional[Dict[str, Any]]:
+    """What a snapshot must have been built from (and with) to be used for catalog_path."""
+    try:
+        stat = os.stat(catalog_path)
+    except OSError:
+        return None
+    return {'mtime': stat.st_mtime, 'size': stat.st_size, 'normalization': NORMALIZATION_VERSION,
+            'index': index_parameters()}
+
+
+class _Columns(Mapping):
+    """Read-only term -> column mapping over flat arrays, slicing a column on lookup."""
+
+    def __init__(self, positions: Dict[str, int], offsets: Sequence[int],
+                 docs: Sequence[int], values: Sequence[Any]):
+        self.positions = positions
+        self.offsets = offsets
+        self.docs = docs
+        self.values = values
+
+    def _slices(self, term: str):
+        i = self.positions[term]
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.docs[start:end], self.values[start:end]
+
+    def __getitem__(self, term: str):
+        return self._slices(term)
+
+    def __contains__(self, term: object) -> bool:
+        return term in self.positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.positions)
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+
+class ColumnPostings(_Columns):
+    """
+    Postings backed by the doc / term frequency columns. Each term's
+    {doc: tf} dict is only built the first time it is looked up.
+    """
+
+    def __init__(self, *args):
+        super().__init__(*args)
+        self._built: Dict[str, Dict[int, int]] = {}
+
+    def __getitem__(self, term: str) -> Dict[int, int]:
+        postings = self._built.get(term)
+        if postings is None:
+            postings = self._built[term] = dict(zip(*self._slices(term)))
+        return postings
+
+
+def save_snapshot(catalog: ClubCatalog, source: Dict[str, Any], path: str) -> None:
+    """
+    Write a JSON header line padded to a multiple of 8 bytes, then per
+    scheme the float64 weights and column maxima, the int32 term offsets,
+    docs, term frequencies and per-term maxima, and last the clubs' serving
+    fields (CLUB_FIELDS) as JSON columns.
+    """
+    index = InvertedIndex(catalog.clubs)
+    terms = list(index.postings)
+    offsets, docs, tfs = array('i', [0]), array('i'), array('i')
+    for term in terms:
+        postings = index.postings[term]
+        for doc in sorted(postings):
+            docs.append(doc)
+            tfs.append(postings[doc])
+        offsets.append(len(docs))
+    term_max = array('i', (index.term_max[term] for term in terms))
+
+    sections: List[array] = []
+    for scheme in SCHEMES:
+        matrix = SparseTermMatrix(index, scheme)
+        sections.append(array('d', (w for term in terms for w in matrix.columns[term][1])))
+        sections.append(array('d', (matrix.column_max[term] for term in terms)))
+    sections += [offsets, docs, tfs, term_max]
+
+    club_columns: Dict[str, List[Any]] = {'keys': list(catalog.clubs)}
+    for field in CLUB_FIELDS:
+        club_columns[field] = [club.get(field) for club in catalog.clubs.values()]
+    clubs = json.dumps(club_columns, ensure_ascii=False).encode('utf-8')
+    header = json.dumps({
+        'format': FORMAT_VERSION,
+        'source': source,
+        'clubs': len(catalog),
+        'postings': len(docs),
+        'clubs_bytes': len(clubs),
+        'terms': terms,
+    }, ensure_ascii=False).encode('utf-8')
+    header += b' ' * (-(len(header) + 1) % 8) + b'\n'
+
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        for section in sections:
+            section.tofile(f)
+        f.write(clubs)
+    os.replace(tmp_path, path)
+
+
+def load_snapshot(path: str, source: Optional[Dict[str, Any]] = None, version: int = 0,
+                  source_path: Optional[str] = None) -> ClubCatalog:
+    """
+    Memory map a snapshot as a catalog whose index and term matrices are
+    already built. Raises ValueError if it wasn't built from `source`.
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    header_end = data.find(b'\n') + 1
+    header = json.loads(data[:header_end])
+    if header.get('format') != FORMAT_VERSION:
+        raise ValueError(f"{path} has an unsupported snapshot format")
+    if header['source'].get('index') != index_parameters():
+        raise ValueError(f"{path} was built with different index parameters")
+    if source is not None and header['source'] != source:
+        raise ValueError(f"{path} was built from a different catalog file")
+
+    view = memoryview(data)
+    position = header_end
+
+    def take(count: int, code: str) -> memoryview:
+        nonlocal position
+        start, position = position, position + count * array(code).itemsize
+        return view[start:position].cast(code)
+
+    terms: List[str] = header['terms']
+    columns = {}
+    for scheme in SCHEMES:
+        columns[scheme] = (take(header['postings'], 'd'), take(len(terms), 'd'))
+    offsets = take(len(terms) + 1, 'i')
+    docs = take(header['postings'], 'i')
+    tfs = take(header['postings'], 'i')
+    term_max = take(len(terms), 'i')
+    club_columns = json.loads(data[position:position + header['clubs_bytes']])
+    # the rest of each club's fields are read from the catalog file on demand
+    load = record_loader(open_catalog(source_path)) if source_path else None
+    clubs = {
+        key: Club(key, dict(zip(CLUB_FIELDS, values)), load)
+        for key, *values in zip(club_columns['keys'], *(club_columns[field] for field in CLUB_FIELDS))
+    }
+
+    catalog = ClubCatalog(clubs, version=version, source_path=source_path,
+                          mtime=header['source'].get('mtime'))
+    positions = {term: i for i, term in enumerate(terms)}
+    index = InvertedIndex.from_columns(catalog.clubs, ColumnPostings(positions, offsets, docs, tfs),
+                                       dict(zip(terms, term_max.tolist())))
+    preloaded: Dict[str, Any] = {'inverted_index': index}
+    for scheme, (weights, column_max) in columns.items():
+        preloaded[f'term_matrix:{scheme}'] = SparseTermMatrix.from_columns(
+            len(clubs), scheme, _Columns(positions, offsets, docs, weights),
+            dict(zip(terms, column_max.tolist()))
+        )
+    catalog.preload(preloaded)
+    return catalog
+
+
+def build_snapshot(catalog_path: str = DEFAULT_CATALOG_PATH, path: Optional[str] = None) -> str:
+    """Build and save the snapshot of a catalog file, returning where it was written."""
+    source = source_info(catalog_path)
+    if source is None:
+        raise OSError(f"Catalog file not found: {catalog_path}")
+    path = path or snapshot_path(catalog_path)
+    save_snapshot(ClubCatalog(load_compact_clubs(catalog_path)), source, path)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--catalog", default=os.environ.get('CLUB_CATALOG_PATH', DEFAULT_CATALOG_PATH))
+    parser.add_argument("--output", help="snapshot file (default: next to the catalog)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = build_snapshot(args.catalog, args.output)
+    print(f"wrote {path} ({os.path.getsize(path) / 1e6:.1f} MB) in {time.perf_counter() - start:.2f}s")
+
+    start = time.perf_counter()
+    catalog = load_snapshot(path, source_path=args.catalog)
+    print(f"loads {len(catalog)} clubs in {(time.perf_counter() - start) * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
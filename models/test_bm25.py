@@ -0,0 +1,89 @@
+import math
+import pytest
+from catalog import ClubCatalog
+from bm25 import BM25Recommender, SparseTermMatrix
+from inverted_index import InvertedIndex
+
+MOCK_CLUB_DATA = {
+    "1": {
+        "name": "Robotics Club",
+        "shortName": "Robotics",
+        "summary": "We build robots.",
+        "description_html": "Robots robots robots and more robots, plus some engineering and a lot of other words here."
+    },
+    "2": {
+        "name": "Robot Racing",
+        "shortName": "Racing",
+        "summary": "Robots that race.",
+        "description_html": "Robots."
+    },
+    "3": {
+        "name": "Chess Club",
+        "shortName": "Chess",
+        "summary": "Competitive chess.",
+        "description_html": "Strategy games and tournaments."
+    }
+}
+
+
+def test_unknown_scheme_rejected():
+    with pytest.raises(ValueError):
+        SparseTermMatrix(InvertedIndex(MOCK_CLUB_DATA), scheme="nope")
+
+
+def test_query_vector_drops_unknown_terms():
+    matrix = SparseTermMatrix(InvertedIndex(MOCK_CLUB_DATA))
+    assert matrix.query_vector(["robots", "robots", "underwater basket weaving"]) == {"robots": 2.0}
+
+
+def test_rare_terms_weigh_more():
+    matrix = SparseTermMatrix(InvertedIndex(MOCK_CLUB_DATA))
+    # "chess" appears in one club, "club" in two
+    chess = matrix.multiply({"chess": 1.0})[2]
+    club = matrix.multiply({"club": 1.0})[2]
+    assert chess > club
+
+
+def test_multiply_batch_matches_single_queries():
+    matrix = SparseTermMatrix(InvertedIndex(MOCK_CLUB_DATA))
+    queries = [{"robots": 1.0}, {"robots": 1.0, "chess": 2.0}, {}]
+    batch = matrix.multiply_batch(queries)
+    for query, scores in zip(queries, batch):
+        single = matrix.multiply(query)
+        assert scores.keys() == single.keys()
+        for doc in scores:
+            assert math.isclose(scores[doc], single[doc])
+
+
+def test_multiply_batch_scores_duplicates_once():
+    matrix = SparseTermMatrix(InvertedIndex(MOCK_CLUB_DATA))
+    first, second = matrix.multiply_batch([{"robots": 1.0}, {"robots": 1.0}])
+    assert first is second
+
+
+def test_tfidf_rows_are_unit_length():
+    matrix = SparseTermMatrix(InvertedIndex(MOCK_CLUB_DATA), scheme="tfidf")
+    norms = [0.0, 0.0, 0.0]
+    for docs, weights in matrix.columns.values():
+        for doc, weight in zip(docs, weights):
+            norms[doc] += weight * weight
+    for n in norms:
+        assert math.isclose(n, 1.0)
+
+
+def test_recommend_no_interests():
+    rec = BM25Recommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert rec.recommend({"interests": ""}) == []
+
+
+def test_recommend_short_description_not_penalized():
+    rec = BM25Recommender(ClubCatalog(MOCK_CLUB_DATA))
+    names = [c["name"] for c in rec.recommend({"interests": "robots"})]
+    # raw counts would put the long description first
+    assert names == ["Robot Racing", "Robotics Club"]
+
+
+def test_recommend_batch_matches_recommend():
+    rec = BM25Recommender(ClubCatalog(MOCK_CLUB_DATA), scheme="tfidf")
+    batch = [{"interests": "robots"}, {"interests": "chess, strategy"}, {"interests": ""}]
+    assert rec.recommend_batch(batch) == [rec.recommend(data) for data in batch]
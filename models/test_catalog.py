@@ -0,0 +1,165 @@
+import json
+import os
+import pytest
+from catalog import (Club, ClubCatalog, CatalogManager, add_search_text, load_clubs, load_compact_clubs,
+                     search_text_cache_path)
+from recommender import SurveyRecommender, RecommenderContext
+
+
+def write_catalog(path, clubs, mtime=None):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(clubs, f)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+def test_catalog_is_read_only():
+    catalog = ClubCatalog({"1": {"name": "Test Club"}})
+    with pytest.raises(TypeError):
+        catalog.clubs["2"] = {"name": "Other"}
+
+
+def test_derived_is_built_once():
+    catalog = ClubCatalog({"1": {"name": "Test Club"}})
+    calls = []
+
+    def factory(c):
+        calls.append(c)
+        return object()
+
+    first = catalog.derived("index", factory)
+    assert catalog.derived("index", factory) is first
+    assert len(calls) == 1
+
+
+def test_derived_factory_can_use_other_derived():
+    catalog = ClubCatalog({"1": {"name": "Test Club"}})
+    index = catalog.derived("outer", lambda c: c.derived("inner", lambda _: "index"))
+    assert index == "index"
+    assert catalog.derived("inner", None) == "index"
+
+
+def test_manager_loads_once(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {"1": {"name": "Test Club"}})
+    manager = CatalogManager(str(path), check_interval=0)
+
+    catalog = manager.get_catalog()
+    assert list(catalog.clubs) == ["1"]
+    assert catalog.clubs["1"]["name"] == "Test Club"
+    assert manager.get_catalog() is catalog
+
+
+def test_manager_reloads_on_mtime_change(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {"1": {"name": "Old Club"}}, mtime=1000)
+    manager = CatalogManager(str(path), check_interval=0)
+    old = manager.get_catalog()
+
+    write_catalog(path, {"1": {"name": "New Club"}}, mtime=2000)
+    new = manager.get_catalog()
+
+    assert new is not old
+    assert new.version > old.version
+    assert new.clubs["1"]["name"] == "New Club"
+    # in-flight holders of the old snapshot are unaffected
+    assert old.clubs["1"]["name"] == "Old Club"
+
+
+def test_manager_keeps_old_snapshot_on_bad_reload(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {"1": {"name": "Test Club"}})
+    manager = CatalogManager(str(path), check_interval=0)
+    old = manager.get_catalog()
+
+    path.write_text("{not json", encoding="utf-8")
+    assert manager.reload() is old
+
+
+def test_manager_missing_file_gives_empty_catalog(tmp_path):
+    manager = CatalogManager(str(tmp_path / "missing.json"))
+    assert len(manager.get_catalog()) == 0
+
+
+def test_survey_recommender_uses_catalog():
+    catalog = ClubCatalog({"1": {"name": "Robotics Club", "summary": "robots"}})
+    context = RecommenderContext(SurveyRecommender(catalog), catalog)
+    results = context.get_recommendations({"interests": "robots"})
+    assert [r["name"] for r in results] == ["Robotics Club"]
+    assert context.catalog is catalog
+
+
+def test_add_search_text_normalizes_html():
+    clubs = {"1": {"name": "Chess Club", "summary": None,
+                   "description_html": "<p><strong>Chess</strong>&nbsp;&amp;   Go</p>"}}
+    add_search_text(clubs)
+    assert clubs["1"]["search_text"] == "chess club chess & go"
+
+
+def test_search_text_cache_reused_across_loads(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {"1": {"name": "Chess Club"}, "2": {"name": "Art Club"}})
+    CatalogManager(str(path)).get_catalog()
+
+    cache_path = search_text_cache_path(str(path))
+    cache = json.loads(open(cache_path, encoding="utf-8").read())
+    # tamper with one entry, an unchanged fingerprint means it is served as is
+    cache["entries"]["1"][1] = "from cache"
+    write_catalog(cache_path, cache)
+
+    write_catalog(path, {"1": {"name": "Chess Club"}, "2": {"name": "Art Society"}})
+    catalog = CatalogManager(str(path)).get_catalog()
+    assert catalog.clubs["1"]["search_text"] == "from cache"
+    assert catalog.clubs["2"]["search_text"] == "art society"
+
+
+def test_search_text_cache_ignored_on_version_change(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {"1": {"name": "Chess Club"}})
+    cache_path = search_text_cache_path(str(path))
+    write_catalog(cache_path, {"version": -1, "entries": {"1": ["x", "stale"]}})
+
+    catalog = CatalogManager(str(path)).get_catalog()
+    assert catalog.clubs["1"]["search_text"] == "chess club"
+
+
+def test_manager_skips_tombstoned_clubs(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {"1": {"name": "Chess Club"}, "2": {"id": 2, "name": "Gone", "deleted": True}})
+    catalog = CatalogManager(str(path)).get_catalog()
+    assert list(catalog.clubs) == ["1"]
+
+
+def test_load_clubs_reads_json_without_side_files(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {"1": {"name": "Chess Club"}, "2": {"name": "Gone", "deleted": True}})
+    assert load_clubs(str(path)) == {"1": {"name": "Chess Club"}}
+    assert os.listdir(tmp_path) == ["clubs.json"]
+
+
+def test_compact_clubs_keep_serving_fields(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, {
+        "1": {"id": 1, "name": "Chess Club", "summary": "Chess", "status": "Active",
+              "description_html": "<p>Weekly games</p>", "socialMedia": {"x": "@chess"}},
+        "2": {"id": 2, "name": "Gone Club", "deleted": True},
+    })
+    clubs = load_compact_clubs(str(path))
+    assert list(clubs) == ["1"]
+
+    club = clubs["1"]
+    assert isinstance(club, Club)
+    assert club["name"] == "Chess Club"
+    assert club.get("search_text") == "chess club chess weekly games"
+    assert club.get("categories") == ()
+    # everything else is read back from the file when asked for
+    assert club["socialMedia"] == {"x": "@chess"}
+    assert club.get("email", "none") == "none"
+    assert not hasattr(club, "__dict__")
+
+
+def test_compact_clubs_intern_repeated_values():
+    first = Club("1", {"status": "".join(["Act", "ive"])})
+    second = Club("2", {"status": "".join(["Ac", "tive"])})
+    assert first.status is second.status
+    assert first.details() == {}
@@ -0,0 +1,95 @@
+import embedding
+from catalog import ClubCatalog
+from embedding import (
+    EmbeddingRecommender,
+    build_vector_store,
+    load_or_build_vector_store,
+    load_vector_store,
+    save_vector_store,
+)
+
+MOCK_CLUB_DATA = {
+    "1": {
+        "name": "Hack Club",
+        "summary": "Weekend hackathons for software and coding.",
+        "description_html": "Teams write software, build apps and practice coding."
+    },
+    "2": {
+        "name": "Programming Team",
+        "summary": "Coding competitions for software developers.",
+        "description_html": "Practice coding, write software and build apps."
+    },
+    "3": {
+        "name": "Garden Club",
+        "summary": "Growing vegetables and flowers.",
+        "description_html": "Weekly gardening on campus."
+    },
+    "4": {
+        "name": "Choir",
+        "summary": "Singing together every week.",
+        "description_html": "Choral music and singing concerts."
+    }
+}
+
+
+def names(results):
+    return [club["name"] for club in results]
+
+
+def test_related_words_match_without_sharing_the_word():
+    rec = EmbeddingRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    # only the Hack Club mentions hackathons, but the Programming Team shares
+    # most of its other words and should come before unrelated clubs
+    results = names(rec.recommend({"interests": "hackathons", "top_k": 2}))
+    assert results == ["Hack Club", "Programming Team"]
+
+
+def test_unknown_interests_return_nothing():
+    rec = EmbeddingRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert rec.recommend({"interests": "zzzz"}) == []
+    assert rec.recommend({"interests": ""}) == []
+
+
+def test_embeddings_are_deterministic():
+    first = build_vector_store(MOCK_CLUB_DATA)
+    second = build_vector_store(MOCK_CLUB_DATA)
+    assert list(first.club_matrix) == list(second.club_matrix)
+
+
+def test_saved_store_round_trips(tmp_path):
+    store = build_vector_store(MOCK_CLUB_DATA, approximate=True)
+    path = str(tmp_path / "clubs.vectors.f32")
+    save_vector_store(store, path)
+
+    loaded = load_vector_store(path)
+    assert loaded.codes == store.codes
+    assert list(loaded.club_matrix) == list(store.club_matrix)
+    query = store.embed("coding")
+    assert loaded.search(query, 2) == store.search(query, 2)
+
+
+def test_approximate_search_reranks_closest_codes(monkeypatch):
+    monkeypatch.setattr(embedding, "RERANK_CANDIDATES", 2)
+    store = build_vector_store(MOCK_CLUB_DATA, approximate=True)
+    query = store.embed("singing")
+
+    candidates = store.candidates(query, 1)
+    assert len(candidates) == 2
+    assert store.search(query, 1)[0][0] == 3
+
+
+def test_store_saved_next_to_catalog_file(tmp_path):
+    catalog = ClubCatalog(MOCK_CLUB_DATA, source_path=str(tmp_path / "clubs.json"), mtime=1.0)
+    load_or_build_vector_store(catalog)
+    assert (tmp_path / "clubs.vectors.f32").exists()
+
+    reloaded = load_or_build_vector_store(ClubCatalog(MOCK_CLUB_DATA, source_path=catalog.source_path, mtime=1.0))
+    assert reloaded.header["source"] == {"mtime": 1.0, "clubs": 4, "normalization": embedding.NORMALIZATION_VERSION}
+
+
+def test_store_rebuilt_when_normalization_changes(tmp_path, monkeypatch):
+    catalog = ClubCatalog(MOCK_CLUB_DATA, source_path=str(tmp_path / "clubs.json"), mtime=1.0)
+    load_or_build_vector_store(catalog)
+    monkeypatch.setattr(embedding, "NORMALIZATION_VERSION", embedding.NORMALIZATION_VERSION + 1)
+    rebuilt = load_or_build_vector_store(ClubCatalog(MOCK_CLUB_DATA, source_path=catalog.source_path, mtime=1.0))
+    assert rebuilt.header["source"]["normalization"] == embedding.NORMALIZATION_VERSION
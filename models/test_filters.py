@@ -0,0 +1,93 @@
+from bm25 import BM25Recommender
+from catalog import ClubCatalog
+from filters import Bitset, CatalogFilters, allowed_by_any, club_categories, filter_key
+from inverted_index import InvertedIndexRecommender
+from recommender import SurveyRecommender
+
+MOCK_CLUB_DATA = {
+    "1": {
+        "name": "Robotics Club",
+        "summary": "We build robots.",
+        "status": "Active",
+        "visibility": "Public",
+        "categories": [{"name": "Engineering"}]
+    },
+    "2": {
+        "name": "Old Robotics Club",
+        "summary": "We used to build robots.",
+        "status": "Inactive",
+        "visibility": "Public",
+        "categories": ["Engineering"]
+    },
+    "3": {
+        "name": "Secret Robotics Society",
+        "summary": "Robots, quietly.",
+        "status": "Active",
+        "visibility": "Private",
+        "categories": []
+    }
+}
+
+
+def names(results):
+    return [club["name"] for club in results]
+
+
+def test_bitset_ops():
+    a = Bitset.from_docs([0, 3, 9], 10)
+    b = Bitset.from_docs([3, 9], 10)
+    assert list(a & b) == [3, 9]
+    assert list(Bitset.from_docs([1], 10) | b) == [1, 3, 9]
+    assert list(allowed_by_any([a, b])) == [0, 3, 9]
+    assert allowed_by_any([a, None]) is None
+    assert 0 in a and 1 not in a
+    assert len(a) == 3
+
+
+def test_club_categories_accepts_names_and_objects():
+    assert club_categories(MOCK_CLUB_DATA["1"]) == ["engineering"]
+    assert club_categories(MOCK_CLUB_DATA["2"]) == ["engineering"]
+    assert club_categories({}) == []
+
+
+def test_allowed_intersects_filters():
+    filters = CatalogFilters(MOCK_CLUB_DATA)
+    assert filters.allowed({"interests": "robots"}) is None
+    assert list(filters.allowed({"status": "active"})) == [0, 2]
+    assert list(filters.allowed({"status": "Active", "visibility": "Public"})) == [0]
+    assert list(filters.allowed({"category": "Music"})) == []
+
+
+def test_filter_key_is_normalized():
+    assert filter_key({"status": "Active", "interests": "x"}) == (("status", "active"),)
+    assert filter_key({"interests": "x"}) == ()
+
+
+def test_strategies_skip_filtered_clubs():
+    catalog = ClubCatalog(MOCK_CLUB_DATA)
+    request = {"interests": "robots", "status": "Active", "visibility": "Public"}
+    for rec in (SurveyRecommender(catalog), InvertedIndexRecommender(catalog)):
+        assert names(rec.recommend(request)) == ["Robotics Club"]
+        assert len(rec.recommend({"interests": "robots"})) == 3
+
+
+def test_batches_only_score_clubs_some_request_allows():
+    catalog = ClubCatalog(MOCK_CLUB_DATA)
+    batch = [
+        {"interests": "robots", "status": "Active", "visibility": "Public"},
+        {"interests": "robots", "visibility": "Private"},
+        {"interests": "robots, build", "status": "Inactive"},
+    ]
+    strategies = (SurveyRecommender(catalog), InvertedIndexRecommender(catalog, substring_mode=True),
+                  BM25Recommender(catalog))
+    for rec in strategies:
+        assert [names(r) for r in rec.recommend_batch(batch)] == [names(rec.recommend(r)) for r in batch]
+
+    bm25 = strategies[2]
+    allowed = [bm25.allowed(request) for request in batch[:2]]
+    query = bm25.matrix.query_vector(["robots"])
+    scores = bm25.matrix.multiply_batch([query, query], allowed)[0]
+    assert sorted(scores) == [0, 2]
+
+    index = strategies[1].index
+    assert sorted(index.substring_scores("robot", Bitset.from_docs([1], 3))) == [1]
@@ -0,0 +1,67 @@
+from catalog import ClubCatalog
+from fuzzy import FuzzyRecommender, NgramIndex, PrefixTrie, edit_distance
+
+MOCK_CLUB_DATA = {
+    "1": {
+        "name": "Robotics Club",
+        "shortName": "Robotics",
+        "summary": "We build cool robots.",
+        "description_html": "Engineering, robotics, AI."
+    },
+    "2": {
+        "name": "Basketball Club",
+        "shortName": "Hoops",
+        "summary": "Pickup basketball every week.",
+        "description_html": "Basketball for all skill levels."
+    },
+    "3": {
+        "name": "Computer Science Club",
+        "shortName": "CS",
+        "summary": "Computer science talks and coding nights.",
+        "description_html": "Science of computing."
+    }
+}
+
+
+def names(results):
+    return [club["name"] for club in results]
+
+
+def test_edit_distance_stops_past_limit():
+    assert edit_distance("basketbal", "basketball", 2) == 1
+    assert edit_distance("robotcs", "robotics", 1) == 1
+    assert edit_distance("music", "magic", 1) == 2
+
+
+def test_prefix_trie():
+    trie = PrefixTrie(["robot", "robots", "robotics", "art"])
+    assert sorted(trie.with_prefix("robot")) == ["robot", "robotics", "robots"]
+    assert trie.with_prefix("x") == []
+
+
+def test_ngram_index_finds_close_terms():
+    index = NgramIndex(["engineering", "engine", "gardening"])
+    assert index.within("enginering", 2) == {"engineering": 1}
+
+
+def test_prefix_and_typo_matches():
+    rec = FuzzyRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert names(rec.recommend({"interests": "robotic"}))[0] == "Robotics Club"
+    assert names(rec.recommend({"interests": "basketbal"})) == ["Basketball Club"]
+    assert names(rec.recommend({"interests": "comp sci"})) == ["Computer Science Club"]
+
+
+def test_multi_word_keyword_needs_every_word():
+    rec = FuzzyRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert rec.recommend({"interests": "basketball robots"}) == []
+
+
+def test_exact_term_outranks_variants():
+    rec = FuzzyRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert rec.matcher.expand("robots")["robots"] == 1.0
+    assert rec.matcher.expand("robots").get("robotics") is None
+
+
+def test_no_interests():
+    rec = FuzzyRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert rec.recommend({"interests": ""}) == []
@@ -0,0 +1,78 @@
+import pytest
+
+from bm25 import BM25Recommender
+from catalog import ClubCatalog
+from fuzzy import FuzzyRecommender
+from hybrid import CategoryRecommender, HybridRecommender
+from recommender import SurveyRecommender, is_partial
+
+MOCK_CLUB_DATA = {
+    "1": {
+        "name": "Robotics Club",
+        "summary": "We build robots for competitions.",
+        "status": "Active",
+        "categories": ["Engineering"]
+    },
+    "2": {
+        "name": "Society of Engineers",
+        "summary": "Professional development and networking.",
+        "status": "Active",
+        "categories": ["Engineering", "Professional"]
+    },
+    "3": {
+        "name": "Chess Club",
+        "summary": "Weekly chess games.",
+        "status": "Inactive",
+        "categories": ["Recreation"]
+    }
+}
+
+
+def names(results):
+    return [club["name"] for club in results]
+
+
+def make_hybrid(fusion):
+    catalog = ClubCatalog(MOCK_CLUB_DATA)
+    components = [
+        (BM25Recommender(catalog), 1.0),
+        (FuzzyRecommender(catalog), 0.5),
+        (CategoryRecommender(catalog), 0.5),
+    ]
+    return HybridRecommender(catalog, components, fusion=fusion)
+
+
+def test_category_recommender():
+    rec = CategoryRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert sorted(names(rec.recommend({"interests": "engineering"}))) == ["Robotics Club", "Society of Engineers"]
+    assert rec.recommend({"interests": "basketball"}) == []
+
+
+@pytest.mark.parametrize("fusion", ["rrf", "weighted"])
+def test_hybrid_fuses_keyword_and_category_matches(fusion):
+    rec = make_hybrid(fusion)
+    # "robots" only matches by keyword, "engineering" mostly by category
+    result = names(rec.recommend({"interests": "robots, engineering"}))
+    assert result[0] == "Robotics Club"
+    assert "Society of Engineers" in result
+    assert "Chess Club" not in result
+
+
+def test_hybrid_applies_filters_to_every_component():
+    rec = make_hybrid("rrf")
+    assert names(rec.recommend({"interests": "chess"})) == ["Chess Club"]
+    assert rec.recommend({"interests": "chess", "status": "Active"}) == []
+
+
+def test_hybrid_rejects_unknown_fusion():
+    with pytest.raises(ValueError):
+        make_hybrid("max")
+
+
+def test_hybrid_results_are_partial_when_a_component_is():
+    catalog = ClubCatalog(MOCK_CLUB_DATA)
+    survey = SurveyRecommender(catalog)
+    hybrid = HybridRecommender(catalog, [(survey, 1.0), (CategoryRecommender(catalog), 0.5)])
+    assert not is_partial(hybrid.recommend({"interests": "robots, chess"}))
+    survey.planner.budget = len(MOCK_CLUB_DATA)  # one keyword's scan
+    assert is_partial(hybrid.recommend({"interests": "robots, chess"}))
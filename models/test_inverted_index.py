@@ -0,0 +1,100 @@
+from catalog import ClubCatalog
+from inverted_index import InvertedIndex, InvertedIndexRecommender, tokenize
+from recommender import SurveyRecommender
+
+MOCK_CLUB_DATA = {
+    "1": {
+        "name": "Robotics Club",
+        "shortName": "Robotics",
+        "summary": "We build cool robots.",
+        "description_html": "Engineering, robotics, AI."
+    },
+    "2": {
+        "name": "Art Club",
+        "shortName": "Art",
+        "summary": "Painting and sculpting.",
+        "description_html": "We draw, paint, and create art."
+    },
+    "3": {
+        "name": "Service Club",
+        "shortName": "Service",
+        "summary": "Community service every weekend.",
+        "description_html": "Community outreach and service projects."
+    }
+}
+
+
+def test_tokenize():
+    assert tokenize("Engineering, Robotics & AI!") == ["engineering", "robotics", "ai"]
+
+
+def test_index_term_frequencies():
+    index = InvertedIndex(MOCK_CLUB_DATA)
+    assert index.postings["robotics"] == {0: 2}
+    assert index.postings["club"] == {0: 1, 1: 1, 2: 1}
+
+
+def test_token_scores_whole_words_only():
+    index = InvertedIndex(MOCK_CLUB_DATA)
+    assert index.token_scores("robot") == {}
+    assert index.token_scores("robots") == {0: 1}
+
+
+def test_token_scores_phrase_requires_every_word():
+    index = InvertedIndex(MOCK_CLUB_DATA)
+    assert index.token_scores("community service") == {2: 2}
+    assert index.token_scores("community robots") == {}
+
+
+def test_substring_scores_match_survey_scores():
+    index = InvertedIndex(MOCK_CLUB_DATA)
+    survey = SurveyRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    for keyword in ["robot", "art", "ice", "community service", "", "&"]:
+        expected = {
+            doc: survey._calculate_match_score(club, [keyword])
+            for doc, club in enumerate(MOCK_CLUB_DATA.values())
+        }
+        expected = {doc: score for doc, score in expected.items() if score}
+        assert index.substring_scores(keyword) == expected
+
+
+def test_recommend_no_interests():
+    rec = InvertedIndexRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    assert rec.recommend({"interests": ""}) == []
+
+
+def test_recommend_result_shape():
+    rec = InvertedIndexRecommender(ClubCatalog(MOCK_CLUB_DATA))
+    results = rec.recommend({"interests": "robotics"})
+    assert results == [{"name": "Robotics Club", "shortName": "Robotics", "summary": "We build cool robots."}]
+
+
+def test_substring_mode_parity_with_survey():
+    catalog = ClubCatalog(MOCK_CLUB_DATA)
+    survey = SurveyRecommender(catalog)
+    rec = InvertedIndexRecommender(catalog, substring_mode=True)
+    for interests in ["robot, art", "club", "community service, paint", "a"]:
+        data = {"interests": interests}
+        assert rec.recommend(data) == survey.recommend(data)
+
+
+def test_recommend_limit_to_top_10():
+    clubs = {
+        str(i): {"name": f"Club {i}", "summary": "test", "description_html": "keyword"}
+        for i in range(20)
+    }
+    rec = InvertedIndexRecommender(ClubCatalog(clubs))
+    assert len(rec.recommend({"interests": "keyword"})) == 10
+
+
+def test_index_shared_per_catalog():
+    catalog = ClubCatalog(MOCK_CLUB_DATA)
+    assert InvertedIndexRecommender(catalog).index is \
+        InvertedIndexRecommender(catalog, substring_mode=True).index
+
+
+def test_recommend_batch_matches_recommend():
+    batch = [{"interests": "robotics, art"}, {"interests": "community service"}, {"interests": "robotics"}]
+    for substring_mode in (False, True):
+        rec = InvertedIndexRecommender(ClubCatalog(MOCK_CLUB_DATA), substring_mode=substring_mode)
+        assert rec.recommend_batch(batch) == [rec.recommend(user_data) for user_data in batch]
@@ -0,0 +1,50 @@
+import metrics
+from metrics import Histogram, StageMetrics, current_request, label_strategy, start_request, timed
+
+
+def test_histogram_buckets_are_upper_bounds():
+    histogram = Histogram((0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert histogram.count == 4
+    assert histogram.sum == 3.65
+
+
+def test_render_prometheus_text():
+    stages = StageMetrics((0.1, 1.0))
+    stages.observe("score", "survey", 0.5)
+    stages.observe("score", "survey", 0.05)
+
+    text = stages.render()
+    assert "# TYPE club_match_stage_seconds histogram" in text
+    assert 'club_match_stage_seconds_bucket{stage="score",strategy="survey",le="0.1"} 1' in text
+    assert 'club_match_stage_seconds_bucket{stage="score",strategy="survey",le="1.0"} 2' in text
+    assert 'club_match_stage_seconds_bucket{stage="score",strategy="survey",le="+Inf"} 2' in text
+    assert 'club_match_stage_seconds_count{stage="score",strategy="survey"} 2' in text
+
+
+def test_timed_records_request_stages():
+    metrics.stage_metrics.reset()
+    timings = start_request()
+    label_strategy("bm25")
+    with timed("score"):
+        pass
+    with timed("score"):
+        pass
+
+    assert current_request() is timings
+    assert list(timings.stages) == ["score"]
+    assert timings.server_timing().startswith("score;dur=")
+    assert metrics.stage_metrics.get("score", "bm25").count == 2
+
+
+def test_timed_is_noop_when_disabled(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    metrics.stage_metrics.reset()
+    timings = start_request()
+    with timed("score"):
+        pass
+
+    assert timings.stages == {}
+    assert metrics.stage_metrics.get("score", "") is None
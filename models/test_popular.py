@@ -0,0 +1,114 @@
+import json
+
+from catalog import ClubCatalog, add_search_text
+from popular import PopularResults, changed_texts, load_seed
+from recommender import RecommenderContext, SurveyRecommender
+from result_cache import ResultCache
+
+
+def make_clubs(**overrides):
+    clubs = {
+        "1": {"name": "Robotics Club", "summary": "We build robots."},
+        "2": {"name": "Basketball Club", "summary": "Pickup basketball."},
+        "3": {"name": "Chess Club", "summary": "Chess and strategy games."},
+    }
+    for key, club in overrides.items():
+        if club is None:
+            clubs.pop(key)
+        else:
+            clubs[key] = club
+    return add_search_text(clubs)
+
+
+def snapshot(version=1, **overrides):
+    catalog = ClubCatalog(make_clubs(**overrides), version=version)
+    return catalog, SurveyRecommender(catalog)
+
+
+class CountingSurvey(SurveyRecommender):
+    def __init__(self, catalog):
+        super().__init__(catalog)
+        self.batches = []
+
+    def recommend_batch(self, batch):
+        self.batches.append([user_data["interests"] for user_data in batch])
+        return super().recommend_batch(batch)
+
+
+def test_observe_and_wanted_puts_seed_first():
+    popular = PopularResults(size=2, seed=[(("chess",), 10)])
+    for _ in range(3):
+        popular.observe(("robotics",), 10)
+    popular.observe(("basketball",), 5)
+    popular.observe(("art",), 10)
+    assert popular.wanted() == [(("chess",), 10), (("robotics",), 10), (("basketball",), 5)]
+
+
+def test_refresh_serves_same_results_as_live_scoring():
+    catalog, strategy = snapshot()
+    popular = PopularResults(seed=[(("robotics",), 10), (("basketball", "chess"), 2)])
+    popular.refresh(catalog, strategy)
+
+    assert popular.get(catalog, "survey", ("robotics",), 10) == strategy.recommend({"interests": "robotics"})
+    assert popular.get(catalog, "survey", ("basketball", "chess"), 2) == strategy.recommend(
+        {"interests": "basketball, chess", "top_k": 2}
+    )
+    # other sets, strategies and catalog versions aren't materialized
+    assert popular.get(catalog, "survey", ("art",), 10) is None
+    assert popular.get(catalog, "bm25", ("robotics",), 10) is None
+    assert popular.get(ClubCatalog({}, version=2), "survey", ("robotics",), 10) is None
+    assert popular.stats()["hits"] == 2
+
+
+def test_catalog_change_only_recomputes_affected_sets():
+    catalog, _ = snapshot()
+    strategy = CountingSurvey(catalog)
+    popular = PopularResults(seed=[(("robotics",), 10), (("chess",), 10)])
+    popular.refresh(catalog, strategy)
+    popular.refresh(catalog, strategy)
+    assert strategy.batches == [["robotics", "chess"]]
+
+    changed, _ = snapshot(version=2, **{"3": {"name": "Chess Club", "summary": "Chess and robotics."}})
+    strategy = CountingSurvey(changed)
+    popular.refresh(changed, strategy)
+    # the edited club mentions both words, so both are affected
+    assert strategy.batches == [["robotics", "chess"]]
+
+    added, _ = snapshot(version=3, **{"3": {"name": "Chess Club", "summary": "Chess and robotics."},
+                                      "4": {"name": "Go Club", "summary": "Chess's older cousin."}})
+    strategy = CountingSurvey(added)
+    popular.refresh(added, strategy)
+    assert strategy.batches == [["chess"]]
+    assert popular.get(added, "survey", ("robotics",), 10) == strategy.recommend({"interests": "robotics"})
+    assert popular.get(added, "survey", ("chess",), 10) == strategy.recommend({"interests": "chess"})
+    assert popular.stats()["reused"] == 1
+
+
+def test_reordered_catalog_recomputes_everything():
+    old = make_clubs()
+    new = {key: old[key] for key in ("2", "1", "3")}
+    assert changed_texts(old, new) is None
+    assert changed_texts(old, dict(old)) == []
+
+
+def test_load_seed_reads_plain_and_json_lines(tmp_path):
+    path = tmp_path / "seed.ndjson"
+    path.write_text(
+        "Robotics, engineering\n\n" + json.dumps({"interests": "chess", "top_k": 3}) + "\n",
+        encoding="utf-8",
+    )
+    assert load_seed(str(path)) == [(("engineering", "robotics"), 10), (("chess",), 3)]
+
+
+def test_context_serves_popular_results_and_falls_back():
+    catalog, strategy = snapshot()
+    popular = PopularResults(seed=[(("robotics",), 10)])
+    popular.refresh(catalog, strategy)
+    context = RecommenderContext(strategy, catalog, ResultCache(), popular)
+
+    assert context.get_recommendations({"interests": "Robotics"}) == strategy.recommend({"interests": "robotics"})
+    assert context.get_recommendations({"interests": "chess"}) == strategy.recommend({"interests": "chess"})
+    # filtered requests always score live
+    context.get_recommendations({"interests": "robotics", "status": "Active"})
+    assert popular.stats()["hits"] == 1 and popular.stats()["misses"] == 1
+    assert popular.wanted() == [(("robotics",), 10), (("chess",), 10)]
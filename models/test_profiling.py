@@ -0,0 +1,94 @@
+import json
+import os
+
+from metrics import RequestTimings
+from profiling import Profiler, SlowQueryLog, profile_request, read_slow_log
+
+
+def busy():
+    return sum(i * i for i in range(2000))
+
+
+def test_wanted_by_header_or_sampling_rate():
+    assert not Profiler().enabled
+    assert not Profiler().wanted("1")
+    assert Profiler(allow_header=True).wanted("1")
+    assert not Profiler(allow_header=True).wanted("0")
+    assert not Profiler(allow_header=True).wanted(None)
+    assert Profiler(rate=0.1, sample=lambda: 0.05).wanted()
+    assert not Profiler(rate=0.1, sample=lambda: 0.5).wanted()
+
+
+def test_profile_saves_stats_and_keeps_the_newest(tmp_path):
+    profiler = Profiler(directory=str(tmp_path), keep=2)
+    for _ in range(3):
+        with profiler.profile("survey") as result:
+            busy()
+    assert os.path.exists(result["profile"]) and result["profile"].endswith(".prof")
+    assert len(result["hotspots"]) <= 5 and any("busy" in spot or "genexpr" in spot for spot in result["hotspots"])
+    assert len(os.listdir(tmp_path)) == 2
+
+
+def test_only_one_profile_at_a_time(tmp_path):
+    profiler = Profiler(directory=str(tmp_path))
+    with profiler.profile() as outer:
+        with profiler.profile() as inner:
+            assert inner is None
+    assert outer["profile"] and profiler.skipped == 1
+
+
+def test_profile_request_only_profiles_picked_requests(tmp_path):
+    profiler = Profiler(directory=str(tmp_path))
+    timings = RequestTimings()
+    with profile_request(profiler, timings):
+        busy()
+    with profile_request(profiler, None):
+        busy()
+    assert "profile" not in timings.details
+
+    timings.profile = True
+    with profile_request(profiler, timings):
+        busy()
+    assert timings.details["profile"].endswith(".prof")
+
+
+def make_timings(keywords=("a",), profile=False):
+    timings = RequestTimings()
+    timings.strategy = "survey"
+    timings.add("score", 0.25)
+    timings.profile = profile
+    if keywords is not None:
+        timings.details.update(keywords=list(keywords), matched=1110)
+    return timings
+
+
+def test_slow_query_log_threshold(tmp_path):
+    path = str(tmp_path / "slow.ndjson")
+    log = SlowQueryLog(path, threshold_ms=100)
+    assert not log.observe(make_timings(), 0.05)
+    assert log.observe(make_timings(), 0.3)
+    assert log.observe(make_timings(profile=True), 0.001)
+    # requests that never got as far as scoring (batches, errors) have no keywords
+    assert not log.observe(make_timings(keywords=None), 1.0)
+
+    records = read_slow_log(path)
+    assert len(records) == 2
+    assert records[0]["keywords"] == ["a"] and records[0]["matched"] == 1110
+    assert records[0]["strategy"] == "survey" and records[0]["total_ms"] == 300
+    assert records[0]["stages"] == {"score": 250}
+
+
+def test_slow_query_log_rotates_and_skips_bad_lines(tmp_path):
+    path = str(tmp_path / "slow.ndjson")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("not json\n" + json.dumps({"keywords": ["old"]}) + "\n")
+    assert [record["keywords"] for record in read_slow_log(path)] == [["old"]]
+
+    log = SlowQueryLog(path, threshold_ms=0, max_bytes=10)
+    log.observe(make_timings(), 0.001)
+    assert [record["keywords"] for record in read_slow_log(path)] == [["a"]]
+    assert os.path.exists(path + ".1")
+
+
+def test_disabled_without_path():
+    assert not SlowQueryLog(None, threshold_ms=0).observe(make_timings(), 1.0)
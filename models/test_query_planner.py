@@ -0,0 +1,97 @@
+from catalog import ClubCatalog
+from inverted_index import InvertedIndexRecommender
+from query_planner import QueryPlanner, SubstringFrequency
+from recommender import SurveyRecommender, is_partial
+
+CLUBS = {
+    str(i): {"name": f"Club {i}", "summary": "robotics " * (i % 3) + ("chess" if i % 5 == 0 else "")}
+    for i in range(20)
+}
+
+
+def test_drops_stopwords_short_and_repeated_keywords():
+    plan = QueryPlanner().plan(["robotics", "the", "a", "", "robotics", "community   service"], lambda k: 1)
+    assert plan.keywords == ["robotics", "community service"]
+    assert plan.dropped == ["the", "a", "", "robotics"]
+    assert not plan.partial
+
+
+def test_orders_by_document_frequency_and_stops_at_budget():
+    frequency = {"music": 50, "robotics": 3, "chess": 10, "club": 900}
+    planner = QueryPlanner(frequency.get, budget=250)
+    plan = planner.plan(["club", "music", "robotics", "chess"], lambda k: 100)
+    assert plan.keywords == ["robotics", "chess"]
+    assert plan.skipped == ["music", "club"]
+    assert plan.cost == 200 and plan.partial
+
+
+def test_rarest_keyword_is_scored_even_over_budget():
+    plan = QueryPlanner(budget=10).plan(["robotics", "chess"], lambda k: 100)
+    assert plan.keywords == ["robotics"] and plan.skipped == ["chess"]
+
+
+def test_survey_skips_common_keywords_over_budget():
+    catalog = ClubCatalog(CLUBS)
+    survey = SurveyRecommender(catalog)
+    survey.planner.budget = len(CLUBS)  # one keyword's scan
+    results = survey.recommend({"interests": "robotics, chess"})
+    # chess is in fewer clubs, so it is the one scored
+    assert is_partial(results)
+    assert [club["name"] for club in results] == ["Club 0", "Club 5", "Club 10", "Club 15"]
+    assert not is_partial(survey.recommend({"interests": "chess"}))
+
+
+def test_substring_index_plans_like_survey():
+    catalog = ClubCatalog(CLUBS)
+    survey = SurveyRecommender(catalog)
+    substring = InvertedIndexRecommender(catalog, substring_mode=True)
+    survey.planner.budget = len(CLUBS)
+    for interests in ["robotics, chess", "a, the, robotics", ", ,"]:
+        data = {"interests": interests}
+        assert substring.recommend(data) == survey.recommend(data)
+        assert is_partial(substring.recommend(data)) == is_partial(survey.recommend(data))
+
+
+def test_survey_batch_flags_partial_results():
+    catalog = ClubCatalog(CLUBS)
+    survey = SurveyRecommender(catalog)
+    survey.planner.budget = len(CLUBS)
+    batch = [{"interests": "robotics, chess"}, {"interests": "robotics"}]
+    results = survey.recommend_batch(batch)
+    assert results == [survey.recommend(data) for data in batch]
+    assert [is_partial(r) for r in results] == [True, False]
+
+
+def test_common_substring_is_not_mistaken_for_rare_word():
+    clubs = {
+        str(i): {"name": f"Club {i}", "summary": ("hiking " if i == 3 else "") + "volunteering gardening"}
+        for i in range(20)
+    }
+    survey = SurveyRecommender(ClubCatalog(clubs))
+    survey.planner.budget = len(clubs)  # one keyword's scan
+    plan = survey.plan("ing, hiking")
+    # "ing" is inside a word of every club, "hiking" only in one
+    assert plan.keywords == ["hiking"] and plan.skipped == ["ing"]
+    assert [club["name"] for club in survey.recommend({"interests": "ing, hiking"})] == ["Club 3"]
+
+
+def test_long_keyword_lists_look_up_a_bounded_number_of_frequencies():
+    lookups = []
+    planner = QueryPlanner(lambda keyword: lookups.append(keyword) or 1, budget=50, max_lookups=8)
+    keywords = [f"unseen{i}" for i in range(500)]
+    plan = planner.plan(keywords, lambda k: 1)
+    assert len(lookups) == 8
+    # the rest keep their input order behind the ones that were ranked
+    assert plan.keywords == keywords[:50] and plan.skipped == keywords[50:]
+
+
+def test_substring_frequency_matches_a_vocabulary_scan():
+    postings = {"hiking": {0: 1}, "gardening": {1: 2, 2: 1}, "engineers": {2: 1, 3: 1}, "chess": {4: 1}}
+    frequency = SubstringFrequency(postings, size=5)
+    for word in ["ing", "er", "hiking", "eng", "ess", "xyz", "ngineer"]:
+        docs = set()
+        for term, docs_with_term in postings.items():
+            if word in term:
+                docs.update(docs_with_term)
+        assert frequency(word) == len(docs), word
+    assert frequency("e") == 5
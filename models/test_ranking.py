@@ -0,0 +1,49 @@
+import random
+from ranking import TermContribution, rank_terms_top_k, select_top_k
+
+
+def contribution(postings):
+    upper_bound = max(postings.values()) if postings else 0
+    return TermContribution(upper_bound, postings.items, lambda doc: postings.get(doc, 0))
+
+
+def full_sort(terms, k):
+    scores = {}
+    for term in terms:
+        for doc, score in term.postings():
+            scores[doc] = scores.get(doc, 0) + score
+    return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+
+
+def test_select_top_k_orders_by_score_then_doc():
+    scores = [(3, 1.0), (1, 5.0), (2, 1.0), (0, 2.0)]
+    assert select_top_k(scores, 3) == [(1, 5.0), (0, 2.0), (2, 1.0)]
+
+
+def test_rank_terms_top_k_empty():
+    assert rank_terms_top_k([], 10) == []
+
+
+def test_rank_terms_top_k_stops_admitting_new_docs():
+    seen = []
+
+    def tracked_postings():
+        seen.append(True)
+        return {99: 1}.items()
+
+    heavy = contribution({0: 100, 1: 90, 2: 80})
+    light = TermContribution(1, tracked_postings, lambda doc: 0)
+    assert rank_terms_top_k([light, heavy], 2) == [(0, 100), (1, 90)]
+    # the light term could never lift doc 99 into the top 2
+    assert seen == []
+
+
+def test_rank_terms_top_k_matches_full_sort():
+    rng = random.Random(0)
+    for _ in range(200):
+        terms = [
+            contribution({rng.randrange(30): rng.randint(1, 5) for _ in range(rng.randint(1, 20))})
+            for _ in range(rng.randint(1, 5))
+        ]
+        k = rng.randint(1, 12)
+        assert rank_terms_top_k(terms, k) == full_sort(terms, k)
@@ -1,6 +1,14 @@
+import json
+
 import pytest
 from unittest.mock import patch, mock_open
-from recommender import SurveyRecommender, RecommenderContext
+from recommender import (
+    Recommendation,
+    RecommenderContext,
+    SurveyRecommender,
+    club_to_recommendation,
+    recommendations_json,
+)
 
 MOCK_CLUB_DATA = {
     "1": {
@@ -113,3 +121,74 @@ def test_recommender_context_calls_strategy():
 
     context = RecommenderContext(MockStrategy())
     assert context.get_recommendations({"x": 1}) == ["OK"]
+
+
+def test_recommend_respects_top_k():
+    rec = SurveyRecommender()
+    rec.clubs = {
+        str(i): {"name": f"Club {i}", "summary": "keyword " * i, "description_html": ""}
+        for i in range(1, 20)
+    }
+
+    results = rec.recommend({"interests": "keyword", "top_k": 3})
+    assert [c["name"] for c in results] == ["Club 19", "Club 18", "Club 17"]
+
+
+def test_recommend_ties_keep_catalog_order():
+    rec = SurveyRecommender()
+    rec.clubs = {
+        str(i): {"name": f"Club {i}", "summary": "keyword", "description_html": ""}
+        for i in range(20)
+    }
+
+    results = rec.recommend({"interests": "keyword"})
+    assert [c["name"] for c in results] == [f"Club {i}" for i in range(10)]
+
+
+BATCH = [
+    {"interests": "robotics, art"},
+    {"interests": "service", "top_k": 1},
+    {"interests": ""},
+    {"interests": "Art, robotics"},
+]
+
+
+def test_recommend_batch_matches_recommend():
+    rec = SurveyRecommender()
+    rec.clubs = MOCK_CLUB_DATA
+
+    assert rec.recommend_batch(BATCH) == [rec.recommend(user_data) for user_data in BATCH]
+
+
+def test_context_batch_scores_equivalent_queries_once():
+    from result_cache import ResultCache
+
+    class CountingStrategy(SurveyRecommender):
+        batch_sizes = []
+
+        def recommend_batch(self, batch):
+            self.batch_sizes.append(len(batch))
+            return super().recommend_batch(batch)
+
+    rec = CountingStrategy()
+    rec.clubs = MOCK_CLUB_DATA
+    context = RecommenderContext(rec, cache=ResultCache())
+
+    results = context.get_recommendations_batch(BATCH)
+    assert results[0] == results[3]
+    assert rec.batch_sizes == [3]
+
+    # everything is cached now
+    assert context.get_recommendations_batch(BATCH) == results
+    assert rec.batch_sizes == [3]
+
+
+def test_recommendations_json_reuses_fragments():
+    rec = club_to_recommendation({"name": "Café Club", "shortName": None, "summary": "Coffee"})
+    assert isinstance(rec, Recommendation)
+    assert rec == {"name": "Café Club", "shortName": None, "summary": "Coffee"}
+    assert rec.json == '{"name":"Café Club","shortName":null,"summary":"Coffee"}'.encode("utf-8")
+
+    plain = {"name": "Chess Club", "shortName": "Chess", "summary": None}
+    assert json.loads(recommendations_json([rec, plain])) == [rec, plain]
+    assert recommendations_json([]) == b"[]"
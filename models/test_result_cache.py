@@ -0,0 +1,96 @@
+from catalog import ClubCatalog, CatalogManager
+from recommender import RecommenderContext, normalize_keywords
+from result_cache import ResultCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class CountingStrategy:
+    name = "counting"
+
+    def __init__(self):
+        self.calls = []
+
+    def recommend(self, user_data):
+        self.calls.append(user_data)
+        return [{"name": user_data["interests"]}]
+
+
+def test_get_put_and_counters():
+    cache = ResultCache(max_entries=2)
+    assert cache.get("a") is None
+    cache.put("a", 1)
+    assert cache.get("a") == 1
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1
+
+
+def test_lru_eviction():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = ResultCache(ttl=10, clock=clock)
+    cache.put("a", 1)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_zero_size_disables_cache():
+    cache = ResultCache(max_entries=0)
+    cache.put("a", 1)
+    assert cache.get("a") is None
+
+
+def test_normalize_keywords():
+    assert normalize_keywords("Robotics, engineering, , robotics") == ("engineering", "robotics")
+
+
+def test_context_serves_equivalent_queries_from_cache():
+    strategy = CountingStrategy()
+    catalog = ClubCatalog({})
+    context = RecommenderContext(strategy, catalog, ResultCache())
+
+    first = context.get_recommendations({"interests": "robotics, Engineering"})
+    second = context.get_recommendations({"interests": "engineering,robotics,robotics"})
+    assert first == second == [{"name": "engineering, robotics"}]
+    assert len(strategy.calls) == 1
+
+
+def test_context_key_includes_top_k_strategy_and_version():
+    cache = ResultCache()
+    strategy = CountingStrategy()
+    RecommenderContext(strategy, ClubCatalog({}, version=1), cache).get_recommendations({"interests": "art"})
+    RecommenderContext(strategy, ClubCatalog({}, version=1), cache).get_recommendations({"interests": "art", "top_k": 3})
+    RecommenderContext(strategy, ClubCatalog({}, version=2), cache).get_recommendations({"interests": "art"})
+    assert len(strategy.calls) == 3
+
+
+def test_cache_cleared_on_catalog_reload(tmp_path):
+    path = tmp_path / "clubs.json"
+    path.write_text('{"1": {"name": "Art Club"}}', encoding="utf-8")
+    manager = CatalogManager(str(path))
+    cache = ResultCache()
+    manager.add_reload_listener(cache.clear)
+
+    cache.put("a", 1)
+    manager.reload()
+    assert len(cache) == 0
+    assert cache.stats()["invalidations"] == 1
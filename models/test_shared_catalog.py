@@ -0,0 +1,79 @@
+import json
+import os
+
+from catalog import CatalogManager
+from shared_catalog import SharedCatalog
+
+CLUBS = {
+    "1": {"name": "Robotics Club", "summary": "We build robots."},
+    "2": {"name": "Chess Club", "summary": "Chess every week."},
+}
+
+
+def write_catalog(path, clubs, mtime):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(clubs, f)
+    os.utime(path, (mtime, mtime))
+
+
+def test_first_worker_publishes_and_others_attach(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, CLUBS, 1000)
+    first = CatalogManager(str(path), check_interval=0, shared=True)
+    second = CatalogManager(str(path), check_interval=0, shared=True)
+
+    a = first.get_catalog()
+    b = second.get_catalog()
+    assert a.version == b.version == 1
+    assert first.shared.published == 1 and second.shared.published == 0
+    assert [club["name"] for club in b.clubs.values()] == ["Robotics Club", "Chess Club"]
+    # the index comes from the snapshot, not built again
+    assert "inverted_index" in b._derived
+
+
+def test_reload_publishes_a_generation_every_worker_picks_up(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, CLUBS, 1000)
+    first = CatalogManager(str(path), check_interval=0, shared=True)
+    second = CatalogManager(str(path), check_interval=0, shared=True)
+    first.get_catalog()
+    old = second.get_catalog()
+    reloaded = []
+    second.add_reload_listener(reloaded.append)
+
+    assert first.reload().version == 2
+    new = second.get_catalog()
+    assert new is not old and new.version == 2
+    assert reloaded == [new]
+    assert second.shared.published == 0
+    assert second.get_catalog() is new
+
+
+def test_catalog_change_is_published_once(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, CLUBS, 1000)
+    first = CatalogManager(str(path), check_interval=0, shared=True)
+    second = CatalogManager(str(path), check_interval=0, shared=True)
+    first.get_catalog()
+    second.get_catalog()
+
+    write_catalog(path, {"1": {"name": "Art Club"}}, 2000)
+    a = first.get_catalog()
+    b = second.get_catalog()
+    assert a.version == b.version == 2
+    assert first.shared.published + second.shared.published == 2
+    assert [club["name"] for club in b.clubs.values()] == ["Art Club"]
+
+
+def test_old_generations_are_removed(tmp_path):
+    path = tmp_path / "clubs.json"
+    write_catalog(path, CLUBS, 1000)
+    shared = SharedCatalog(str(path), directory=str(tmp_path / "shared"))
+    os.makedirs(tmp_path / "shared")
+    for _ in range(3):
+        shared.publish(force=True)
+    assert shared.generation() == 3
+    assert sorted(os.listdir(tmp_path / "shared")) == [
+        "clubs.2.snapshot", "clubs.3.snapshot", "clubs.generation", "clubs.publish.lock"
+    ]
+    assert shared.attach().version == 3
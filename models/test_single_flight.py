@@ -0,0 +1,135 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from catalog import ClubCatalog
+from recommender import RecommenderContext
+from single_flight import SingleFlight
+
+
+def test_concurrent_calls_share_one_computation():
+    flights = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait()
+        return ["result"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("key", compute))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # wait until every follower is queued behind the leader
+    while flights.stats()["coalesced"] < 4:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == [["result"]] * 5
+    assert flights.stats() == {"leaders": 1, "coalesced": 4, "errors": 0, "in_flight": 0}
+
+
+def test_finished_calls_are_not_reused():
+    flights = SingleFlight()
+    assert flights.do("key", lambda: 1) == 1
+    assert flights.do("key", lambda: 2) == 2
+    assert flights.stats()["leaders"] == 2
+
+
+def test_errors_reach_every_waiting_caller():
+    flights = SingleFlight()
+    release = threading.Event()
+    errors = []
+
+    def fail():
+        release.wait()
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flights.do("key", fail)
+        except ValueError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    while flights.stats()["coalesced"] < 2:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert errors == ["boom"] * 3
+    assert flights.stats()["errors"] == 1
+
+
+def test_async_calls_share_one_computation():
+    flights = SingleFlight()
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return ["result"]
+
+    async def main():
+        return await asyncio.gather(*(flights.do_async("key", compute) for _ in range(10)))
+
+    assert asyncio.run(main()) == [["result"]] * 10
+    assert calls == [1]
+    assert flights.stats()["coalesced"] == 9 and flights.stats()["in_flight"] == 0
+
+
+def test_async_leader_cancelled_doesnt_cancel_followers():
+    flights = SingleFlight()
+
+    async def compute():
+        await asyncio.sleep(0.01)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flights.do_async("key", compute))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flights.do_async("key", compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_context_coalesces_scoring():
+    release = threading.Event()
+
+    class SlowStrategy:
+        name = "slow"
+        calls = 0
+
+        def recommend(self, user_data):
+            SlowStrategy.calls += 1
+            release.wait()
+            return [{"name": user_data["interests"]}]
+
+    flights = SingleFlight()
+    context = RecommenderContext(SlowStrategy(), ClubCatalog({}), flights=flights)
+    results = []
+    queries = ["robotics, chess", "Chess,robotics", "chess, robotics, chess"]
+    threads = [threading.Thread(target=lambda q=q: results.append(context.get_recommendations({"interests": q})))
+               for q in queries]
+    for thread in threads:
+        thread.start()
+    while flights.stats()["coalesced"] < 2:
+        time.sleep(0.001)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert SlowStrategy.calls == 1
+    assert results == [[{"name": "chess, robotics"}]] * 3
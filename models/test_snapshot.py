@@ -0,0 +1,90 @@
+import json
+import os
+
+import pytest
+
+from bm25 import BM25Recommender
+from catalog import CatalogManager, ClubCatalog, add_search_text
+from inverted_index import InvertedIndexRecommender
+import snapshot as snapshot_module
+from snapshot import build_snapshot, load_snapshot, snapshot_path, source_info
+
+MOCK_CLUB_DATA = {
+    "1": {
+        "name": "Robotics Club",
+        "shortName": "Robotics",
+        "summary": "We build cool robots.",
+        "description_html": "<p>Engineering, robotics, AI.</p>"
+    },
+    "2": {
+        "name": "Basketball Club",
+        "shortName": "Hoops",
+        "summary": "Pickup basketball every week.",
+        "description_html": "Basketball for all skill levels."
+    },
+    "3": {
+        "name": "Robot Soccer",
+        "shortName": "RoboCup",
+        "summary": "Robots playing soccer, robots everywhere.",
+        "description_html": ""
+    }
+}
+
+QUERIES = ["robots", "basketball, engineering", "robot soccer", "chess"]
+
+
+def write_catalog(path, clubs):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(clubs, f)
+
+
+@pytest.fixture
+def catalog_path(tmp_path):
+    path = str(tmp_path / "clubs.json")
+    write_catalog(path, MOCK_CLUB_DATA)
+    return path
+
+
+def test_snapshot_ranks_like_a_fresh_index(catalog_path):
+    snapshot = load_snapshot(build_snapshot(catalog_path), source_info(catalog_path), source_path=catalog_path)
+    fresh = ClubCatalog(add_search_text(json.loads(json.dumps(MOCK_CLUB_DATA))))
+    assert [club["name"] for club in snapshot.clubs.values()] == [club["name"] for club in fresh.clubs.values()]
+    # fields outside the compact record come from the catalog file
+    assert snapshot.clubs["1"]["description_html"] == MOCK_CLUB_DATA["1"]["description_html"]
+
+    for make in (InvertedIndexRecommender, BM25Recommender,
+                 lambda c: InvertedIndexRecommender(c, substring_mode=True),
+                 lambda c: BM25Recommender(c, scheme="tfidf")):
+        loaded, built = make(snapshot), make(fresh)
+        for interests in QUERIES:
+            assert loaded.recommend({"interests": interests}) == built.recommend({"interests": interests})
+
+
+def test_stale_snapshot_is_rejected(catalog_path):
+    path = build_snapshot(catalog_path)
+    write_catalog(catalog_path, {"9": {"name": "Chess Club"}})
+    os.utime(catalog_path, (1, 1))
+    with pytest.raises(ValueError):
+        load_snapshot(path, source_info(catalog_path))
+
+
+def test_snapshot_built_with_other_index_parameters_is_rejected(catalog_path, monkeypatch):
+    path = build_snapshot(catalog_path)
+    monkeypatch.setattr(snapshot_module, "K1", 2.0)
+    with pytest.raises(ValueError):
+        load_snapshot(path, source_info(catalog_path))
+    # also without a source to check against, as shared snapshots are attached
+    with pytest.raises(ValueError):
+        load_snapshot(path)
+
+
+def test_manager_loads_fresh_snapshot_only(catalog_path):
+    build_snapshot(catalog_path)
+    catalog = CatalogManager(catalog_path, check_interval=0).get_catalog()
+    assert catalog.derived("inverted_index", None) is not None
+
+    write_catalog(catalog_path, {"9": {"name": "Chess Club"}})
+    os.utime(catalog_path, (1, 1))
+    catalog = CatalogManager(catalog_path, check_interval=0).get_catalog()
+    assert [club["name"] for club in catalog.clubs.values()] == ["Chess Club"]
+    assert os.path.exists(snapshot_path(catalog_path))
@@ -1,6 +1,14 @@
+import asyncio
+import json
+import os
+import tempfile
 import unittest
+from unittest import mock
+import httpx
 from fastapi.testclient import TestClient
-from main import app
+import main
+from controllers import main_controller
+from main import RecommendationsResponse, app
 
 class TestAPI(unittest.TestCase):
     @classmethod
@@ -46,6 +54,164 @@ class TestAPI(unittest.TestCase):
         response = self.client.post("/api/v1/recommend", json={})
         self.assertEqual(response.status_code, 422)
 
+    def test_recommend_endpoint_top_k(self):
+        """top_k limits how many clubs come back."""
+        payload = {"interests": "club, student", "top_k": 3}
+        response = self.client.post("/api/v1/recommend", json=payload)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()["recommendations"]), 3)
+
+    def test_recommend_endpoint_filters(self):
+        """Filters drop clubs that don't match; every club in the data is Active."""
+        payload = {"interests": "club, student", "top_k": 3}
+        active = self.client.post("/api/v1/recommend", json=dict(payload, status="Active"))
+        self.assertEqual(len(active.json()["recommendations"]), 3)
+        inactive = self.client.post("/api/v1/recommend", json=dict(payload, status="Inactive"))
+        self.assertEqual(inactive.json()["recommendations"], [])
+
+    def test_recommend_endpoint_rejects_bad_top_k(self):
+        """top_k outside 1..100 is rejected."""
+        for top_k in (0, 101):
+            response = self.client.post("/api/v1/recommend", json={"interests": "club", "top_k": top_k})
+            self.assertEqual(response.status_code, 422)
+
+    def test_cache_stats_endpoint_counts_hits(self):
+        """Repeating an equivalent query should register a cache hit."""
+        before = self.client.get("/api/v1/cache/stats").json()
+        self.client.post("/api/v1/recommend", json={"interests": "chess, robotics"})
+        self.client.post("/api/v1/recommend", json={"interests": "Robotics, chess"})
+        after = self.client.get("/api/v1/cache/stats").json()
+        self.assertGreaterEqual(after["hits"], before["hits"] + 1)
+
+    def test_reload_endpoint_returns_catalog_info(self):
+        """Admin reload should swap in a fresh catalog snapshot."""
+        response = self.client.post("/api/v1/admin/reload")
+        self.assertEqual(response.status_code, 200)
+
+        data = response.json()
+        self.assertIn("version", data)
+        self.assertGreater(data["clubs"], 0)
+
+    def test_batch_endpoint_json(self):
+        """A JSON batch gets one NDJSON line per request, same as single calls."""
+        requests = [{"interests": "robotics"}, {"interests": "art, music", "top_k": 2}]
+        response = self.client.post("/api/v1/recommend/batch", json={"requests": requests})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("application/x-ndjson"))
+
+        lines = sorted((json.loads(line) for line in response.text.splitlines()), key=lambda l: l["index"])
+        self.assertEqual([line["index"] for line in lines], [0, 1])
+        for line, payload in zip(lines, requests):
+            single = self.client.post("/api/v1/recommend", json=payload).json()
+            self.assertEqual(line["recommendations"], single["recommendations"])
+
+    def test_batch_endpoint_rejects_invalid_json_batch(self):
+        """An invalid request in a JSON batch rejects the whole batch."""
+        response = self.client.post("/api/v1/recommend/batch", json=[{"interests": "art"}, {}])
+        self.assertEqual(response.status_code, 422)
+
+    def test_batch_endpoint_rejects_malformed_json(self):
+        """A JSON batch body that doesn't parse is a 422, not a server error."""
+        response = self.client.post("/api/v1/recommend/batch", content=b'[{"interests": "art"',
+                                    headers={"content-type": "application/json"})
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(response.json()["detail"][0]["type"], "json_invalid")
+
+    def test_batch_endpoint_ndjson(self):
+        """NDJSON bodies are read, then results stream back by chunk; bad lines get an error line."""
+        body = b'{"interests": "robotics", "top_k": 2}\n{"top_k": 3}\n\n{"interests": "art"}'
+        response = self.client.post(
+            "/api/v1/recommend/batch", content=body,
+            headers={"content-type": "application/x-ndjson"},
+        )
+        self.assertEqual(response.status_code, 200)
+
+        lines = {line["index"]: line for line in map(json.loads, response.text.splitlines())}
+        self.assertEqual(sorted(lines), [0, 1, 2])
+        self.assertEqual(len(lines[0]["recommendations"]), 2)
+        self.assertIn("error", lines[1])
+        self.assertIn("recommendations", lines[2])
+
+    def test_recommend_fast_json_matches_pydantic(self):
+        """The fragment fast path writes the same bytes as the response model."""
+        payload = {"interests": "engineering, música, robotics", "top_k": 20}
+        response = self.client.post("/api/v1/recommend", json=payload)
+        expected = RecommendationsResponse(**response.json()).model_dump_json()
+        self.assertEqual(response.content, expected.encode("utf-8"))
+
+    def test_recommend_schema_still_documented(self):
+        """Skipping the response model at runtime keeps it in the OpenAPI docs."""
+        operation = app.openapi()["paths"]["/api/v1/recommend"]["post"]
+        schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+        self.assertEqual(schema["$ref"], "#/components/schemas/RecommendationsResponse")
+
+    def test_recommend_reports_server_timing(self):
+        """Recommend responses break their latency down by stage."""
+        response = self.client.post("/api/v1/recommend", json={"interests": "timing, stages"})
+        self.assertEqual(response.status_code, 200)
+
+        stages = [part.split(";")[0] for part in response.headers["Server-Timing"].split(", ")]
+        for stage in ("catalog", "parse", "score", "serialize", "total"):
+            self.assertIn(stage, stages)
+
+    def test_metrics_endpoint_exposes_histograms(self):
+        """/metrics serves stage histograms labeled by strategy."""
+        self.client.post("/api/v1/recommend", json={"interests": "metrics"})
+        response = self.client.get("/metrics")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('club_match_stage_seconds_count{stage="score",strategy="survey"}', response.text)
+        self.assertIn("club_match_single_flight_coalesced_total", response.text)
+
+    def test_coalesced_requests_record_their_total(self):
+        """A request that waits on an identical one in flight still gets a labeled total."""
+        async def slow_score(user_data):
+            await asyncio.sleep(0.05)
+            return []
+
+        async def send_both():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                payload = {"interests": "coalesced, total"}
+                return await asyncio.gather(*(client.post("/api/v1/recommend", json=payload) for _ in range(2)))
+
+        stage_metrics = main.metrics.stage_metrics
+        totals = stage_metrics.get("total", "survey")
+        before = totals.count if totals else 0
+        coalesced = main_controller.single_flight.coalesced
+        with mock.patch.object(main, "_score_in_threadpool", slow_score):
+            responses = asyncio.run(send_both())
+        self.assertEqual(main_controller.single_flight.coalesced, coalesced + 1)
+        self.assertEqual(stage_metrics.get("total", "survey").count, before + 2)
+        for response in responses:
+            self.assertIn("total;dur=", response.headers["server-timing"])
+
+    def test_recommend_flags_partial_results(self):
+        """Too many interests to score within the budget come back flagged as partial."""
+        response = self.client.post("/api/v1/recommend", json={"interests": "robotics"})
+        self.assertFalse(response.json()["partial"])
+        interests = ", ".join(f"interest{i}" for i in range(100))
+        response = self.client.post("/api/v1/recommend", json={"interests": interests})
+        self.assertTrue(response.json()["partial"])
+
+    def test_profile_header_logs_profiled_request(self):
+        """With profiling headers allowed, a profiled request lands in the slow query log."""
+        with tempfile.TemporaryDirectory() as tmp:
+            log_path = os.path.join(tmp, "slow.ndjson")
+            with mock.patch.object(main_controller.profiler, "allow_header", True), \
+                    mock.patch.object(main_controller.profiler, "directory", tmp), \
+                    mock.patch.object(main_controller.slow_queries, "path", log_path):
+                self.client.post("/api/v1/recommend", json={"interests": "profiled, query"},
+                                 headers={"X-Club-Match-Profile": "1"})
+                self.client.post("/api/v1/recommend", json={"interests": "not profiled"})
+            with open(log_path, encoding="utf-8") as f:
+                records = [json.loads(line) for line in f]
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["keywords"], ["profiled", "query"])
+        self.assertEqual(records[0]["strategy"], "survey")
+        self.assertIn("matched", records[0])
+        self.assertIn("score", records[0]["stages"])
+        self.assertTrue(records[0]["profile"].endswith(".prof"))
+
 
 if __name__ == "__main__":
     unittest.main()